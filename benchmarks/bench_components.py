@@ -0,0 +1,753 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+纯Python组件微基准测试
+覆盖SettingsManager、ThemeManager、ModuleResponseCache、utils.logger.setup_logger与utils.metrics，
+输出JSON结果并与基线对比，发现性能回退时以非零状态码退出
+
+对比使用多次重复中的最小值（受调度与其他进程干扰最小），并按每次重复前测得的参考负载耗时
+换算到基线运行时的机器速度；超出容差且超出噪声下限才算回退，疑似回退的用例会重新运行，仍超出时才报告。
+
+用法:
+    python benchmarks/bench_components.py                  # 运行并与基线对比
+    python benchmarks/bench_components.py --json out.json  # 同时写出本次结果
+    python benchmarks/bench_components.py --filter theme   # 只运行名称包含theme的用例
+    python benchmarks/bench_components.py --filter usage. --update-baseline  # 只更新（或添加）这些用例的基线
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+# 噪声下限（微秒）：亚微秒级用例的绝对抖动常超过相对容差，增量低于此值不算回退
+NOISE_FLOOR_US = 0.5
+
+# 疑似回退的用例重新运行的次数（取各次中的最小值）
+REGRESSION_RETRIES = 2
+
+# 参考负载每次测量的执行次数
+REFERENCE_NUMBER = 20
+
+# 更新基线时每个用例的运行次数（取换算后最小值居中的一次，避免偶然偏快的一次成为基线）
+BASELINE_RUNS = 3
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, number: int = 100, repeat: int = 7):
+    """注册基准用例
+
+    被装饰函数接收临时工作目录，返回无参的被测函数（准备工作在返回前完成，不计时）。
+    """
+    def decorator(func):
+        BENCHMARKS.append({"name": name, "setup": func, "number": number, "repeat": repeat})
+        return func
+    return decorator
+
+
+def build_tree(depth: int, fanout: int, prefix: str = "k") -> dict:
+    """构造指定深度与分支数的嵌套设置树"""
+    if depth == 0:
+        return {f"{prefix}{i}": i for i in range(fanout)}
+    return {f"{prefix}{i}": build_tree(depth - 1, fanout, prefix) for i in range(fanout)}
+
+
+class _RecordingPage:
+    """记录runJavaScript参数的页面替身，仅用于测量JS生成开销"""
+
+    def __init__(self):
+        self.last_script = ""
+
+    def runJavaScript(self, script):
+        self.last_script = script
+
+
+class _RecordingView:
+    def __init__(self):
+        self._page = _RecordingPage()
+
+    def page(self):
+        return self._page
+
+
+# ---------------------------------------------------------------- SettingsManager
+
+def _settings_manager(workdir: Path):
+    os.environ["APPDATA"] = str(workdir / "appdata")
+    from components.settings_manager import SettingsManager
+    return SettingsManager()
+
+
+@benchmark("settings.load", number=50)
+def bench_settings_load(workdir):
+    manager = _settings_manager(workdir)
+    manager.set("urls", {f"module_{i}": f"https://example.com/{i}" for i in range(200)})
+    manager.save()
+    return lambda: manager._load_settings()
+
+
+@benchmark("settings.get", number=20000)
+def bench_settings_get(workdir):
+    manager = _settings_manager(workdir)
+    return lambda: manager.get("window.width")
+
+
+@benchmark("settings.get_missing", number=20000)
+def bench_settings_get_missing(workdir):
+    manager = _settings_manager(workdir)
+    return lambda: manager.get("engine.not.present", 0)
+
+
+@benchmark("settings.set", number=20000)
+def bench_settings_set(workdir):
+    manager = _settings_manager(workdir)
+    return lambda: manager.set("window.width", 1280)
+
+
+@benchmark("settings.save", number=50)
+def bench_settings_save(workdir):
+    manager = _settings_manager(workdir)
+    return manager.save
+
+
+@benchmark("settings.merge_large_tree", number=20)
+def bench_settings_merge(workdir):
+    manager = _settings_manager(workdir)
+    base = build_tree(3, 10)
+    overrides = build_tree(3, 10)
+    return lambda: manager._merge_settings(base, overrides)
+
+
+# ---------------------------------------------------------------- ThemeManager
+
+_APP = None
+
+
+def _theme_app():
+    """创建（并持有）QApplication，避免被垃圾回收"""
+    global _APP
+    from PyQt6.QtWidgets import QApplication
+    if QApplication.instance() is None:
+        _APP = QApplication(sys.argv)
+    return QApplication.instance()
+
+
+def _write_themes(theme_dir: Path, count: int) -> None:
+    from components.theme_manager import ThemeManager
+    theme_dir.mkdir(parents=True, exist_ok=True)
+    template = ThemeManager(theme_dir=theme_dir / "__none__").get_theme_info("light")
+    for i in range(count):
+        with open(theme_dir / f"custom_{i}.json", "w", encoding="utf-8") as f:
+            json.dump(dict(template, name=f"自定义主题{i}"), f, ensure_ascii=False)
+
+
+@benchmark("theme.load_200_custom", number=5)
+def bench_theme_load(workdir):
+    _theme_app()
+    from components.theme_manager import ThemeManager
+    theme_dir = workdir / "themes"
+    _write_themes(theme_dir, 200)
+    return lambda: ThemeManager(theme_dir=theme_dir)
+
+
+def _widget_tree(count: int):
+    """构造一个包含count个常用控件的可见窗口，使主题切换需要重新polish"""
+    from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLineEdit, QLabel
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    widget_types = (QPushButton, QLineEdit, QLabel)
+    for i in range(count):
+        layout.addWidget(widget_types[i % len(widget_types)](f"item {i}"))
+    window.show()
+    return window
+
+
+def _bench_toggle(workdir, engine):
+    _theme_app()
+    from PyQt6.QtWidgets import QApplication
+    from components.theme_manager import ThemeManager
+    manager = ThemeManager(theme_dir=workdir / "themes", engine=engine)
+    window = _widget_tree(300)
+    manager.apply_theme("light")
+
+    def run():
+        manager.toggle_theme()
+        window.ensurePolished()
+        # 调色板变化事件是投递的，需一并计入切换耗时
+        QApplication.sendPostedEvents()
+    run.window = window
+    return run
+
+
+def _bench_dialog_construct(workdir, engine):
+    _theme_app()
+    from PyQt6.QtCore import QEvent
+    from PyQt6.QtWidgets import QApplication
+    from components.theme_manager import ThemeManager
+    manager = ThemeManager(theme_dir=workdir / "themes", engine=engine)
+    manager.apply_theme("dark")
+
+    def run():
+        window = _widget_tree(100)
+        window.ensurePolished()
+        window.close()
+        window.deleteLater()
+        # 没有运行事件循环，投递的事件（布局、更新请求等）需显式派发，否则在队列中累积，每次构建越来越慢；
+        # 延迟删除只在显式指定时派发，否则控件会累积到后续用例
+        QApplication.sendPostedEvents()
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    return run
+
+
+@benchmark("theme.toggle_stylesheet_300_widgets", number=20)
+def bench_theme_toggle_stylesheet(workdir):
+    return _bench_toggle(workdir, "stylesheet")
+
+
+@benchmark("theme.toggle_palette_300_widgets", number=20)
+def bench_theme_toggle_palette(workdir):
+    return _bench_toggle(workdir, "palette")
+
+
+@benchmark("theme.dialog_construct_stylesheet", number=20)
+def bench_dialog_construct_stylesheet(workdir):
+    return _bench_dialog_construct(workdir, "stylesheet")
+
+
+@benchmark("theme.dialog_construct_palette", number=20)
+def bench_dialog_construct_palette(workdir):
+    return _bench_dialog_construct(workdir, "palette")
+
+
+@benchmark("theme.system_scheme_switch_300_widgets", number=20)
+def bench_theme_system_switch(workdir):
+    _theme_app()
+    from PyQt6.QtCore import Qt
+    from components.theme_manager import ThemeManager
+    manager = ThemeManager(theme_dir=workdir / "themes")
+    window = _widget_tree(300)
+    manager.apply_theme("system")
+    schemes = iter([Qt.ColorScheme.Dark, Qt.ColorScheme.Light] * 1000)
+
+    def run():
+        # 一次系统配色变化：连续信号只记录，防抖结束后统一应用（这里直接触发防抖回调）
+        scheme = next(schemes)
+        manager._on_color_scheme_changed(scheme)
+        manager._on_color_scheme_changed(scheme)
+        manager._apply_pending_scheme()
+        window.ensurePolished()
+    run.window = window
+    return run
+
+
+@benchmark("theme.inject_js", number=2000)
+def bench_theme_inject(workdir):
+    from components.theme_manager import ThemeManager
+    manager = ThemeManager(theme_dir=workdir / "themes")
+    view = _RecordingView()
+    return lambda: manager.inject_theme_to_webview(view)
+
+
+# ---------------------------------------------------------------- logger
+
+@benchmark("logger.setup_new", number=200)
+def bench_logger_setup_new(workdir):
+    from utils.logger import setup_logger
+    os.chdir(workdir)
+    counter = iter(range(10 ** 9))
+
+    def run():
+        logger = setup_logger(f"bench.new.{next(counter)}")
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+    return run
+
+
+@benchmark("logger.setup_existing", number=5000)
+def bench_logger_setup_existing(workdir):
+    from utils.logger import setup_logger
+    os.chdir(workdir)
+    setup_logger("bench.existing")
+    return lambda: setup_logger("bench.existing")
+
+
+@benchmark("logger.info_write", number=2000)
+def bench_logger_write(workdir):
+    from utils.logger import setup_logger, set_console_level
+    os.chdir(workdir)
+    logger = setup_logger("bench.write")
+    # 测量调用线程的开销（写入由日志线程完成），关闭控制台输出避免干扰
+    set_console_level(logging.CRITICAL)
+    return lambda: logger.info("benchmark message %s", 42)
+
+
+# ---------------------------------------------------------------- metrics
+
+@benchmark("metrics.histogram_observe", number=20000)
+def bench_metrics_observe(workdir):
+    from utils.metrics import MetricsRegistry
+    histogram = MetricsRegistry().histogram("bench.observe_ms")
+    return lambda: histogram.observe(12.5)
+
+
+@benchmark("metrics.snapshot_50", number=200)
+def bench_metrics_snapshot(workdir):
+    from utils.metrics import MetricsRegistry
+    registry = MetricsRegistry()
+    for i in range(25):
+        registry.histogram(f"bench.h{i}").observe(i)
+        registry.counter(f"bench.c{i}").inc()
+    return registry.snapshot
+
+
+# ---------------------------------------------------------------- ModuleResponseCache
+
+_HTTP_SERVERS = {}
+
+# 替身站点模拟的建连耗时（秒），代替真实网络中的DNS、TCP与TLS握手
+STUB_HANDSHAKE_SECONDS = 0.02
+
+
+def _stub_site_url(handshake_seconds: float = 0.0) -> str:
+    """启动本地HTTP替身站点（每种建连耗时进程内只启动一次）并返回站点根URL
+
+    Args:
+        handshake_seconds: 每个新连接在处理请求前的等待时间；大于0时启用HTTP/1.1长连接，预连接可复用
+    """
+    import http.server
+    import threading
+
+    server = _HTTP_SERVERS.get(handshake_seconds)
+    if server is None:
+        site_dir = tempfile.mkdtemp(prefix="bench_site_")
+        Path(site_dir, "index.html").write_text(
+            "<html><body>" + "module " * 2000 + "</body></html>", encoding='utf-8'
+        )
+
+        class QuietHandler(http.server.SimpleHTTPRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=site_dir, **kwargs)
+
+            def setup(self):
+                super().setup()
+                time.sleep(handshake_seconds)
+
+            def log_message(self, format, *args):
+                pass
+
+        if handshake_seconds:
+            QuietHandler.protocol_version = "HTTP/1.1"
+        class StubServer(http.server.ThreadingHTTPServer):
+            request_queue_size = 128  # 并发请求较多时避免连接被拒绝
+
+        server = _HTTP_SERVERS[handshake_seconds] = StubServer(("127.0.0.1", 0), QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def _module_cache_with_server(workdir: Path):
+    """创建指向本地替身站点的模块缓存
+
+    Returns:
+        (缓存实例, 站点根URL)
+    """
+    base_url = _stub_site_url()
+    _theme_app()
+    settings = _settings_manager(workdir)
+    settings.set("module_cache.urls", [base_url])
+    from components.module_cache import ModuleResponseCache
+    return ModuleResponseCache(settings, workdir / "module_cache"), base_url
+
+
+@benchmark("module_cache.lookup_hit", number=2000)
+def bench_module_cache_lookup(workdir):
+    cache, base_url = _module_cache_with_server(workdir)
+    url = base_url + "index.html"
+    cache._fetch(url)
+    return lambda: cache.lookup(url)
+
+
+@benchmark("module_cache.revalidate_304", number=20)
+def bench_module_cache_revalidate(workdir):
+    cache, base_url = _module_cache_with_server(workdir)
+    url = base_url + "index.html"
+    cache._fetch(url)
+    return lambda: cache._fetch(url)
+
+
+# ---------------------------------------------------------------- ModuleCatalog
+
+def _catalog_manifest(count: int, revision: int) -> dict:
+    """构造含count个模块的清单，每个修订版本修改其中10个模块的标题"""
+    return {
+        "version": str(revision),
+        "modules": [
+            {
+                "id": f"module-{i}",
+                "title": f"模块{i}" + (f" v{revision}" if i % (count // 10) == 0 else ""),
+                "description": "科室业务模块" * 4,
+                "url": f"https://dept{i % 20}.example.com/module/{i}",
+                "icon": "📦",
+                "departments": [f"科室{i % 12}"],
+                "order": i,
+            }
+            for i in range(count)
+        ],
+    }
+
+
+@benchmark("catalog.apply_500_delta10", number=50)
+def bench_catalog_apply(workdir):
+    _theme_app()
+    settings = _settings_manager(workdir)
+    settings.set("catalog.manifest_url", "https://example.com/manifest.json")
+    from components.module_catalog import ModuleCatalog
+    catalog = ModuleCatalog(settings, workdir / "module_catalog.json")
+    manifests = [_catalog_manifest(500, revision) for revision in (1, 2)]
+    catalog.apply_manifest(manifests[0])
+    state = {"revision": 0}
+
+    def run():
+        state["revision"] ^= 1
+        catalog.apply_manifest(manifests[state["revision"]])
+    return run
+
+
+# ---------------------------------------------------------------- DownloadManager
+
+_RANGE_SERVER = None
+
+# 替身下载服务器的文件大小
+DOWNLOAD_FILE_SIZE = 16 * 1024 * 1024
+
+# 替身下载服务器每个连接的速率上限（字节/秒），模拟真实链路中单连接吞吐受延迟与窗口限制
+DOWNLOAD_CONNECTION_RATE = 64 * 1024 * 1024
+
+DOWNLOAD_SLICE_SIZE = 256 * 1024
+
+
+def _range_site_url() -> str:
+    """启动支持Range的本地下载替身服务器（进程内只启动一次）并返回文件URL"""
+    global _RANGE_SERVER
+    import http.server
+    import re
+    import threading
+
+    if _RANGE_SERVER is None:
+        body = os.urandom(DOWNLOAD_FILE_SIZE)
+
+        class RangeHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+                if match:
+                    start = int(match.group(1))
+                    end = int(match.group(2)) if match.group(2) else len(body) - 1
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+                else:
+                    start, end = 0, len(body) - 1
+                    self.send_response(200)
+                self.send_header("Content-Length", str(end - start + 1))
+                self.send_header("ETag", '"bench"')
+                self.end_headers()
+                for offset in range(start, end + 1, DOWNLOAD_SLICE_SIZE):
+                    self.wfile.write(body[offset:min(offset + DOWNLOAD_SLICE_SIZE, end + 1)])
+                    time.sleep(DOWNLOAD_SLICE_SIZE / DOWNLOAD_CONNECTION_RATE)
+
+            def log_message(self, format, *args):
+                pass
+
+        _RANGE_SERVER = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        threading.Thread(target=_RANGE_SERVER.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{_RANGE_SERVER.server_address[1]}/report.pdf"
+
+
+def _download_once(workdir: Path, max_connections: int):
+    """返回被测函数：下载一次替身文件并等待完成"""
+    _theme_app()
+    settings = _settings_manager(workdir)
+    settings.set("downloads.max_connections", max_connections)
+    from components.download_manager import DownloadManager
+    manager = DownloadManager(settings, workdir / "download_state")
+    url = _range_site_url()
+
+    def run():
+        download_id = manager.add(url, directory=workdir / "downloads")
+        while True:
+            download = next(d for d in manager.get_downloads() if d["id"] == download_id)
+            if download["state"] in ("completed", "failed"):
+                break
+            time.sleep(0.002)
+        assert download["state"] == "completed", download["error"]
+        os.remove(download["path"])
+    return run
+
+
+@benchmark("downloads.single_16mb", number=3)
+def bench_download_single(workdir):
+    return _download_once(workdir, max_connections=1)
+
+
+@benchmark("downloads.chunked_16mb_x4", number=3)
+def bench_download_chunked(workdir):
+    return _download_once(workdir, max_connections=4)
+
+
+# ---------------------------------------------------------------- RequestRuleEngine
+
+def _request_rule_engine(workdir: Path):
+    """创建含50条拦截规则（主机后缀、路径、资源类型混合）的规则引擎"""
+    settings = _settings_manager(workdir)
+    block = []
+    for i in range(50):
+        if i % 3 == 0:
+            block.append(f"tracker{i}.example.com")
+        elif i % 3 == 1:
+            block.append({"host": f"cdn{i}.example.net", "path": "/ads/*"})
+        else:
+            block.append({"host": f"fonts{i}.example.org", "types": ["font", "stylesheet"]})
+    settings.set("request_rules.block", block)
+    settings.set("request_rules.allow", ["allowed.tracker0.example.com"])
+    from components.request_rules import RequestRuleEngine
+    return RequestRuleEngine(settings)
+
+
+@benchmark("request_rules.match_hit", number=20000)
+def bench_request_rules_hit(workdir):
+    engine = _request_rule_engine(workdir)
+    return lambda: engine.should_block("static.cdn31.example.net", "/ads/banner.js", "script")
+
+
+@benchmark("request_rules.match_miss", number=20000)
+def bench_request_rules_miss(workdir):
+    engine = _request_rule_engine(workdir)
+    return lambda: engine.should_block("portal.intranet.local", "/static/js/app.js", "script")
+
+
+# ---------------------------------------------------------------- CommandIndex
+
+@benchmark("command_index.keystroke_5000", number=200)
+def bench_command_index_keystroke(workdir):
+    """5000个模块加全部设置键的索引，依次查询逐字输入的各个前缀（每次为一次按键）"""
+    from components.command_index import CommandIndex
+    from components.command_palette import config_entries, module_entries
+    from components.module_catalog import normalize_module
+    index = CommandIndex()
+    index.replace_kind("module", module_entries(
+        [normalize_module(entry) for entry in _catalog_manifest(5000, 1)["modules"]]
+    ))
+    index.replace_kind("config", config_entries(_settings_manager(workdir)))
+    index.set_recent([f"module:module-{i}" for i in range(10)])
+    keystrokes = [word[:n] for word in ("模块123", "dept7", "downloads.max", "科室 业务") for n in range(1, len(word) + 1)]
+    state = {"i": 0}
+
+    def run():
+        state["i"] = (state["i"] + 1) % len(keystrokes)
+        index.search(keystrokes[state["i"]], 20)
+    return run
+
+
+# ---------------------------------------------------------------- ModuleUsage
+
+@benchmark("usage.startup_after_20k_launches", number=50)
+def bench_usage_startup(workdir):
+    """2万次打开（300个模块）之后启动时读取使用记录：摘要加未合并的日志"""
+    from components.module_usage import ModuleUsage
+    settings = _settings_manager(workdir)
+    usage_dir = workdir / "usage"
+    usage = ModuleUsage(settings, usage_dir).for_user("bench")
+    started = time.time() - 20000 * 60
+    for i in range(20000):
+        usage.record(f"https://dept{i % 20}.example.com/module/{(i * 7919) % 300}", started + i * 60)
+    return lambda: ModuleUsage(settings, usage_dir).for_user("bench").get_scores()
+
+
+# ---------------------------------------------------------------- runner
+
+def _reference_workload():
+    """参考负载（字典、字符串与排序），用于衡量运行时的机器速度"""
+    table = {}
+    for i in range(2000):
+        table[str(i)] = i * 2
+    return sorted(table.items(), key=lambda item: -item[1])[:10]
+
+
+def run_case(case: dict) -> dict:
+    """运行单个用例，每次重复前测量一次参考负载
+
+    Returns:
+        {"median_us", "min_us", "ref_us", "number", "repeat"}
+    """
+    original_cwd = os.getcwd()
+    timings, reference = [], []
+    with tempfile.TemporaryDirectory(prefix="dm-bench-") as tmp:
+        try:
+            func = case["setup"](Path(tmp))
+            for _ in range(case["repeat"]):
+                reference.append(timeit.timeit(_reference_workload, number=REFERENCE_NUMBER) / REFERENCE_NUMBER)
+                timings.append(timeit.timeit(func, number=case["number"]) / case["number"])
+        finally:
+            os.chdir(original_cwd)
+    per_op = [t * 1e6 for t in timings]
+    return {
+        "median_us": round(statistics.median(per_op), 3),
+        "min_us": round(min(per_op), 3),
+        "ref_us": round(min(reference) * 1e6, 3),
+        "number": case["number"],
+        "repeat": case["repeat"],
+    }
+
+
+def run_benchmarks(name_filter: str = "", runs: int = 1) -> dict:
+    """运行全部已注册用例
+
+    Args:
+        name_filter: 只运行名称包含该字符串的用例
+        runs: 每个用例的运行次数，多于一次时取最小值（按参考负载换算）居中的一次
+
+    Returns:
+        {用例名: {"median_us", "min_us", "ref_us", "number", "repeat"}}
+    """
+    results = {}
+    for case in BENCHMARKS:
+        if name_filter and name_filter not in case["name"]:
+            continue
+        case_runs = sorted((run_case(case) for _ in range(runs)), key=lambda result: result["min_us"] / result["ref_us"])
+        results[case["name"]] = case_runs[len(case_runs) // 2]
+        print(f"  {case['name']:<28}{results[case['name']]['min_us']:>14.3f} µs/op")
+    return results
+
+
+def adjusted_min(result: dict, base: dict) -> float:
+    """本次最小值换算到基线运行时的机器速度（按两次的参考负载耗时之比）"""
+    if result.get("ref_us") and base.get("ref_us"):
+        return result["min_us"] * base["ref_us"] / result["ref_us"]
+    return result["min_us"]
+
+
+def is_regression(result: dict, base: dict, tolerance: float, noise_floor_us: float) -> bool:
+    """换算后的最小值超出基线最小值的容差，且增量超出噪声下限"""
+    return adjusted_min(result, base) > base["min_us"] * (1 + tolerance) + noise_floor_us
+
+
+def compare(results: dict, baseline: dict, tolerance: float, noise_floor_us: float) -> list:
+    """与基线对比，返回回退的用例列表"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"  · {name:<28}无基线（使用 --filter {name} --update-baseline 添加）")
+            continue
+        adjusted = adjusted_min(result, base)
+        ratio = adjusted / base["min_us"] if base["min_us"] else 1.0
+        regressed = is_regression(result, base, tolerance, noise_floor_us)
+        marker = "✗" if regressed else "✓"
+        print(f"  {marker} {name:<28}{base['min_us']:>12.3f} -> {adjusted:>12.3f} µs ({ratio:.2f}x)")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def recheck(regressions: list, results: dict, baseline: dict, tolerance: float, noise_floor_us: float) -> list:
+    """重新运行疑似回退的用例（保留换算后最小值更低的结果），返回仍然回退的用例"""
+    confirmed = []
+    for name in regressions:
+        case = next(case for case in BENCHMARKS if case["name"] == name)
+        base = baseline[name]
+        for _ in range(REGRESSION_RETRIES):
+            result = run_case(case)
+            if adjusted_min(result, base) < adjusted_min(results[name], base):
+                results[name] = result
+            if not is_regression(results[name], base, tolerance, noise_floor_us):
+                break
+        regressed = is_regression(results[name], base, tolerance, noise_floor_us)
+        print(f"  {'✗' if regressed else '✓'} {name:<28}复测 {adjusted_min(results[name], base):>12.3f} µs")
+        if regressed:
+            confirmed.append(name)
+    return confirmed
+
+
+def update_baseline(baseline_path: Path, report: dict) -> None:
+    """把本次运行的用例写入基线，未运行的用例保留原值（配合 --filter 只更新指定用例）"""
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        baseline.setdefault("results", {}).update(report["results"])
+    else:
+        baseline = report
+    with open(baseline_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="纯Python组件微基准测试")
+    parser.add_argument("--json", help="将本次结果写入JSON文件")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="基线文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次运行的用例更新基线（其余用例不变）")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的相对回退比例")
+    parser.add_argument("--noise-floor", type=float, default=NOISE_FLOOR_US, help="不算回退的绝对增量（微秒）")
+    parser.add_argument("--filter", default="", help="只运行名称包含该字符串的用例")
+    args = parser.parse_args()
+    json_path = Path(args.json).resolve() if args.json else None
+    baseline_path = Path(args.baseline).resolve()
+
+    # 在临时目录中运行：日志管道在当前目录下创建 logs/，不写入（或轮转）仓库中的文件
+    os.chdir(tempfile.mkdtemp(prefix="dm-bench-cwd-"))
+
+    print("运行基准测试...")
+    started = time.time()
+    results = run_benchmarks(args.filter, BASELINE_RUNS if args.update_baseline else 1)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "duration_s": round(time.time() - started, 2),
+        "results": results,
+    }
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.update_baseline:
+        update_baseline(baseline_path, report)
+        print(f"✓ 基线已更新（{len(results)} 个用例）: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print("未找到基线文件，使用 --update-baseline 生成")
+        return
+
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f).get("results", {})
+
+    print(f"\n与基线对比（换算到基线机器速度的最小值，容差 {args.tolerance:.0%}，噪声下限 {args.noise_floor} µs）:")
+    regressions = compare(results, baseline, args.tolerance, args.noise_floor)
+    if regressions:
+        print("\n重新运行疑似回退的用例:")
+        regressions = recheck(regressions, results, baseline, args.tolerance, args.noise_floor)
+    if regressions:
+        print(f"\n✗ 发现性能回退: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✓ 未发现性能回退")
+
+
+if __name__ == "__main__":
+    main()
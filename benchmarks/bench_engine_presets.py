@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+引擎预设基准测试
+为每个引擎预设启动独立子进程（Chromium参数只在进程启动时生效），
+统计从进程启动到登录页加载完成的耗时，以及加载完成后浏览器进程树的内存
+
+用法:
+    python benchmarks/bench_engine_presets.py [--repeat 3] [--presets default low_memory] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROCESS_START = time.perf_counter()
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def run_child(preset: str, settle_ms: int) -> None:
+    """子进程：应用预设、加载登录页并输出一行JSON结果"""
+    from components.settings_manager import SettingsManager
+    from components.engine_profile import apply_engine_profile
+
+    flags = apply_engine_profile(SettingsManager(), preset)
+
+    from PyQt6.QtCore import QEventLoop, QTimer, QUrl
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+    from components.process_monitor import read_process_tree
+
+    app = QApplication(sys.argv)
+    view = QWebEngineView()
+    view.resize(1280, 800)
+    view.show()
+
+    loop = QEventLoop()
+    view.loadFinished.connect(lambda _ok: loop.quit())
+    view.load(QUrl.fromLocalFile(str(PROJECT_ROOT / "01-登录.html")))
+    loop.exec()
+    startup_ms = (time.perf_counter() - PROCESS_START) * 1000
+
+    settle = QEventLoop()
+    QTimer.singleShot(settle_ms, settle.quit)
+    settle.exec()
+
+    processes = read_process_tree(os.getpid())
+    print(json.dumps({
+        "preset": preset,
+        "flags": flags,
+        "startup_ms": round(startup_ms, 1),
+        "process_count": len(processes),
+        "total_rss": sum(p["rss"] for p in processes),
+        "total_pss": sum(p["pss"] for p in processes),
+    }))
+    sys.stdout.flush()
+    view.close()
+    app.quit()
+
+
+def main():
+    from components.engine_profile import ENGINE_PRESETS
+
+    parser = argparse.ArgumentParser(description="引擎预设基准测试")
+    parser.add_argument("--presets", nargs="*", default=list(ENGINE_PRESETS.keys()), help="要测试的预设")
+    parser.add_argument("--repeat", type=int, default=3, help="每个预设的重复次数")
+    parser.add_argument("--settle-ms", type=int, default=2000, help="加载完成后等待内存稳定的时间")
+    parser.add_argument("--json", help="将结果写入JSON文件")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.settle_ms)
+        return
+
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env.pop("QTWEBENGINE_CHROMIUM_FLAGS", None)
+
+    results = {}
+    for preset in args.presets:
+        runs = []
+        for _ in range(args.repeat):
+            completed = subprocess.run(
+                [sys.executable, __file__, "--child", preset, "--settle-ms", str(args.settle_ms)],
+                env=env, capture_output=True, text=True, timeout=120
+            )
+            lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+            if completed.returncode != 0 or not lines:
+                print(f"✗ 预设 {preset} 运行失败:\n{completed.stderr[-2000:]}")
+                break
+            runs.append(json.loads(lines[-1]))
+        if not runs:
+            continue
+        results[preset] = {
+            "flags": runs[0]["flags"],
+            "runs": len(runs),
+            "startup_ms_median": statistics.median(r["startup_ms"] for r in runs),
+            "pss_mb_median": round(statistics.median(r["total_pss"] for r in runs) / 1048576, 1),
+            "rss_mb_median": round(statistics.median(r["total_rss"] for r in runs) / 1048576, 1),
+            "process_count": runs[-1]["process_count"],
+        }
+
+    print(f"{'预设':<12}{'启动(ms)':>10}{'PSS(MB)':>10}{'RSS(MB)':>10}{'进程数':>8}  参数")
+    for preset, result in results.items():
+        print(f"{preset:<12}{result['startup_ms_median']:>10.1f}{result['pss_mb_median']:>10.1f}"
+              f"{result['rss_mb_median']:>10.1f}{result['process_count']:>8}  {' '.join(result['flags'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
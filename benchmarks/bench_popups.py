@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+弹窗拦截基准测试
+对比“每次弹窗创建ExternalLinkPage”的旧方式与当前拦截方式，
+统计触发N次 window.open 后存活的页面对象数量与进程内存；
+另测未携带URL的弹窗（先 window.open() 再设置 location），存活页面数应保持不变
+
+用法:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_popups.py [--count 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineSettings
+
+from components.settings_manager import SettingsManager
+from components.login_dialog import LoginDialog, LoginPage, ExternalLinkPage
+
+
+class LegacyPopupPage(LoginPage):
+    """旧实现：每次弹窗都创建一个完整的ExternalLinkPage"""
+
+    def __init__(self, parent_dialog, profile=None):
+        super().__init__(parent_dialog, profile)
+        self.newWindowRequested.disconnect(self._on_new_window_requested)
+        self.legacy_pages = []
+
+    def createWindow(self, window_type):
+        page = ExternalLinkPage(self.parent_dialog, self.parent_dialog.web_profile)
+        self.legacy_pages.append(page)
+        page.destroyed.connect(lambda: page in self.legacy_pages and self.legacy_pages.remove(page))
+        return page
+
+
+def read_rss_kb() -> int:
+    """读取当前进程RSS（KB），非Linux平台返回0"""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def wait(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def run_case(dialog: LoginDialog, page: QWebEnginePage, count: int, without_url: bool = False) -> dict:
+    """在指定页面上触发count次弹窗并统计结果
+
+    Args:
+        without_url: 弹窗不携带URL，打开后再设置 location
+    """
+    opened = []
+    dialog.open_external_url = opened.append
+    dialog.webview.setPage(page)
+    page.settings().setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanOpenWindows, True)
+
+    loaded = QEventLoop()
+    page.loadFinished.connect(lambda _ok: loaded.quit())
+    page.setHtml("<html><body>popup bench</body></html>")
+    loaded.exec()
+
+    pages_before = len(dialog.findChildren(QWebEnginePage))
+    rss_before = read_rss_kb()
+    start = time.perf_counter()
+    if without_url:
+        page.runJavaScript(
+            f"for (let i = 0; i < {count}; i++) {{ window.open().location.href = 'https://example.com/?i=' + i; }}"
+        )
+    else:
+        page.runJavaScript(
+            f"for (let i = 0; i < {count}; i++) {{ window.open('https://example.com/?i=' + i, '_blank'); }}"
+        )
+    deadline = time.perf_counter() + 60
+    while len(opened) < count and time.perf_counter() < deadline:
+        wait(50)
+    elapsed = time.perf_counter() - start
+    wait(500)
+
+    return {
+        "opened": len(opened),
+        "pages_added": len(dialog.findChildren(QWebEnginePage)) - pages_before,
+        "rss_delta_kb": read_rss_kb() - rss_before,
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="弹窗拦截基准测试")
+    parser.add_argument("--count", type=int, default=1000, help="触发的弹窗数量")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    dialog = LoginDialog(SettingsManager())
+
+    results = {
+        "legacy": run_case(dialog, LegacyPopupPage(dialog, dialog.web_profile), args.count),
+        "current": run_case(dialog, LoginPage(dialog, dialog.web_profile), args.count),
+        "no_url": run_case(dialog, LoginPage(dialog, dialog.web_profile), args.count, without_url=True),
+    }
+
+    print(f"弹窗数量: {args.count}")
+    print(f"{'方式':<10}{'已转交':>8}{'新增页面':>10}{'RSS增量(KB)':>14}{'耗时(s)':>10}")
+    for name, result in results.items():
+        print(f"{name:<10}{result['opened']:>8}{result['pages_added']:>10}"
+              f"{result['rss_delta_kb']:>14}{result['elapsed_s']:>10}")
+
+    dialog.close()
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端界面场景基准测试
+在offscreen平台与软件渲染下驱动DesktopApp/LoginDialog，统计真实用户流程的延迟分位数：
+
+    cold_start        进程启动 -> 登录页首帧
+    login_to_dashboard 提交登录表单 -> 主页面首帧（包含模拟认证的1.5秒等待）
+    dashboard_to_settings 点击“系统管理”卡片 -> 设置页首帧
+    settings_to_dashboard 设置页返回 -> 主页面首帧
+    theme_toggle_web  主页面点击主题开关 -> 下一帧
+    theme_toggle_native ThemeManager.toggle_theme 耗时
+    module_first_click_cold 与主页面同一Profile的新页面首次打开替身站点 -> loadFinished（未预热）
+    module_first_click_warm 同上，主页面先插入该主机的预连接提示（ModuleWarmup的预热方式）
+                      两者只近似程序内打开的模块（module_cache.urls 覆盖的模块）：不经过卡片点击、
+                      ModuleWindow创建与模块缓存拦截；交给外部浏览器的模块不受预热影响，不在此测量
+
+“首帧”定义为 loadFinished 之后页面内连续两次 requestAnimationFrame 回调完成。
+无需GPU与网络，页面均为本地文件或本机替身站点。
+
+用法:
+    python benchmarks/bench_scenarios.py [--iterations 10] [--cold-iterations 5] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+HEADLESS_ENV = {
+    "QT_QPA_PLATFORM": "offscreen",
+    "QT_QUICK_BACKEND": "software",
+    "QTWEBENGINE_CHROMIUM_FLAGS": "--disable-gpu --disable-gpu-compositing",
+    "QTWEBENGINE_DISABLE_SANDBOX": "1",
+}
+
+FRAME_SCRIPT = "new Promise(r => requestAnimationFrame(() => requestAnimationFrame(() => r(true))))"
+
+
+def prepare_environment(workdir: Path) -> None:
+    """隔离设置目录并启用无头软件渲染"""
+    for key, value in HEADLESS_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ["APPDATA"] = str(workdir)
+    settings_dir = workdir / "Desktop Manager" / "config"
+    settings_dir.mkdir(parents=True, exist_ok=True)
+    settings_file = settings_dir / "settings.json"
+    if not settings_file.exists():
+        # 使用独立的应用名，避免与正在运行的实例争用单实例锁
+        with open(settings_file, "w", encoding="utf-8") as f:
+            json.dump({"app": {"name": f"桌面管理程序-bench-{os.getpid()}"}}, f, ensure_ascii=False)
+
+
+def percentiles(samples: list) -> dict:
+    """计算常用分位数（毫秒）"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))], 1)
+
+    return {
+        "n": len(ordered),
+        "p50": pick(50),
+        "p90": pick(90),
+        "p95": pick(95),
+        "max": round(ordered[-1], 1),
+        "mean": round(statistics.mean(ordered), 1),
+    }
+
+
+class ScenarioDriver:
+    """在同一个DesktopApp实例中驱动页面流程"""
+
+    def __init__(self, app):
+        from PyQt6.QtCore import QEventLoop, QTimer
+        self._QEventLoop = QEventLoop
+        self._QTimer = QTimer
+        self.app = app
+        self.dialog = app.login_dialog
+        self.loads_in_flight = 0
+        page = self.dialog.webview.page()
+        page.loadStarted.connect(self._on_load_started)
+        page.loadFinished.connect(self._on_load_finished)
+
+    def _on_load_started(self):
+        self.loads_in_flight += 1
+        self.last_load_started = time.perf_counter()
+
+    def _on_load_finished(self, _ok):
+        self.loads_in_flight = max(0, self.loads_in_flight - 1)
+
+    def pump(self, ms: int) -> None:
+        loop = self._QEventLoop()
+        self._QTimer.singleShot(ms, loop.quit)
+        loop.exec()
+
+    def wait_until(self, predicate, timeout_s: float = 30.0) -> None:
+        deadline = time.perf_counter() + timeout_s
+        while not predicate():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("等待场景条件超时")
+            self.pump(5)
+
+    def current_url(self) -> str:
+        return self.dialog.webview.url().toString()
+
+    def wait_frame(self) -> None:
+        """等待页面渲染出下一帧"""
+        done = []
+        self.dialog.webview.page().runJavaScript(FRAME_SCRIPT, lambda _result: done.append(True))
+        self.wait_until(lambda: done)
+
+    def wait_painted(self, url_part: str) -> None:
+        """等待目标页面加载完成并渲染首帧"""
+        self.wait_until(lambda: url_part in self.current_url() and self.loads_in_flight == 0)
+        self.wait_frame()
+
+    def settle(self, quiet_ms: int = 500) -> None:
+        """等待页面不再有新的导航（页面自身脚本可能触发二次加载）"""
+        while True:
+            started = getattr(self, "last_load_started", 0)
+            self.pump(quiet_ms)
+            if self.loads_in_flight == 0 and getattr(self, "last_load_started", 0) == started:
+                return
+
+    def run_js(self, script: str) -> None:
+        self.dialog.webview.page().runJavaScript(script)
+
+    def load_local(self, name: str) -> None:
+        self.dialog.load_html_file(PROJECT_ROOT / name)
+        self.wait_painted(Path(name).stem)
+        self.settle()
+
+    def measure(self, action, url_part: str) -> float:
+        start = time.perf_counter()
+        action()
+        self.wait_painted(url_part)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.settle()
+        return elapsed
+
+
+def run_warm_scenarios(iterations: int) -> dict:
+    """在单个进程内重复运行交互场景"""
+    from main import DesktopApp
+
+    app = DesktopApp(sys.argv)
+    if getattr(app, "should_exit", False):
+        raise RuntimeError("已有实例在运行，无法启动基准测试")
+    driver = ScenarioDriver(app)
+    driver.wait_painted("登录")
+    driver.settle()
+
+    samples = {name: [] for name in (
+        "login_to_dashboard", "dashboard_to_settings", "settings_to_dashboard",
+        "theme_toggle_web", "theme_toggle_native",
+    )}
+
+    for _ in range(iterations):
+        if "登录" not in driver.current_url():
+            driver.load_local("01-登录.html")
+
+        samples["login_to_dashboard"].append(driver.measure(lambda: driver.run_js("""
+            document.getElementById('username').value = 'admin';
+            document.getElementById('password').value = 'password';
+            document.getElementById('loginForm').dispatchEvent(new Event('submit', {cancelable: true}));
+        """), "主页面"))
+
+        start = time.perf_counter()
+        driver.run_js("document.getElementById('themeToggle').click();")
+        driver.wait_frame()
+        samples["theme_toggle_web"].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        app.theme_manager.toggle_theme()
+        samples["theme_toggle_native"].append((time.perf_counter() - start) * 1000)
+
+        samples["dashboard_to_settings"].append(driver.measure(lambda: driver.run_js(
+            "document.querySelector('.function-card[data-title=\"系统管理\"]').click();"
+        ), "设置"))
+
+        samples["settings_to_dashboard"].append(driver.measure(
+            lambda: driver.run_js("history.back();"), "主页面"
+        ))
+
+    samples.update(run_first_clicks(driver, iterations))
+
+    driver.dialog.close()
+    return {name: percentiles(values) for name, values in samples.items()}
+
+
+def run_first_clicks(driver, iterations: int) -> dict:
+    """模块首次点击：在与主页面同一Profile的新页面中打开模块地址，测到loadFinished
+
+    这不是真实的点击路径：只测网络建连部分，不含卡片点击、ModuleWindow创建与模块缓存拦截，
+    对应的是程序内打开的模块（交给外部浏览器的模块不使用该Profile的连接池）。
+    每次使用新的无痕Profile（独立的连接池与DNS缓存），保证测到的是首次请求；
+    替身站点的每个新连接先等待 STUB_HANDSHAKE_SECONDS，模拟DNS、TCP与TLS握手。
+    """
+    from PyQt6.QtCore import QUrl
+    from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile
+    from bench_components import STUB_HANDSHAKE_SECONDS, _stub_site_url
+    from components.module_warmup import PRECONNECT_HOLD_MS, preconnect_page
+
+    site_url = _stub_site_url(STUB_HANDSHAKE_SECONDS)
+    samples = {"module_first_click_cold": [], "module_first_click_warm": []}
+    for _ in range(iterations):
+        for name, warm in (("module_first_click_cold", False), ("module_first_click_warm", True)):
+            profile = QWebEngineProfile(driver.app)
+            main_page = QWebEnginePage(profile, profile)
+            loaded = []
+            main_page.loadFinished.connect(loaded.append)
+            main_page.setHtml("<html><head></head><body></body></html>", QUrl.fromLocalFile(str(PROJECT_ROOT) + "/"))
+            driver.wait_until(lambda: loaded)
+            if warm:
+                preconnect_page(main_page, site_url.rstrip("/"))
+            # 两种情况等待相同时间（不计时），只有是否预连接不同
+            driver.pump(PRECONNECT_HOLD_MS)
+
+            module_page = QWebEnginePage(profile, profile)
+            finished = []
+            module_page.loadFinished.connect(finished.append)
+            start = time.perf_counter()
+            module_page.load(QUrl(site_url + "index.html"))
+            driver.wait_until(lambda: finished)
+            samples[name].append((time.perf_counter() - start) * 1000)
+
+            module_page.deleteLater()
+            main_page.deleteLater()
+            profile.deleteLater()
+            driver.pump(50)
+    return samples
+
+
+def run_cold_child() -> None:
+    """子进程：启动应用直到登录页首帧，输出完成时刻（epoch秒）"""
+    from main import DesktopApp
+
+    app = DesktopApp(sys.argv)
+    driver = ScenarioDriver(app)
+    driver.wait_painted("登录")
+    print(json.dumps({"painted_at": time.time()}))
+    sys.stdout.flush()
+    driver.dialog.close()
+
+
+def run_cold_starts(iterations: int, workdir: Path) -> dict:
+    """每次冷启动都使用新的子进程"""
+    env = dict(os.environ)
+    samples = []
+    for _ in range(iterations):
+        started_at = time.time()
+        completed = subprocess.run(
+            [sys.executable, __file__, "--child-cold", "--workdir", str(workdir)],
+            env=env, capture_output=True, text=True, timeout=120
+        )
+        lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+        if not lines:
+            print(f"✗ 冷启动子进程失败:\n{completed.stderr[-2000:]}")
+            continue
+        samples.append((json.loads(lines[-1])["painted_at"] - started_at) * 1000)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端界面场景基准测试")
+    parser.add_argument("--iterations", type=int, default=10, help="交互场景重复次数")
+    parser.add_argument("--cold-iterations", type=int, default=5, help="冷启动次数")
+    parser.add_argument("--json", help="将结果写入JSON文件")
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--child-cold", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dm-scenarios-") as tmp:
+        workdir = Path(args.workdir or tmp)
+        prepare_environment(workdir)
+
+        if args.child_cold:
+            run_cold_child()
+            return
+
+        results = {"cold_start": run_cold_starts(args.cold_iterations, workdir)}
+        results.update(run_warm_scenarios(args.iterations))
+
+    print(f"{'场景':<24}{'n':>4}{'p50':>10}{'p90':>10}{'p95':>10}{'max':>10}  (ms)")
+    for name, stats in results.items():
+        if stats:
+            print(f"{name:<24}{stats['n']:>4}{stats['p50']:>10}{stats['p90']:>10}{stats['p95']:>10}{stats['max']:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
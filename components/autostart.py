@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+开机自启动
+Windows写入当前用户的Run注册表项，Linux写入XDG autostart目录；
+自启动时带 --standby 参数，启用待机模式时直接驻留托盘；
+设置前先读取系统中实际的自启动项，与期望的命令行一致时不改写
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 自启动时附加的命令行参数
+STANDBY_ARG = "--standby"
+
+WINDOWS_RUN_KEY = "HKEY_CURRENT_USER\\Software\\Microsoft\\Windows\\CurrentVersion\\Run"
+
+
+def get_launch_command() -> List[str]:
+    """获取自启动命令（打包后为exe本身，开发环境为解释器 + main.py）"""
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, STANDBY_ARG]
+    main_script = Path(__file__).resolve().parent.parent / "main.py"
+    return [sys.executable, str(main_script), STANDBY_ARG]
+
+
+def _get_desktop_entry_path(app_id: str) -> Path:
+    config_home = os.environ.get('XDG_CONFIG_HOME') or str(Path.home() / ".config")
+    return Path(config_home) / "autostart" / f"{app_id}.desktop"
+
+
+def _get_desktop_exec_line(command: List[str]) -> str:
+    return " ".join(f'"{arg}"' for arg in command)
+
+
+def get_auto_start_command(app_id: str) -> Optional[str]:
+    """读取系统中实际的自启动命令行
+
+    Args:
+        app_id: 应用标识（注册表值名/desktop文件名）
+
+    Returns:
+        Windows为Run注册表值，Linux为desktop文件的Exec；没有自启动项（或平台不支持）时返回None
+    """
+    try:
+        if sys.platform == "win32":
+            from PyQt6.QtCore import QSettings
+            settings = QSettings(WINDOWS_RUN_KEY, QSettings.Format.NativeFormat)
+            value = settings.value(app_id)
+            return str(value) if value is not None else None
+
+        if sys.platform.startswith("linux"):
+            entry_path = _get_desktop_entry_path(app_id)
+            if not entry_path.exists():
+                return None
+            for line in entry_path.read_text(encoding='utf-8').splitlines():
+                if line.startswith("Exec="):
+                    return line[len("Exec="):]
+            return ""
+    except OSError as e:
+        logger.warning(f"读取开机自启动项失败: {e}")
+    return None
+
+
+def set_auto_start(app_id: str, app_name: str, enabled: bool) -> bool:
+    """设置开机自启动（系统中的自启动项已符合要求时不改写）
+
+    Args:
+        app_id: 应用标识（注册表值名/desktop文件名）
+        app_name: 应用显示名称
+        enabled: 是否启用
+
+    Returns:
+        是否设置成功（不支持的平台返回False）
+    """
+    command = get_launch_command()
+    if sys.platform == "win32":
+        desired = subprocess.list2cmdline(command) if enabled else None
+    elif sys.platform.startswith("linux"):
+        desired = _get_desktop_exec_line(command) if enabled else None
+    else:
+        logger.info(f"当前平台不支持开机自启动: {sys.platform}")
+        return False
+    if get_auto_start_command(app_id) == desired:
+        return True
+
+    try:
+        if sys.platform == "win32":
+            from PyQt6.QtCore import QSettings
+            settings = QSettings(WINDOWS_RUN_KEY, QSettings.Format.NativeFormat)
+            if enabled:
+                settings.setValue(app_id, desired)
+            else:
+                settings.remove(app_id)
+            settings.sync()
+            return settings.status() == QSettings.Status.NoError
+
+        if sys.platform.startswith("linux"):
+            entry_path = _get_desktop_entry_path(app_id)
+            if not enabled:
+                entry_path.unlink(missing_ok=True)
+                return True
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            exec_line = desired
+            entry_path.write_text(
+                "[Desktop Entry]\n"
+                "Type=Application\n"
+                f"Name={app_name}\n"
+                f"Exec={exec_line}\n"
+                "X-GNOME-Autostart-enabled=true\n",
+                encoding='utf-8'
+            )
+            return True
+    except OSError as e:
+        logger.warning(f"设置开机自启动失败: {e}")
+    return False
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+外部浏览器启动服务
+在后台线程中解析并调用系统浏览器，避免阻塞GUI线程
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# default_browser设置值 -> webbrowser注册名/可执行文件候选
+BROWSER_CANDIDATES = {
+    "chrome": ["chrome", "google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+    "firefox": ["firefox"],
+    "edge": ["msedge", "microsoft-edge", "microsoft-edge-stable"],
+    "safari": ["safari"],
+}
+
+# Windows下常见安装位置（这些浏览器通常不在PATH中）
+WINDOWS_BROWSER_PATHS = {
+    "chrome": [
+        r"%ProgramFiles%\Google\Chrome\Application\chrome.exe",
+        r"%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe",
+        r"%LocalAppData%\Google\Chrome\Application\chrome.exe",
+    ],
+    "firefox": [
+        r"%ProgramFiles%\Mozilla Firefox\firefox.exe",
+        r"%ProgramFiles(x86)%\Mozilla Firefox\firefox.exe",
+    ],
+    "edge": [
+        r"%ProgramFiles(x86)%\Microsoft\Edge\Application\msedge.exe",
+        r"%ProgramFiles%\Microsoft\Edge\Application\msedge.exe",
+    ],
+}
+
+
+class BrowserLauncher(QObject):
+    """外部浏览器启动服务类"""
+
+    launch_finished = pyqtSignal(str, bool, float)  # url, 是否成功, 耗时(毫秒)
+
+    def __init__(self, browser: str = "system", dedupe_interval: float = 1.0, parent=None):
+        """初始化浏览器启动服务
+
+        Args:
+            browser: 浏览器名称（对应default_browser设置：system/chrome/firefox/edge/safari）
+            dedupe_interval: 同一URL重复打开的去重间隔（秒）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._browser = browser or "system"
+        self._dedupe_interval = dedupe_interval
+        self._controller = None
+        self._resolved = False
+        self._lock = threading.Lock()
+        self._recent = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser-launcher")
+
+    def set_browser(self, browser: str) -> None:
+        """切换使用的浏览器，下次启动时重新解析
+
+        Args:
+            browser: 浏览器名称
+        """
+        browser = browser or "system"
+        # 每次打开外部链接都会调用，未变化时不获取锁
+        if browser == self._browser:
+            return
+        with self._lock:
+            if browser != self._browser:
+                self._browser = browser
+                self._controller = None
+                self._resolved = False
+
+    def get_browser(self) -> str:
+        """获取当前配置的浏览器名称"""
+        return self._browser
+
+    def open(self, url: str) -> bool:
+        """异步打开URL
+
+        Args:
+            url: 要打开的URL
+
+        Returns:
+            是否已提交启动（重复点击被去重时返回False）
+        """
+        if not url:
+            return False
+
+        now = time.monotonic()
+        last = self._recent.get(url)
+        if last is not None and now - last < self._dedupe_interval:
+            logger.info(f"忽略重复的外部链接打开请求: {url}")
+            return False
+        self._recent = {u: t for u, t in self._recent.items() if now - t < self._dedupe_interval}
+        self._recent[url] = now
+
+        self._executor.submit(self._launch, url, now)
+        return True
+
+    def warm_up(self) -> None:
+        """在后台预先解析浏览器，使首次点击不再承担探测开销"""
+        self._executor.submit(self._get_controller)
+
+    def shutdown(self) -> None:
+        """停止后台线程（不等待正在进行的启动）"""
+        self._executor.shutdown(wait=False)
+
+    def _launch(self, url: str, requested_at: float) -> None:
+        """在工作线程中启动浏览器"""
+        success = False
+        try:
+            controller = self._get_controller()
+            success = bool(controller.open(url)) if controller else bool(webbrowser.open(url))
+        except Exception as e:
+            logger.error(f"打开外部链接失败: {url}: {e}")
+
+        elapsed_ms = (time.monotonic() - requested_at) * 1000
+        logger.info(f"外部链接启动{'成功' if success else '失败'}: {url} ({elapsed_ms:.1f} ms)")
+        self.launch_finished.emit(url, success, elapsed_ms)
+
+    def _get_controller(self):
+        """解析并缓存浏览器控制器（只在首次使用时探测）
+
+        探测不持有锁（GUI线程的 set_browser 不会被阻塞），完成后在锁内换入；
+        探测期间浏览器被切换时按新的名称重新探测。
+        """
+        while True:
+            with self._lock:
+                if self._resolved:
+                    return self._controller
+                browser = self._browser
+
+            start = time.monotonic()
+            controller = self._resolve_controller(browser)
+            with self._lock:
+                if browser != self._browser:
+                    continue
+                self._controller = controller
+                self._resolved = True
+            logger.info(
+                f"浏览器解析完成: {browser} -> {getattr(controller, 'name', controller)} "
+                f"({(time.monotonic() - start) * 1000:.1f} ms)"
+            )
+            return controller
+
+    def _resolve_controller(self, browser: str):
+        """按名称解析webbrowser控制器，找不到时回退到系统默认浏览器"""
+        if browser != "system":
+            for name in BROWSER_CANDIDATES.get(browser, [browser]):
+                try:
+                    return webbrowser.get(name)
+                except webbrowser.Error:
+                    pass
+
+            executable = self._find_executable(browser)
+            if executable:
+                webbrowser.register(browser, None, webbrowser.BackgroundBrowser(executable))
+                return webbrowser.get(browser)
+
+            logger.warning(f"未找到浏览器 {browser}，使用系统默认浏览器")
+
+        try:
+            return webbrowser.get()
+        except webbrowser.Error:
+            return None
+
+    def _find_executable(self, browser: str) -> str:
+        """在PATH及Windows常见安装目录中查找浏览器可执行文件"""
+        for name in BROWSER_CANDIDATES.get(browser, [browser]):
+            path = shutil.which(name)
+            if path:
+                return path
+
+        if sys.platform == "win32":
+            for raw_path in WINDOWS_BROWSER_PATHS.get(browser, []):
+                path = os.path.expandvars(raw_path)
+                if os.path.exists(path):
+                    return path
+
+        return ""
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令面板索引
+内存中的n-gram倒排索引（1~3字符），倒排表为整数位图（每个条目一位，交并差只需几微秒）：
+查询词不超过3个字符时直接取倒排表，更长时取各三元组倒排表的交集，选取结果时再校验完整子串；
+多个查询词（空格分隔）取交集。命中按标题倒排表分为若干得分组，从高分组起按标题长度取条目，取够即停，
+不为每个命中计算得分。条目按ID增删，目录或设置变化时只更新变化的条目
+"""
+
+import bisect
+import heapq
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# 倒排索引的最大n-gram长度
+MAX_GRAM = 3
+
+# 各字段命中的得分（标题优先）
+SCORE_TITLE_PREFIX = 100
+SCORE_TITLE_WORD = 60
+SCORE_TITLE = 40
+SCORE_OTHER = 20
+
+# 最近使用的条目额外加分（按最近程度递减）
+SCORE_RECENT = 30
+
+# 标题每个字符的扣分（同分时短标题优先）
+SCORE_LENGTH = 0.01
+
+# 命中数不超过该值（或查询词多于 MAX_BUCKET_TERMS 个）时直接为全部命中计算得分
+SCAN_THRESHOLD = 64
+MAX_BUCKET_TERMS = 3
+
+# 得分组不超过该条目数时排序取条目，否则沿标题长度顺序扫描
+SORT_THRESHOLD = 512
+
+
+def normalize_text(text: str) -> str:
+    """统一为小写（索引与查询使用同一规则）"""
+    return text.casefold()
+
+
+def _grams(text: str, starts: Optional[Iterable[int]] = None) -> set:
+    """文本中长度为1~3的子串
+
+    Args:
+        text: 文本
+        starts: 只取从这些位置开始的子串，为None时取全部
+    """
+    grams = set()
+    for i in range(len(text)) if starts is None else starts:
+        for size in range(1, MAX_GRAM + 1):
+            if i + size <= len(text):
+                grams.add(text[i:i + size])
+    return grams
+
+
+def _word_starts(title: str) -> List[int]:
+    """标题中各单词的起始位置（开头及非字母数字字符之后）"""
+    return [i for i in range(len(title)) if i == 0 or not title[i - 1].isalnum()]
+
+
+def _word_hit(title: str, term: str) -> bool:
+    """标题中是否有单词以查询词开头"""
+    position = title.find(term)
+    while position >= 0:
+        if position == 0 or not title[position - 1].isalnum():
+            return True
+        position = title.find(term, position + 1)
+    return False
+
+
+def _index_grams(title: str, text: str) -> tuple:
+    """条目在各倒排表中的n-gram：全部文本、标题开头、标题单词开头、标题任意位置"""
+    return _grams(text), _grams(title, [0]), _grams(title, _word_starts(title)), _grams(title)
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """位图中置位的编号（从小到大）"""
+    digits = bin(mask)[:1:-1]
+    position = digits.find("1")
+    while position >= 0:
+        yield position
+        position = digits.find("1", position + 1)
+
+
+class CommandIndex:
+    """命令面板索引类
+
+    条目为字典：id（唯一）、kind（module/setting/config/command）、title、subtitle、keywords（可选），
+    其余字段原样保留供执行时使用。倒排表中使用内部编号（删除的编号会被复用，位图保持紧凑）。
+    """
+
+    def __init__(self):
+        self._entries = {}  # id -> 条目
+        self._docs = {}  # id -> 内部编号
+        self._ids = []  # 内部编号 -> id
+        self._titles = []  # 内部编号 -> 标题
+        self._texts = []  # 内部编号 -> 全部可搜索文本
+        self._free = []  # 可复用的内部编号
+        self._postings = {}  # n-gram -> 位图
+        # 标题中的n-gram（用于按得分分组）：开头、单词开头、任意位置
+        self._title_postings = ({}, {}, {})
+        self._order = []  # (标题长度, 内部编号)，按标题从短到长排列
+        self._recent = []  # 最近使用的条目ID（最近的在前）
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """按ID获取条目"""
+        return self._entries.get(entry_id)
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """添加或更新条目（可搜索文本未变化时不重建倒排表）
+
+        Args:
+            entry: 条目
+        """
+        entry_id = entry["id"]
+        title = normalize_text(entry.get("title", ""))
+        text = "\n".join(
+            normalize_text(part) for part in (entry.get("title", ""), entry.get("subtitle", ""), entry.get("keywords", "")) if part
+        )
+        self._entries[entry_id] = entry
+        doc = self._docs.get(entry_id)
+        if doc is not None:
+            if self._titles[doc] == title and self._texts[doc] == text:
+                return
+            self._unindex(doc)
+        elif self._free:
+            doc = self._docs[entry_id] = self._free.pop()
+        else:
+            doc = self._docs[entry_id] = len(self._ids)
+            self._ids.append(None)
+            self._titles.append("")
+            self._texts.append("")
+        self._ids[doc], self._titles[doc], self._texts[doc] = entry_id, title, text
+
+        bit = 1 << doc
+        for postings, grams in zip((self._postings,) + self._title_postings, _index_grams(title, text)):
+            for gram in grams:
+                postings[gram] = postings.get(gram, 0) | bit
+        bisect.insort(self._order, (len(title), doc))
+
+    def remove(self, entry_id: str) -> None:
+        """删除条目
+
+        Args:
+            entry_id: 条目ID
+        """
+        if entry_id in self._entries:
+            del self._entries[entry_id]
+            doc = self._docs.pop(entry_id)
+            self._unindex(doc)
+            self._ids[doc], self._titles[doc], self._texts[doc] = None, "", ""
+            self._free.append(doc)
+
+    def replace_kind(self, kind: str, entries: Iterable[Dict[str, Any]], group: Optional[str] = None) -> None:
+        """用新的条目集合替换某一类条目（只增删改有变化的条目）
+
+        Args:
+            kind: 条目类别
+            entries: 该类别（及分组）的全部条目
+            group: 只替换该类别中 group 字段等于此值的条目，为None时替换整个类别
+        """
+        new_ids = set()
+        for entry in entries:
+            new_ids.add(entry["id"])
+            if self._entries.get(entry["id"]) != entry:
+                self.add(entry)
+        for entry_id in [
+            entry_id for entry_id, entry in self._entries.items()
+            if entry["kind"] == kind and (group is None or entry.get("group") == group)
+        ]:
+            if entry_id not in new_ids:
+                self.remove(entry_id)
+
+    def set_recent(self, entry_ids: List[str]) -> None:
+        """设置最近使用的条目（最近的在前）"""
+        self._recent = list(entry_ids)
+
+    def get_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """获取最近使用且仍存在的条目"""
+        return [self._entries[entry_id] for entry_id in self._recent if entry_id in self._entries][:limit]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """查询条目
+
+        Args:
+            query: 查询文本，空格分隔的多个词需全部命中；为空时返回最近使用的条目
+            limit: 最多返回的条目数
+
+        Returns:
+            按得分从高到低排列的条目
+        """
+        terms = normalize_text(query).split()
+        if not terms:
+            return self.get_recent(limit)
+
+        candidates = -1
+        for term in terms:
+            candidates &= self._term_mask(term)
+            if not candidates:
+                return []
+
+        # 超过三个字符的查询词只按三元组筛选，选取结果时再校验
+        long_terms = [term for term in terms if len(term) > MAX_GRAM]
+        texts = self._texts
+
+        def matches(doc):
+            return all(term in texts[doc] for term in long_terms)
+
+        # 最近使用的条目单独计算（带加分），分组取条目时跳过
+        scored = []
+        for rank, entry_id in enumerate(self._recent):
+            doc = self._docs.get(entry_id)
+            if doc is not None and candidates >> doc & 1:
+                candidates &= ~(1 << doc)
+                if matches(doc):
+                    bonus = SCORE_RECENT * (1 - rank / (len(self._recent) + 1))
+                    scored.append((self._score(doc, terms) + bonus, doc))
+
+        if candidates.bit_count() <= SCAN_THRESHOLD or len(terms) > MAX_BUCKET_TERMS:
+            scored.extend((self._score(doc, terms), doc) for doc in _bits(candidates) if matches(doc))
+        else:
+            # 得分组的分数是组内条目得分的上限（长查询词按三元组估计）：
+            # 组内按标题从短到长取条目，得分等于上限的取够limit个即可结束，低于上限的照常参与排序
+            remaining = limit
+            for bound, mask in self._buckets(candidates, terms):
+                for doc in self._by_length(mask):
+                    if not matches(doc):
+                        continue
+                    base = self._base_score(doc, terms)
+                    scored.append((base - len(self._titles[doc]) * SCORE_LENGTH, doc))
+                    if base == bound:
+                        remaining -= 1
+                        if remaining == 0:
+                            break
+                if remaining == 0:
+                    break
+        return [self._entries[self._ids[doc]] for _, doc in heapq.nlargest(limit, scored)]
+
+    def _term_mask(self, term: str) -> int:
+        """包含查询词的条目位图（超过三个字符时为各三元组的交集，可能多于实际命中）"""
+        if len(term) <= MAX_GRAM:
+            return self._postings.get(term, 0)
+        mask = -1
+        for i in range(len(term) - MAX_GRAM + 1):
+            mask &= self._postings.get(term[i:i + MAX_GRAM], 0)
+            if not mask:
+                break
+        return mask
+
+    def _buckets(self, candidates: int, terms: List[str]) -> List[tuple]:
+        """按得分上限（不含标题长度扣分）将命中的条目分组
+
+        Returns:
+            [(得分上限, 位图)]，按得分从高到低
+        """
+        per_term = []
+        for term in terms:
+            gram = term[:MAX_GRAM]
+            prefix, word, title = (postings.get(gram, 0) & candidates for postings in self._title_postings)
+            tiers = [
+                (SCORE_TITLE_PREFIX, prefix), (SCORE_TITLE_WORD, word & ~prefix),
+                (SCORE_TITLE, title & ~word), (SCORE_OTHER, candidates & ~title),
+            ]
+            per_term.append([(score, mask) for score, mask in tiers if mask])
+
+        buckets = {}
+        for combination in itertools.product(*per_term):
+            mask = candidates
+            for _, tier in combination:
+                mask &= tier
+            if mask:
+                score = sum(score for score, _ in combination)
+                buckets[score] = buckets.get(score, 0) | mask
+        return sorted(buckets.items(), reverse=True)
+
+    def _by_length(self, mask: int) -> Iterator[int]:
+        """位图中的条目，按标题从短到长"""
+        if mask.bit_count() <= SORT_THRESHOLD:
+            yield from sorted(_bits(mask), key=lambda doc: (len(self._titles[doc]), doc))
+            return
+        # 条目较多时沿长度顺序扫描，通常很快取够
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        size = len(data)
+        for _, doc in self._order:
+            index = doc >> 3
+            if index < size and data[index] >> (doc & 7) & 1:
+                yield doc
+
+    def _base_score(self, doc: int, terms: List[str]) -> int:
+        """各查询词的命中得分之和（不含标题长度扣分）"""
+        title = self._titles[doc]
+        score = 0
+        for term in terms:
+            if title.startswith(term):
+                score += SCORE_TITLE_PREFIX
+            elif term in title:
+                score += SCORE_TITLE_WORD if _word_hit(title, term) else SCORE_TITLE
+            else:
+                score += SCORE_OTHER
+        return score
+
+    def _score(self, doc: int, terms: List[str]) -> float:
+        return self._base_score(doc, terms) - len(self._titles[doc]) * SCORE_LENGTH
+
+    def _unindex(self, doc: int) -> None:
+        title, text = self._titles[doc], self._texts[doc]
+        keep = ~(1 << doc)
+        for postings, grams in zip((self._postings,) + self._title_postings, _index_grams(title, text)):
+            for gram in grams:
+                mask = postings.get(gram, 0) & keep
+                if mask:
+                    postings[gram] = mask
+                else:
+                    postings.pop(gram, None)
+        position = bisect.bisect_left(self._order, (len(title), doc))
+        if position < len(self._order) and self._order[position] == (len(title), doc):
+            del self._order[position]
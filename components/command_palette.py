@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令面板
+Ctrl+K 打开的原生弹出框：在内存索引中搜索模块、设置页面的设置项、设置键与页面命令，并列出最近使用的条目。
+模块目录或设置变化时只更新变化的条目
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from PyQt6.QtCore import Qt, QEvent, pyqtSignal
+from PyQt6.QtWidgets import QFrame, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout
+
+from components.command_index import CommandIndex
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+SETTINGS_PAGE = "03-设置.html"
+
+# 页面命令（action 由 LoginDialog.run_command 执行）
+PAGE_COMMANDS = [
+    {"id": "command:main", "kind": "command", "title": "主页面", "subtitle": "返回主页面",
+     "action": "page", "target": "02-主页面.html"},
+    {"id": "command:settings", "kind": "command", "title": "设置", "subtitle": "打开设置页面",
+     "action": "page", "target": SETTINGS_PAGE},
+    {"id": "command:downloads", "kind": "command", "title": "下载", "subtitle": "显示下载面板",
+     "action": "downloads", "keywords": "download"},
+    {"id": "command:new_session", "kind": "command", "title": "新建会话窗口", "subtitle": "使用独立的登录状态",
+     "action": "session", "keywords": "session"},
+]
+
+# 不作为设置键条目的设置（由命令面板自身维护）
+HIDDEN_CONFIG_KEYS = {"command_palette.recent"}
+
+# 设置键条目中显示的值的最大长度
+MAX_VALUE_TEXT = 80
+
+KIND_ICONS = {"module": "📦", "setting": "⚙️", "config": "🔧", "command": "▶"}
+
+_SECTION_RE = re.compile(
+    r'<section class="settings-section[^"]*" id="(?P<section>[\w-]+)-settings">.*?'
+    r'<h2 class="section-title">(?P<title>[^<]*)</h2>', re.S
+)
+_ITEM_RE = re.compile(
+    r'<div class="setting-label">(?P<label>[^<]*)</div>\s*'
+    r'(?:<div class="setting-description">(?P<description>[^<]*)</div>)?'
+)
+
+
+def settings_page_entries(html_path: Path) -> List[Dict[str, Any]]:
+    """解析设置页面的分区与设置项
+
+    Args:
+        html_path: 设置页面文件路径
+
+    Returns:
+        条目列表（kind为setting，section为分区名，label为设置项名称，分区本身的label为空）
+    """
+    try:
+        html = html_path.read_text(encoding='utf-8')
+    except OSError as e:
+        logger.warning(f"读取设置页面失败，命令面板不包含设置项: {e}")
+        return []
+
+    entries = []
+    sections = list(_SECTION_RE.finditer(html))
+    for i, match in enumerate(sections):
+        section, section_title = match.group("section"), match.group("title").strip()
+        entries.append({
+            "id": f"setting:{section}", "kind": "setting", "title": section_title, "subtitle": "设置",
+            "section": section, "label": "",
+        })
+        end = sections[i + 1].start() if i + 1 < len(sections) else len(html)
+        for item in _ITEM_RE.finditer(html, match.end(), end):
+            label = item.group("label").strip()
+            entries.append({
+                "id": f"setting:{section}:{label}", "kind": "setting", "title": label,
+                "subtitle": f"设置 › {section_title}", "keywords": (item.group("description") or "").strip(),
+                "section": section, "label": label,
+            })
+    return entries
+
+
+def module_entries(modules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """由模块目录生成条目"""
+    return [
+        {
+            "id": f"module:{module['id']}", "kind": "module", "title": module["title"], "subtitle": module["url"],
+            "keywords": " ".join([module["description"]] + module["departments"]), "url": module["url"],
+        }
+        for module in modules
+    ]
+
+
+def config_entries(settings_manager, prefix: str = "") -> List[Dict[str, Any]]:
+    """由设置键生成条目（标题为设置键，副标题为当前值）
+
+    Args:
+        settings_manager: 设置管理器实例
+        prefix: 只生成该键下的条目，为空时生成全部
+    """
+    entries = []
+    for key, value in settings_manager.iter_items(prefix):
+        if key in HIDDEN_CONFIG_KEYS:
+            continue
+        text = json.dumps(value, ensure_ascii=False)
+        if len(text) > MAX_VALUE_TEXT:
+            text = text[:MAX_VALUE_TEXT - 1] + "…"
+        entries.append({
+            "id": f"config:{key}", "kind": "config", "title": key, "subtitle": text,
+            "group": key.split(".", 1)[0], "key": key,
+        })
+    return entries
+
+
+class CommandPalette(QFrame):
+    """命令面板类"""
+
+    command_triggered = pyqtSignal(dict)  # 选择的条目
+
+    def __init__(self, settings_manager, module_catalog, parent=None):
+        """初始化命令面板并建立索引
+
+        Args:
+            settings_manager: 设置管理器实例
+            module_catalog: 模块目录（变化时更新模块条目）
+            parent: 父窗口（面板显示在其上方居中）
+        """
+        super().__init__(parent, Qt.WindowType.Popup)
+        self.settings_manager = settings_manager
+        self.module_catalog = module_catalog
+        self.index = CommandIndex()
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("搜索模块、设置与命令…")
+        self.search_input.textChanged.connect(self._on_query_changed)
+        self.search_input.installEventFilter(self)
+        self.result_list = QListWidget()
+        self.result_list.itemActivated.connect(self._trigger_item)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.result_list)
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.resize(560, 400)
+
+        started = time.perf_counter()
+        for entry in PAGE_COMMANDS:
+            self.index.add(entry)
+        for entry in settings_page_entries(Path(__file__).parent.parent / SETTINGS_PAGE):
+            self.index.add(entry)
+        self.index.replace_kind("config", config_entries(settings_manager))
+        self.index.replace_kind("module", module_entries(module_catalog.get_modules()))
+        self.index.set_recent(settings_manager.get('command_palette.recent', []))
+        logger.info(f"命令面板索引已建立: {len(self.index)} 个条目，耗时 {(time.perf_counter() - started) * 1000:.1f}ms")
+
+        module_catalog.catalog_changed.connect(self._on_catalog_changed)
+        settings_manager.add_change_listener(self._on_setting_changed)
+
+    def show_palette(self) -> None:
+        """在父窗口上方居中显示面板（保留上次的查询文本）"""
+        parent = self.parentWidget()
+        if parent is not None:
+            geometry = parent.geometry()
+            self.move(geometry.x() + (geometry.width() - self.width()) // 2, geometry.y() + geometry.height() // 8)
+        self._on_query_changed(self.search_input.text())
+        self.search_input.selectAll()
+        self.show()
+        self.search_input.setFocus()
+
+    def shutdown(self) -> None:
+        """断开目录与设置的变化通知"""
+        self.module_catalog.catalog_changed.disconnect(self._on_catalog_changed)
+        self.settings_manager.remove_change_listener(self._on_setting_changed)
+
+    def eventFilter(self, obj, event):
+        """输入框中的上下键移动选中项，回车执行"""
+        if obj is self.search_input and event.type() == QEvent.Type.KeyPress:
+            key = event.key()
+            if key in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                row = self.result_list.currentRow() + (1 if key == Qt.Key.Key_Down else -1)
+                if 0 <= row < self.result_list.count():
+                    self.result_list.setCurrentRow(row)
+                return True
+            if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                item = self.result_list.currentItem()
+                if item is not None:
+                    self._trigger_item(item)
+                return True
+        return super().eventFilter(obj, event)
+
+    def _on_query_changed(self, text: str) -> None:
+        limit = int(self.settings_manager.get('command_palette.max_results', 20))
+        started = time.perf_counter()
+        results = self.index.search(text, limit)
+        metrics.histogram("command_palette.query_ms", "命令面板查询耗时").observe(
+            (time.perf_counter() - started) * 1000
+        )
+        if not text.strip() and not results:
+            results = PAGE_COMMANDS
+
+        self.result_list.clear()
+        for entry in results:
+            item = QListWidgetItem(f"{KIND_ICONS.get(entry['kind'], '')} {entry['title']}\n    {entry.get('subtitle', '')}")
+            item.setData(Qt.ItemDataRole.UserRole, entry["id"])
+            self.result_list.addItem(item)
+        if results:
+            self.result_list.setCurrentRow(0)
+
+    def _trigger_item(self, item: QListWidgetItem) -> None:
+        entry = self.index.get(item.data(Qt.ItemDataRole.UserRole))
+        if entry is None:
+            return
+        self.hide()
+        self._record_recent(entry["id"])
+        self.command_triggered.emit(entry)
+
+    def _record_recent(self, entry_id: str) -> None:
+        """记录最近使用的条目（随设置一起保存）"""
+        max_recent = int(self.settings_manager.get('command_palette.max_recent', 10))
+        recent = [entry_id] + [i for i in self.settings_manager.get('command_palette.recent', []) if i != entry_id]
+        self.settings_manager.set('command_palette.recent', recent[:max_recent])
+        self.index.set_recent(recent[:max_recent])
+
+    def _on_catalog_changed(self, delta: Dict[str, Any]) -> None:
+        for module_id in delta["removed"]:
+            self.index.remove(f"module:{module_id}")
+        for entry in module_entries(delta["added"] + delta["updated"]):
+            self.index.add(entry)
+
+    def _on_setting_changed(self, key: str) -> None:
+        if key in HIDDEN_CONFIG_KEYS:
+            return
+        if key.startswith("urls.") or not key or key == "urls":
+            # 未配置远程清单时内置模块由 urls 设置生成
+            self.index.replace_kind("module", module_entries(self.module_catalog.get_modules()))
+        # 只重建变化的顶层设置下的条目
+        group = key.split(".", 1)[0]
+        self.index.replace_kind("config", config_entries(self.settings_manager, group), group=group or None)
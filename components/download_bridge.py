@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下载管理的WebEngine接入
+Profile发起的http/https下载交给 DownloadManager 重新请求（带上该Profile的Cookie与User-Agent），
+WebEngine的原下载先接受并暂停，重新请求得不到文件时（表单POST生成的导出、一次性地址等）继续由WebEngine保存；
+blob:/data: 等由页面脚本生成的下载无法重新请求，直接由WebEngine保存到下载目录
+"""
+
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+from PyQt6.QtCore import QObject
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ProfileCookieMirror(QObject):
+    """Profile Cookie的只读副本（cookie存储只提供增删通知，下载线程需要按URL取Cookie）"""
+
+    def __init__(self, profile):
+        """初始化并加载Profile的全部Cookie
+
+        Args:
+            profile: QWebEngineProfile实例
+        """
+        super().__init__(profile)
+        self._lock = threading.Lock()
+        self._cookies = {}  # (domain, path, name) -> (value, secure)
+        self.user_agent = profile.httpUserAgent()
+        store = profile.cookieStore()
+        store.cookieAdded.connect(self._on_cookie_added)
+        store.cookieRemoved.connect(self._on_cookie_removed)
+        store.loadAllCookies()
+
+    def headers_for(self, url: str) -> Dict[str, str]:
+        """获取请求URL需要的请求头（可在下载线程调用）
+
+        Args:
+            url: 请求URL
+
+        Returns:
+            包含User-Agent与Cookie（有匹配时）的字典
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        path = parts.path or "/"
+        with self._lock:
+            cookies = [
+                f"{name}={value}"
+                for (domain, cookie_path, name), (value, secure) in self._cookies.items()
+                if _domain_matches(host, domain) and path.startswith(cookie_path)
+                and (parts.scheme == "https" or not secure)
+            ]
+        headers = {"User-Agent": self.user_agent}
+        if cookies:
+            headers["Cookie"] = "; ".join(cookies)
+        return headers
+
+    def _key(self, cookie):
+        return cookie.domain().lower(), cookie.path() or "/", bytes(cookie.name()).decode('latin-1')
+
+    def _on_cookie_added(self, cookie) -> None:
+        with self._lock:
+            self._cookies[self._key(cookie)] = (bytes(cookie.value()).decode('latin-1'), cookie.isSecure())
+
+    def _on_cookie_removed(self, cookie) -> None:
+        with self._lock:
+            self._cookies.pop(self._key(cookie), None)
+
+
+class NativeDownloadFallback(QObject):
+    """接管的下载在重新请求开始传输前，保留WebEngine的原下载（已接受并暂停）作为后备"""
+
+    def __init__(self, manager, parent=None):
+        """初始化并监听下载状态
+
+        Args:
+            manager: DownloadManager实例
+            parent: 父对象（Profile）
+        """
+        super().__init__(parent)
+        self.manager = manager
+        self._held = {}  # 下载ID -> WebEngine的下载请求
+        manager.download_updated.connect(self._on_download_updated)
+
+    def hold(self, download_id: str, request) -> None:
+        """暂停WebEngine的下载，等待重新请求的结果
+
+        Args:
+            download_id: DownloadManager中的下载ID
+            request: 已接受的QWebEngineDownloadRequest
+        """
+        self._held[download_id] = request
+        request.pause()
+        # 接受后下载可能尚未开始（此时暂停无效），开始后再暂停
+        request.stateChanged.connect(lambda _state, d=download_id: self._pause_held(d))
+
+    def _pause_held(self, download_id: str) -> None:
+        request = self._held.get(download_id)
+        if request is not None and not request.isPaused():
+            request.pause()
+
+    def _on_download_updated(self, info: Dict) -> None:
+        request = self._held.get(info["id"])
+        if request is None:
+            return
+        if info["state"] in ("transferring", "completed", "cancelled"):
+            # 重新请求已成功读到数据（或用户取消了下载），不再需要原下载；
+            # downloading 只表示请求已发出，分块请求仍可能失败，此时还要保留原下载
+            del self._held[info["id"]]
+            request.cancel()
+        elif info["state"] == "failed":
+            # 请求失败、非2xx状态或返回了网页：撤销接管的记录，由WebEngine继续原下载
+            del self._held[info["id"]]
+            self.manager.cancel(info["id"])
+            request.resume()
+            logger.info(f"重新请求下载失败（{info['error']}），由WebEngine保存: {request.downloadFileName()}")
+
+
+def _domain_matches(host: str, domain: str) -> bool:
+    """以"."开头的为域Cookie（含子域），否则只匹配同一主机"""
+    if domain.startswith("."):
+        return host == domain[1:] or host.endswith(domain)
+    return host == domain
+
+
+def install_download_handler(profile, manager, session: str, on_started=None) -> ProfileCookieMirror:
+    """接管Profile的下载请求
+
+    Args:
+        profile: QWebEngineProfile实例
+        manager: DownloadManager实例
+        session: 会话名称（默认会话为空字符串）
+        on_started: 开始下载后的回调（如显示下载面板），可为None
+
+    Returns:
+        Profile的Cookie副本（已注册为该会话的请求头来源）
+    """
+    cookies = ProfileCookieMirror(profile)
+    manager.set_headers_provider(session, cookies.headers_for)
+    fallback = NativeDownloadFallback(manager, profile)
+
+    def on_download_requested(download):
+        url = download.url().toString()
+        # 下载请求只能在此回调中接受，之后无法再交还给WebEngine，因此先接受再视重新请求的结果决定保留哪一个
+        download.setDownloadDirectory(str(manager.download_dir))
+        download.accept()
+        if manager.settings_manager.get('downloads.takeover', True) and url.startswith(("http://", "https://")):
+            download_id = manager.add(url, download.downloadFileName(), session=session, expected_type=download.mimeType())
+            fallback.hold(download_id, download)
+        else:
+            logger.info(f"由WebEngine保存下载: {download.downloadFileName()}")
+        if on_started:
+            on_started()
+
+    profile.downloadRequested.connect(on_download_requested)
+    return cookies
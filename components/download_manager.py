@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下载管理
+接管模块页面发起的下载：服务器支持Range时按分块并行下载，否则单连接下载；
+未完成的下载在目标文件旁保存 .part 数据与 .part.json 进度，中断（暂停、网络错误、退出程序）后可续传；
+所有网络与磁盘操作都在后台线程执行，进度通过信号回到GUI线程
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import unquote, urlsplit
+from PyQt6.QtCore import QObject, QStandardPaths, pyqtSignal
+
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+INDEX_FILE = "index.json"
+
+# 单次读取的块大小（字节）
+READ_BLOCK_SIZE = 64 * 1024
+
+# 进度推送与进度文件保存的间隔（秒）
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+# 请求超时时间（秒）
+REQUEST_TIMEOUT_SECONDS = 30
+
+# 单个分块请求失败后的重试次数
+MAX_CHUNK_RETRIES = 3
+
+# 下载列表中最多保留的已结束记录数
+MAX_FINISHED_RECORDS = 50
+
+CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+def get_download_state_dir() -> Path:
+    """获取下载记录目录（优先用户可写路径）"""
+    app_data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    # 兜底到项目目录（开发环境）
+    return (Path(app_data_dir) if app_data_dir else Path("config")) / "downloads"
+
+
+class _Paused(Exception):
+    """下载被暂停或取消"""
+
+
+class _RestartRequired(Exception):
+    """服务器上的文件已变化（If-Range不再匹配），需要从头下载"""
+
+
+class _StopSignal:
+    """分块线程的停止条件：用户暂停/取消，或本次传输中有分块失败
+
+    分块失败只停止本次传输，不设置用户的暂停事件，服务器文件变化后重新下载时仍可正常进行。
+    """
+
+    def __init__(self, stop_event: threading.Event):
+        self._stop_event = stop_event
+        self._aborted = threading.Event()
+
+    def abort(self) -> None:
+        self._aborted.set()
+
+    def is_set(self) -> bool:
+        return self._stop_event.is_set() or self._aborted.is_set()
+
+
+class RateLimiter:
+    """令牌桶限速（所有下载共享，速率每次取用时读取，设置修改后立即生效）"""
+
+    def __init__(self, rate_provider: Callable[[], int]):
+        """初始化限速器
+
+        Args:
+            rate_provider: 返回当前速率上限（字节/秒）的函数，0为不限速
+        """
+        self._rate_provider = rate_provider
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+    def consume(self, size: int) -> None:
+        """取用令牌，不足时在调用线程中等待
+
+        Args:
+            size: 字节数
+        """
+        rate = self._rate_provider()
+        if rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # 最多积累1秒的令牌，避免空闲后突发
+            self._tokens = min(self._tokens + (now - self._updated) * rate, float(rate))
+            self._updated = now
+            self._tokens -= size
+            wait_seconds = -self._tokens / rate if self._tokens < 0 else 0
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+
+class DownloadManager(QObject):
+    """下载管理类（网络请求与文件写入在后台线程，不依赖WebEngine）"""
+
+    download_added = pyqtSignal(dict)  # 新下载（下载信息）
+    download_updated = pyqtSignal(dict)  # 进度或状态变化（下载信息）
+
+    def __init__(self, settings_manager, state_dir: Optional[Path] = None, parent=None):
+        """初始化下载管理
+
+        Args:
+            settings_manager: 设置管理器实例
+            state_dir: 下载记录目录，为None时使用用户数据目录下的 downloads
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.settings_manager = settings_manager
+        self.state_dir = Path(state_dir) if state_dir else get_download_state_dir()
+        self._lock = threading.Lock()
+        self._downloads = {}  # id -> 下载信息
+        self._stop_events = {}  # id -> 暂停/取消事件
+        self._headers_providers = {}  # 会话名称 -> 返回请求头（Cookie等）的函数
+        self.rate_limiter = RateLimiter(
+            lambda: int(self.settings_manager.get('downloads.bandwidth_kbps', 0)) * 1024
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(int(settings_manager.get('downloads.max_active', 3)), 1),
+            thread_name_prefix="download"
+        )
+        self._load_index()
+
+    @property
+    def download_dir(self) -> Path:
+        """下载目录（未设置时使用系统下载目录）"""
+        directory = self.settings_manager.get('downloads.directory', '')
+        if not directory:
+            directory = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.DownloadLocation)
+        return Path(directory or ".")
+
+    @property
+    def max_connections(self) -> int:
+        """单个下载的最大并行连接数"""
+        return max(int(self.settings_manager.get('downloads.max_connections', 4)), 1)
+
+    @property
+    def chunk_size(self) -> int:
+        """分块大小（字节）"""
+        return max(int(self.settings_manager.get('downloads.chunk_size_mb', 4)), 1) * 1024 * 1024
+
+    @property
+    def min_chunked_size(self) -> int:
+        """启用分块并行下载的最小文件大小（字节）"""
+        return int(self.settings_manager.get('downloads.min_chunked_size_mb', 8)) * 1024 * 1024
+
+    def set_headers_provider(self, session: str, provider: Optional[Callable[[str], Dict[str, str]]]) -> None:
+        """设置会话的请求头来源（下载需要带上该会话的Cookie）
+
+        Args:
+            session: 会话名称（默认会话为空字符串）
+            provider: 参数为URL、返回请求头字典的函数，None表示移除
+        """
+        with self._lock:
+            if provider is None:
+                self._headers_providers.pop(session, None)
+            else:
+                self._headers_providers[session] = provider
+
+    def add(self, url: str, file_name: str = "", session: str = "", directory: Optional[Path] = None,
+            expected_type: str = "") -> str:
+        """添加并开始下载
+
+        Args:
+            url: 下载地址（http/https）
+            file_name: 建议的文件名，为空时从URL推断
+            session: 发起下载的会话名称
+            directory: 保存目录，为None时使用下载目录
+            expected_type: 预期的文件类型（MIME），不是网页时服务器返回网页视为失败（如重新请求得到了登录页）
+
+        Returns:
+            下载ID
+        """
+        directory = Path(directory) if directory else self.download_dir
+        file_name = _sanitize_file_name(file_name or unquote(Path(urlsplit(url).path).name) or "download")
+        with self._lock:
+            taken = {d["path"] for d in self._downloads.values() if d["state"] not in ("completed", "cancelled")}
+        download = {
+            "id": uuid.uuid4().hex[:12],
+            "url": url,
+            "session": session,
+            "file_name": file_name,
+            "path": str(_unique_path(directory / file_name, taken)),
+            "state": "queued",
+            "total": 0,
+            "received": 0,
+            "chunked": False,
+            "connections": 0,
+            "speed": 0,
+            "error": "",
+            "expected_type": expected_type,
+            "created_at": time.time(),
+        }
+        with self._lock:
+            self._downloads[download["id"]] = download
+        self.download_added.emit(dict(download))
+        metrics.counter("downloads.started", "开始的下载数").inc()
+        self._submit(download["id"])
+        return download["id"]
+
+    def pause(self, download_id: str) -> None:
+        """暂停下载（保留已下载的数据，可续传）
+
+        Args:
+            download_id: 下载ID
+        """
+        event = self._stop_events.get(download_id)
+        if event is not None:
+            event.set()
+
+    def resume(self, download_id: str) -> None:
+        """继续暂停或失败的下载
+
+        Args:
+            download_id: 下载ID
+        """
+        with self._lock:
+            download = self._downloads.get(download_id)
+            if download is None or download["state"] not in ("paused", "failed"):
+                return
+        self._submit(download_id)
+
+    def cancel(self, download_id: str) -> None:
+        """取消下载并删除未完成的数据
+
+        Args:
+            download_id: 下载ID
+        """
+        with self._lock:
+            download = self._downloads.get(download_id)
+            if download is None or download["state"] in ("completed", "cancelled"):
+                return
+            event = self._stop_events.get(download_id)
+            if event is None:
+                # 没有在进行的任务，直接清理
+                download["state"] = "cancelled"
+        if event is not None:
+            download["cancel_requested"] = True
+            event.set()
+        else:
+            self._remove_partial(download)
+            self._finish(download)
+
+    def get_downloads(self) -> List[Dict[str, Any]]:
+        """获取全部下载（按添加时间）"""
+        with self._lock:
+            return [dict(download) for download in self._downloads.values()]
+
+    def shutdown(self) -> None:
+        """暂停进行中的下载并停止后台线程（不等待；分块按偏移写入，进度文件之后写入的数据续传时重新下载）"""
+        for event in list(self._stop_events.values()):
+            event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._save_index()
+
+    def _submit(self, download_id: str) -> None:
+        with self._lock:
+            download = self._downloads[download_id]
+            download["state"] = "queued"
+            download["error"] = ""
+            download.pop("cancel_requested", None)
+            self._stop_events[download_id] = threading.Event()
+            self._save_index()
+        self.download_updated.emit(dict(download))
+        self._executor.submit(self._run, download_id)
+
+    # ------------------------------------------------------------ 工作线程
+
+    def _run(self, download_id: str) -> None:
+        """执行一个下载（工作线程）"""
+        download = self._downloads[download_id]
+        stop_event = self._stop_events[download_id]
+        started = time.perf_counter()
+        part_path = Path(download["path"] + ".part")
+        try:
+            if stop_event.is_set():
+                raise _Paused()
+            headers = self._get_headers(download)
+            state = self._load_part_state(download, part_path)
+            try:
+                if state is None:
+                    state = self._probe(download, headers)
+                self._transfer(download, state, headers, part_path, stop_event)
+            except _RestartRequired:
+                # 只重新下载一次，再次变化时按失败处理
+                logger.info(f"服务器文件已变化，重新下载: {download['url']}")
+                _remove_files(part_path, Path(str(part_path) + ".json"))
+                state = self._probe(download, headers)
+                self._transfer(download, state, headers, part_path, stop_event)
+
+            final_path = Path(download["path"])
+            if final_path.exists():
+                final_path = _unique_path(final_path)
+            os.replace(part_path, final_path)
+            Path(str(part_path) + ".json").unlink(missing_ok=True)
+            download["path"] = str(final_path)
+            download["state"] = "completed"
+            elapsed = time.perf_counter() - started
+            metrics.histogram("downloads.duration_s", "下载耗时（秒）").observe(elapsed)
+            metrics.counter("downloads.bytes", "下载字节数").inc(download["total"] or download["received"])
+            logger.info(
+                f"下载完成: {final_path.name} ({download['received'] / 1048576:.1f} MB, "
+                f"{'分块 x' + str(download['connections']) if download['chunked'] else '单连接'}, {elapsed:.1f} 秒)"
+            )
+        except _Paused:
+            if download.get("cancel_requested"):
+                self._remove_partial(download)
+                download["state"] = "cancelled"
+            else:
+                download["state"] = "paused"
+        except _RestartRequired:
+            download["state"] = "failed"
+            download["error"] = "服务器文件在下载过程中反复变化"
+            metrics.counter("downloads.failed", "失败的下载数").inc()
+            logger.warning(f"下载失败（服务器文件反复变化）: {download['url']}")
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            download["state"] = "failed"
+            download["error"] = str(e)
+            metrics.counter("downloads.failed", "失败的下载数").inc()
+            logger.warning(f"下载失败（可续传）: {download['url']} - {e}")
+        finally:
+            download["speed"] = 0
+            with self._lock:
+                self._stop_events.pop(download_id, None)
+            self._finish(download)
+
+    def _get_headers(self, download: Dict[str, Any]) -> Dict[str, str]:
+        with self._lock:
+            provider = self._headers_providers.get(download["session"])
+        return dict(provider(download["url"])) if provider else {}
+
+    def _open(self, url: str, headers: Dict[str, str]):
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=REQUEST_TIMEOUT_SECONDS)
+
+    def _probe(self, download: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+        """用 Range: bytes=0-0 探测文件大小与是否支持分块，返回新的下载进度"""
+        download["state"] = "probing"
+        self._emit_progress(download)
+        with self._open(download["url"], dict(headers, Range="bytes=0-0")) as response:
+            match = CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            accepts_ranges = response.status == 206 and match is not None and match.group(3) != "*"
+            total = int(match.group(3)) if accepts_ranges else int(response.headers.get("Content-Length") or 0)
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+            expected_type = download.get("expected_type", "")
+            if expected_type and expected_type != "text/html" and response.headers.get_content_type() == "text/html":
+                raise ValueError(f"服务器返回了网页而不是 {expected_type} 文件")
+
+        download["total"] = total
+        download["received"] = 0
+        chunked = accepts_ranges and total >= self.min_chunked_size and self.max_connections > 1
+        if accepts_ranges:
+            size = self.chunk_size if chunked else max(total, 1)
+            chunks = [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+        else:
+            chunks = None
+        return {"url": download["url"], "total": total, "validator": validator, "chunks": chunks, "chunked": chunked}
+
+    def _transfer(self, download, state, headers, part_path: Path, stop_event: threading.Event) -> None:
+        """按进度状态下载（分块并行，或单连接）
+
+        状态先为 downloading（请求已发出），第一次成功读到数据后为 transferring。
+        """
+        download["state"] = "downloading"
+        download["chunked"] = state["chunked"]
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        if not part_path.exists():
+            with open(part_path, 'wb') as f:
+                if state["total"] and state["chunks"] is not None:
+                    f.truncate(state["total"])
+        self._save_part_state(part_path, state)
+
+        if state["chunks"] is None:
+            # 服务器不支持Range：单连接从头下载，无法续传
+            download["connections"] = 1
+            download["received"] = 0
+            self._fetch_stream(download, headers, part_path, stop_event)
+            return
+
+        pending = [chunk for chunk in state["chunks"] if chunk[0] + chunk[2] <= chunk[1]]
+        download["received"] = sum(chunk[2] for chunk in state["chunks"])
+        connections = min(self.max_connections if state["chunked"] else 1, max(len(pending), 1))
+        download["connections"] = connections
+
+        range_headers = dict(headers)
+        if state["validator"]:
+            range_headers["If-Range"] = state["validator"]
+
+        chunk_stop = _StopSignal(stop_event)
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="download-chunk") as pool:
+            futures = {pool.submit(self._fetch_chunk, download, chunk, range_headers, part_path, chunk_stop) for chunk in pending}
+            last_received, last_time = download["received"], time.monotonic()
+            while futures:
+                done, futures = wait(futures, timeout=PROGRESS_INTERVAL_SECONDS, return_when=FIRST_EXCEPTION)
+                now = time.monotonic()
+                download["speed"] = int((download["received"] - last_received) / max(now - last_time, 1e-6))
+                last_received, last_time = download["received"], now
+                self._save_part_state(part_path, state)
+                self._emit_progress(download)
+                for future in done:
+                    if future.exception() is not None:
+                        # 通知其余分块停止，已写入的进度保留用于续传
+                        chunk_stop.abort()
+                        wait(futures)
+                        self._save_part_state(part_path, state)
+                        raise future.exception()
+
+    def _fetch_chunk(self, download, chunk: List[int], headers, part_path: Path, stop_event: _StopSignal) -> None:
+        """下载一个分块并写入对应偏移（分块线程），chunk = [起始, 结束, 已下载字节]"""
+        for attempt in range(MAX_CHUNK_RETRIES + 1):
+            start = chunk[0] + chunk[2]
+            if start > chunk[1]:
+                return
+            try:
+                request_headers = dict(headers, Range=f"bytes={start}-{chunk[1]}")
+                with self._open(download["url"], request_headers) as response, open(part_path, 'r+b') as f:
+                    if response.status != 206:
+                        raise _RestartRequired()
+                    f.seek(start)
+                    while True:
+                        if stop_event.is_set():
+                            raise _Paused()
+                        data = response.read(min(READ_BLOCK_SIZE, chunk[1] - chunk[0] - chunk[2] + 1))
+                        if not data:
+                            break
+                        self.rate_limiter.consume(len(data))
+                        f.write(data)
+                        chunk[2] += len(data)
+                        with self._lock:
+                            download["received"] += len(data)
+                        self._mark_transferring(download)
+                if chunk[0] + chunk[2] <= chunk[1]:
+                    raise OSError(f"分块提前结束: {chunk[0] + chunk[2]}/{chunk[1] + 1}")
+                return
+            except (urllib.error.URLError, OSError) as e:
+                if attempt == MAX_CHUNK_RETRIES or stop_event.is_set():
+                    raise
+                logger.info(f"分块下载失败，重试 {attempt + 1}/{MAX_CHUNK_RETRIES}: {e}")
+                time.sleep(2 ** attempt)
+
+    def _fetch_stream(self, download, headers, part_path: Path, stop_event: threading.Event) -> None:
+        """单连接下载整个文件（工作线程）"""
+        with self._open(download["url"], headers) as response, open(part_path, 'wb') as f:
+            download["total"] = int(response.headers.get("Content-Length") or 0)
+            last_emit = time.monotonic()
+            last_received = 0
+            while True:
+                if stop_event.is_set():
+                    raise _Paused()
+                data = response.read(READ_BLOCK_SIZE)
+                if not data:
+                    break
+                self.rate_limiter.consume(len(data))
+                f.write(data)
+                download["received"] += len(data)
+                self._mark_transferring(download)
+                now = time.monotonic()
+                if now - last_emit >= PROGRESS_INTERVAL_SECONDS:
+                    download["speed"] = int((download["received"] - last_received) / (now - last_emit))
+                    last_emit, last_received = now, download["received"]
+                    self._emit_progress(download)
+
+    def _mark_transferring(self, download: Dict[str, Any]) -> None:
+        """第一次成功读到数据（分块为206，单连接为2xx）时切换为 transferring 并推送（工作线程/分块线程）"""
+        with self._lock:
+            if download["state"] != "downloading":
+                return
+            download["state"] = "transferring"
+        self._emit_progress(download)
+
+    def _load_part_state(self, download, part_path: Path) -> Optional[Dict[str, Any]]:
+        """读取续传进度（与当前下载地址一致且数据文件存在时有效）"""
+        try:
+            with open(str(part_path) + ".json", 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if state.get("url") != download["url"] or state.get("chunks") is None or not part_path.exists():
+            return None
+        download["total"] = state["total"]
+        return state
+
+    def _save_part_state(self, part_path: Path, state: Dict[str, Any]) -> None:
+        temp_path = Path(str(part_path) + ".json.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, str(part_path) + ".json")
+
+    def _remove_partial(self, download: Dict[str, Any]) -> None:
+        part_path = Path(download["path"] + ".part")
+        _remove_files(part_path, Path(str(part_path) + ".json"))
+
+    def _emit_progress(self, download: Dict[str, Any]) -> None:
+        with self._lock:
+            snapshot = dict(download)
+        self.download_updated.emit(snapshot)
+
+    def _finish(self, download: Dict[str, Any]) -> None:
+        with self._lock:
+            # 只保留最近的已结束记录
+            finished = [d for d in self._downloads.values() if d["state"] in ("completed", "cancelled")]
+            for old in sorted(finished, key=lambda d: d["created_at"])[:-MAX_FINISHED_RECORDS]:
+                if old is not download:
+                    self._downloads.pop(old["id"], None)
+            self._save_index()
+        self._emit_progress(download)
+
+    # ------------------------------------------------------------ 下载记录
+
+    def _load_index(self) -> None:
+        """读取下载记录；上次退出时未完成的下载标记为暂停，可继续"""
+        try:
+            with open(self.state_dir / INDEX_FILE, 'r', encoding='utf-8') as f:
+                downloads = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        for download in downloads:
+            if download.get("state") not in ("completed", "cancelled", "failed"):
+                download["state"] = "paused"
+            download["speed"] = 0
+            self._downloads[download["id"]] = download
+
+    def _save_index(self) -> None:
+        """写入下载记录（需持有锁）"""
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = self.state_dir / f"{INDEX_FILE}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self._downloads.values()), f, ensure_ascii=False)
+            os.replace(temp_path, self.state_dir / INDEX_FILE)
+        except OSError as e:
+            logger.warning(f"写入下载记录失败: {e}")
+
+
+def _sanitize_file_name(name: str) -> str:
+    """去掉文件名中的路径与非法字符"""
+    name = re.sub(r'[\\/:*?"<>|\x00-\x1f]', "_", Path(name).name).strip(" .")
+    return name or "download"
+
+
+def _unique_path(path: Path, taken=()) -> Path:
+    """目标文件已存在（或被其他未完成的下载占用）时追加序号：name (1).ext"""
+    candidate = path
+    index = 1
+    while candidate.exists() or str(candidate) in taken:
+        candidate = path.with_name(f"{path.stem} ({index}){path.suffix}")
+        index += 1
+    return candidate
+
+
+def _remove_files(*paths: Path) -> None:
+    for path in paths:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
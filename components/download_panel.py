@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下载面板
+原生小窗口，列出下载管理中的下载：进度、速度，以及暂停/继续、取消与打开所在文件夹
+"""
+
+from pathlib import Path
+from typing import Any, Dict
+from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtGui import QDesktopServices
+from PyQt6.QtWidgets import (
+    QFrame, QHBoxLayout, QLabel, QProgressBar, QPushButton, QScrollArea, QVBoxLayout, QWidget
+)
+
+STATE_TEXT = {
+    "queued": "等待中",
+    "probing": "连接中",
+    "downloading": "下载中",
+    "transferring": "下载中",
+    "paused": "已暂停",
+    "completed": "已完成",
+    "failed": "失败",
+    "cancelled": "已取消",
+}
+
+# 传输中的状态（请求已发出 / 已读到数据）
+TRANSFER_STATES = ("downloading", "transferring")
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class DownloadItem(QFrame):
+    """下载面板中的一行"""
+
+    def __init__(self, manager, download: Dict[str, Any], parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.download_id = download["id"]
+        self._path = download["path"]
+        self._state = None
+
+        self.name_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(6)
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #64748B; font-size: 12px;")
+
+        self.toggle_button = QPushButton()
+        self.toggle_button.clicked.connect(self._on_toggle)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.clicked.connect(lambda: self.manager.cancel(self.download_id))
+        self.folder_button = QPushButton("打开文件夹")
+        self.folder_button.clicked.connect(self._open_folder)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.status_label, 1)
+        for button in (self.toggle_button, self.cancel_button, self.folder_button):
+            buttons.addWidget(button)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+        layout.addWidget(self.name_label)
+        layout.addWidget(self.progress_bar)
+        layout.addLayout(buttons)
+        self.update_download(download)
+
+    def update_download(self, download: Dict[str, Any]) -> None:
+        """按下载信息刷新显示
+
+        Args:
+            download: 下载信息
+        """
+        self._path = download["path"]
+        self._state = state = download["state"]
+        self.name_label.setText(Path(download["path"]).name)
+
+        total, received = download["total"], download["received"]
+        if total:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(received * 1000 / total))
+        elif state == "completed":
+            self.progress_bar.setRange(0, 1)
+            self.progress_bar.setValue(1)
+        else:
+            # 大小未知时显示忙碌状态
+            self.progress_bar.setRange(0, 0 if state in TRANSFER_STATES else 1)
+
+        parts = [STATE_TEXT.get(state, state)]
+        if total:
+            parts.append(f"{_format_bytes(received)} / {_format_bytes(total)}")
+        elif received:
+            parts.append(_format_bytes(received))
+        if state in TRANSFER_STATES and download["speed"]:
+            parts.append(f"{_format_bytes(download['speed'])}/s")
+        if download["chunked"] and state in TRANSFER_STATES:
+            parts.append(f"{download['connections']} 个连接")
+        if state == "failed" and download["error"]:
+            parts.append(download["error"])
+        self.status_label.setText(" · ".join(parts))
+        self.status_label.setToolTip(download["url"])
+
+        active = state in ("queued", "probing") + TRANSFER_STATES
+        self.toggle_button.setText("暂停" if active else "继续")
+        self.toggle_button.setVisible(active or state in ("paused", "failed"))
+        self.cancel_button.setVisible(active or state in ("paused", "failed"))
+        self.folder_button.setVisible(state == "completed")
+
+    def _on_toggle(self) -> None:
+        if self._state in ("paused", "failed"):
+            self.manager.resume(self.download_id)
+        else:
+            self.manager.pause(self.download_id)
+
+    def _open_folder(self) -> None:
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(Path(self._path).parent)))
+
+
+class DownloadPanel(QWidget):
+    """下载面板类"""
+
+    def __init__(self, manager, parent=None):
+        """初始化下载面板
+
+        Args:
+            manager: DownloadManager实例
+            parent: 父窗口（面板作为其工具窗口显示）
+        """
+        super().__init__(parent, Qt.WindowType.Tool)
+        self.manager = manager
+        self._items = {}
+        self.setWindowTitle("下载")
+        self.resize(420, 360)
+
+        self._list_layout = QVBoxLayout()
+        self._list_layout.setContentsMargins(0, 0, 0, 0)
+        self._list_layout.addStretch(1)
+        container = QWidget()
+        container.setLayout(self._list_layout)
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(container)
+
+        self.empty_label = QLabel("暂无下载")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.empty_label)
+        layout.addWidget(scroll_area)
+
+        for download in self.manager.get_downloads():
+            self._on_download_updated(download)
+        self.manager.download_added.connect(self._on_download_updated)
+        self.manager.download_updated.connect(self._on_download_updated)
+
+    def show_panel(self) -> None:
+        """显示并置前面板"""
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def _on_download_updated(self, download: Dict[str, Any]) -> None:
+        item = self._items.get(download["id"])
+        if item is None:
+            item = self._items[download["id"]] = DownloadItem(self.manager, download)
+            # 最新的下载在最上面
+            self._list_layout.insertWidget(0, item)
+        else:
+            item.update_download(download)
+        self.empty_label.setVisible(not self._items)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebEngine引擎配置
+根据settings中的engine配置生成Chromium启动参数，必须在创建QApplication之前应用
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CHROMIUM_FLAGS_ENV = "QTWEBENGINE_CHROMIUM_FLAGS"
+
+# 进程模型 -> Chromium参数
+PROCESS_MODELS = {
+    "default": [],  # 每个站点实例一个渲染进程（Chromium默认）
+    "process-per-site": ["--process-per-site"],
+    # QtWebEngine不支持单进程模式（已知会崩溃），仅在 engine.experimental_single_process 为真时生效
+    "single-process": ["--single-process"],
+}
+
+# 需要显式开启实验开关才生效的进程模型，未开启时改用的进程模型
+EXPERIMENTAL_PROCESS_MODELS = {"single-process": "process-per-site"}
+
+# 预设引擎配置，settings中显式配置的项会覆盖预设值
+ENGINE_PRESETS = {
+    "default": {},
+    "balanced": {
+        "process_model": "process-per-site",
+        "renderer_process_limit": 4,
+    },
+    "low_memory": {
+        "process_model": "process-per-site",
+        "renderer_process_limit": 2,
+        "js_heap_mb": 256,
+        "disable_features": ["BackForwardCache", "SpareRendererForSitePerProcess"],
+    },
+    "minimal": {
+        "process_model": "process-per-site",
+        "renderer_process_limit": 1,
+        "js_heap_mb": 192,
+        "disable_features": ["BackForwardCache", "SpareRendererForSitePerProcess"],
+        "extra_flags": ["--disable-gpu-shader-disk-cache"],
+    },
+}
+
+
+def resolve_engine_config(settings_manager, preset: Optional[str] = None) -> Dict[str, Any]:
+    """合并预设与settings中的engine配置
+
+    Args:
+        settings_manager: 设置管理器实例
+        preset: 指定预设名称（为空时使用settings中的engine.preset）
+
+    Returns:
+        最终生效的引擎配置字典
+    """
+    engine_settings = settings_manager.get('engine', {}) or {}
+    preset_name = preset or engine_settings.get('preset', 'default')
+    if preset_name not in ENGINE_PRESETS:
+        logger.warning(f"未知的引擎预设 {preset_name}，使用默认配置")
+        preset_name = "default"
+
+    config = {"preset": preset_name}
+    config.update(ENGINE_PRESETS[preset_name])
+    for key, value in engine_settings.items():
+        # 空值/0表示沿用预设
+        if key != 'preset' and value not in (None, "", 0, []):
+            config[key] = value
+
+    fallback = EXPERIMENTAL_PROCESS_MODELS.get(config.get('process_model'))
+    if fallback and not config.get('experimental_single_process'):
+        logger.warning(f"进程模型 {config['process_model']} 未开启实验开关 engine.experimental_single_process，改用 {fallback}")
+        config['process_model'] = fallback
+    return config
+
+
+def build_chromium_flags(config: Dict[str, Any]) -> List[str]:
+    """根据引擎配置生成Chromium参数列表
+
+    Args:
+        config: 引擎配置字典
+
+    Returns:
+        Chromium参数列表
+    """
+    flags = list(PROCESS_MODELS.get(config.get('process_model', 'default'), []))
+
+    renderer_limit = int(config.get('renderer_process_limit', 0) or 0)
+    if renderer_limit > 0:
+        flags.append(f"--renderer-process-limit={renderer_limit}")
+
+    js_heap_mb = int(config.get('js_heap_mb', 0) or 0)
+    if js_heap_mb > 0:
+        flags.append(f"--js-flags=--max-old-space-size={js_heap_mb}")
+
+    if config.get('enable_features'):
+        flags.append(f"--enable-features={','.join(config['enable_features'])}")
+    if config.get('disable_features'):
+        flags.append(f"--disable-features={','.join(config['disable_features'])}")
+
+    flags.extend(config.get('extra_flags', []))
+    return flags
+
+
+def apply_engine_profile(settings_manager, preset: Optional[str] = None) -> List[str]:
+    """将引擎配置写入QTWEBENGINE_CHROMIUM_FLAGS（需在QApplication创建前调用）
+
+    环境变量中已有的参数保留在后面，便于临时覆盖。
+
+    Args:
+        settings_manager: 设置管理器实例
+        preset: 指定预设名称（为空时使用settings中的engine.preset）
+
+    Returns:
+        本次追加的Chromium参数列表
+    """
+    config = resolve_engine_config(settings_manager, preset)
+    flags = build_chromium_flags(config)
+    if not flags:
+        return flags
+
+    existing = os.environ.get(CHROMIUM_FLAGS_ENV, "").strip()
+    os.environ[CHROMIUM_FLAGS_ENV] = " ".join(flags + ([existing] if existing else []))
+    logger.info(f"引擎配置 {config['preset']}: {' '.join(flags)}")
+    return flags
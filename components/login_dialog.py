@@ -6,21 +6,54 @@
 
 import sys
 import os
+import json
+import time
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QPushButton, QCheckBox, QFrame, QMessageBox, QSpacerItem, QSizePolicy
+    QPushButton, QCheckBox, QFrame, QMessageBox, QSpacerItem, QSizePolicy, QFileDialog, QStackedLayout, QWidget
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QUrl, QStandardPaths
-from PyQt6.QtGui import QFont, QIcon, QPixmap
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QUrl, QStandardPaths, QPoint
+from PyQt6.QtGui import QDesktopServices, QFont, QIcon, QKeySequence, QPixmap, QShortcut
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile
 from urllib.parse import urlparse, parse_qs
 import webbrowser
 
+from components.browser_launcher import BROWSER_CANDIDATES, BrowserLauncher
+from components.web_cache_manager import WebCacheManager
+from components.process_monitor import ProcessMemoryMonitor
+from components.web_perf_collector import WebPerfCollector
+from components.module_cache import ModuleResponseCache
+from components.module_scheme import install_module_cache
+from components.request_rules import RequestRuleEngine
+from components.request_interceptor import install_request_interceptor
+from components.module_warmup import ModuleWarmup
+from components.download_manager import DownloadManager
+from components.download_bridge import install_download_handler
+from components.download_panel import DownloadPanel
+from components.module_catalog import ModuleCatalog
+from components.module_usage import ModuleUsage
+from components.command_palette import CommandPalette, SETTINGS_PAGE
+from utils.logger import get_log_stats
+from utils.metrics import metrics
+
+# 登录页（启动时只恢复该页面）
+LOGIN_PAGE = "01-登录.html"
+
+# 页面加载完成后再保留启动恢复截图的时长（毫秒），等待页面首次绘制
+SNAPSHOT_DISMISS_DELAY_MS = 50
+
+# 页面迟迟未加载完成时，最多显示启动恢复截图的时长（毫秒）
+SNAPSHOT_TIMEOUT_MS = 10000
+
 
 class ExternalLinkPage(QWebEnginePage):
-    """用于处理新窗口/新标签的页面，将链接交给系统浏览器"""
+    """用于处理新窗口/新标签的页面，将链接交给系统浏览器
+
+    仅承接未携带URL的弹窗（如先 window.open() 再设置 location），
+    每个会话只有一个常驻实例，后续弹窗依次接入同一页面。
+    """
 
     def __init__(self, parent_dialog, profile=None):
         if profile is not None:
@@ -31,7 +64,7 @@ class ExternalLinkPage(QWebEnginePage):
 
     def acceptNavigationRequest(self, url, navigation_type, is_main_frame):
         url_str = url.toString()
-        if url_str:
+        if url_str and url_str != 'about:blank':
             if self.parent_dialog:
                 self.parent_dialog.open_external_url(url_str)
             else:
@@ -39,6 +72,46 @@ class ExternalLinkPage(QWebEnginePage):
         return False
 
 
+class ModulePage(QWebEnginePage):
+    """程序内模块页面：弹窗交给系统浏览器"""
+
+    def __init__(self, parent_dialog, profile, parent=None):
+        super().__init__(profile, parent)
+        self.parent_dialog = parent_dialog
+        self.newWindowRequested.connect(lambda request: parent_dialog.open_external_url(
+            request.requestedUrl().toString()
+        ))
+
+
+class ModuleWindow(QWidget):
+    """在程序内打开的模块页面窗口（配置了离线缓存的模块使用，静态资源的缓存副本可立即返回）"""
+
+    def __init__(self, parent_dialog, url):
+        """初始化模块窗口
+
+        Args:
+            parent_dialog: 所属会话窗口（提供Profile与模块缓存）
+            url: 模块地址
+        """
+        super().__init__(None, Qt.WindowType.Window)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.setWindowTitle(parent_dialog.app_name)
+        self.setWindowIcon(parent_dialog.windowIcon())
+        self.resize(parent_dialog.size())
+
+        self.webview = QWebEngineView(self)
+        self.page = ModulePage(parent_dialog, parent_dialog.web_profile, self.webview)
+        self.page.titleChanged.connect(lambda title: self.setWindowTitle(f"{title} - {parent_dialog.app_name}"))
+        self.webview.setPage(self.page)
+        parent_dialog.memory_monitor.register_page(self.page, f"module:{url}", session=parent_dialog.session_name)
+        parent_dialog.web_perf.attach_page(self.page)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.webview)
+        self.page.load(QUrl(url))
+
+
 class LoginPage(QWebEnginePage):
     """自定义WebEngine页面，用于拦截登录请求"""
     
@@ -48,12 +121,22 @@ class LoginPage(QWebEnginePage):
         else:
             super().__init__(parent_dialog)
         self.parent_dialog = parent_dialog
+        self.newWindowRequested.connect(self._on_new_window_requested)
+
+    def _on_new_window_requested(self, request):
+        """新窗口请求（createWindow返回None后触发）：已知URL时直接转交系统浏览器，不创建页面"""
+        if not self.parent_dialog:
+            return
+        url_str = request.requestedUrl().toString()
+        if url_str and url_str != 'about:blank':
+            self.parent_dialog.open_external_url(url_str)
+        else:
+            # 未携带URL的弹窗接入常驻的承接页面，由其转交随后的导航
+            request.openIn(self.parent_dialog.get_external_link_page())
 
     def createWindow(self, window_type):
-        """处理页面内新窗口/新标签打开请求"""
-        if self.parent_dialog:
-            return self.parent_dialog.register_external_link_page()
-        return ExternalLinkPage(None)
+        """页面内新窗口/新标签：不创建页面，交给newWindowRequested按URL处理"""
+        return None
     
     def acceptNavigationRequest(self, url, navigation_type, is_main_frame):
         """拦截导航请求"""
@@ -70,7 +153,7 @@ class LoginPage(QWebEnginePage):
             
             if username and password:
                 # 使用QTimer延迟执行，避免在导航请求处理中直接调用
-                QTimer.singleShot(10, lambda: self.parent_dialog.handle_login_request(username, password))
+                self._dispatch('login', lambda: self.parent_dialog.handle_login_request(username, password))
             
             # 阻止导航
             return False
@@ -85,10 +168,138 @@ class LoginPage(QWebEnginePage):
             
             if target_url:
                 # 使用QTimer延迟执行，避免在导航请求处理中直接调用
-                QTimer.singleShot(10, lambda: self.parent_dialog.open_external_url(target_url))
+                self._dispatch('openurl', lambda: self.parent_dialog.open_external_url(target_url))
             
             # 阻止导航
             return False
+
+        # 拦截缓存管理请求（设置页面的“存储与缓存”）
+        if url_str.startswith('python://cache'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            action = params.get('action', [''])[0]
+
+            if action:
+                self._dispatch('cache', lambda: self.parent_dialog.handle_cache_request(action))
+
+            # 阻止导航
+            return False
+
+        # 拦截待机设置请求（设置页面保存时同步托盘待机与开机自启动）
+        if url_str.startswith('python://standby'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            enabled = params.get('enabled', ['0'])[0] == '1'
+            auto_start = params.get('auto_start', ['0'])[0] == '1'
+
+            self._dispatch('standby', lambda: self.parent_dialog.handle_standby_request(enabled, auto_start))
+
+            # 阻止导航
+            return False
+
+        # 拦截默认浏览器设置请求（设置页面保存时同步）
+        if url_str.startswith('python://browser'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            browser = params.get('name', ['system'])[0]
+
+            self._dispatch('browser', lambda: self.parent_dialog.handle_browser_request(browser))
+
+            # 阻止导航
+            return False
+
+        # 拦截会话请求（主页面的“新建会话窗口”）
+        if url_str.startswith('python://session'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            action = params.get('action', [''])[0]
+
+            if action:
+                self._dispatch('session', lambda: self.parent_dialog.handle_session_request(action))
+
+            # 阻止导航
+            return False
+
+        # 拦截主题切换请求（页面自身的主题开关）
+        if url_str.startswith('python://theme'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            theme_name = params.get('name', [''])[0]
+
+            if theme_name:
+                self._dispatch('theme', lambda: self.parent_dialog.handle_theme_request(theme_name))
+
+            # 阻止导航
+            return False
+
+        # 拦截网页性能上报（采集脚本分批回传的性能条目）
+        if url_str.startswith('python://perf'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            data = params.get('data', [''])[0]
+
+            if data:
+                self._dispatch('perf', lambda: self.parent_dialog.web_perf.handle_report(data))
+
+            # 阻止导航
+            return False
+
+        # 拦截诊断请求（设置页面的“诊断”）
+        if url_str.startswith('python://diagnostics'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            action = params.get('action', [''])[0]
+
+            if action:
+                self._dispatch('diagnostics', lambda: self.parent_dialog.handle_diagnostics_request(action))
+
+            # 阻止导航
+            return False
+
+        # 拦截模块目录请求（主页面切换科室）
+        if url_str.startswith('python://catalog'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            department = params.get('department', [''])[0]
+
+            self._dispatch('catalog', lambda: self.parent_dialog.handle_catalog_request(department))
+
+            # 阻止导航
+            return False
+
+        # 拦截下载面板请求（主页面的“下载”）
+        if url_str.startswith('python://downloads'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            action = params.get('action', [''])[0]
+
+            if action == 'show':
+                self._dispatch('downloads', self.parent_dialog.show_download_panel)
+
+            # 阻止导航
+            return False
+
+        # 拦截预热请求（主页面鼠标悬停在模块卡片上时提高该主机的预热优先级）
+        if url_str.startswith('python://warmup'):
+            parsed = urlparse(url_str)
+            params = parse_qs(parsed.query)
+
+            target_url = params.get('url', [''])[0]
+
+            if target_url:
+                self._dispatch('warmup', lambda: self.parent_dialog.module_warmup.prioritize(target_url))
+
+            # 阻止导航
+            return False
         
         # 拦截本地HTML文件导航（如 03-设置.html）
         # 检查是否是相对路径的HTML文件（如 "03-设置.html"）
@@ -105,6 +316,24 @@ class LoginPage(QWebEnginePage):
         # 允许其他导航（包括外部URL和已存在的文件URL）
         return super().acceptNavigationRequest(url, navigation_type, is_main_frame)
 
+    def _dispatch(self, name, handler):
+        """延迟执行桥接调用（避免在导航请求处理中直接调用），并记录从收到请求到处理完成的耗时
+
+        Args:
+            name: 桥接调用名称
+            handler: 处理函数
+        """
+        received = time.perf_counter()
+
+        def run():
+            handler()
+            metrics.histogram("bridge.call_ms", "网页到桌面程序桥接调用耗时（含调度延迟）").observe(
+                (time.perf_counter() - received) * 1000
+            )
+            metrics.counter(f"bridge.calls.{name}", "桥接调用次数").inc()
+
+        QTimer.singleShot(10, run)
+
     def javaScriptAlert(self, security_origin, msg):
         """拦截网页alert弹窗，避免调试信息影响终端用户"""
         print(f"[WebAlert]{security_origin.toString()}: {msg}")
@@ -118,23 +347,82 @@ class LoginPage(QWebEnginePage):
 class LoginDialog(QDialog):
     """登录对话框类"""
 
-    def __init__(self, settings_manager):
+    # 页面请求新开一个会话窗口（由应用程序创建，见 DesktopApp.open_session）
+    new_session_requested = pyqtSignal()
+    # 窗口关闭时隐藏到托盘待机（hide_on_close为True时）
+    standby_entered = pyqtSignal()
+    # 设置页面修改了待机/自启动设置
+    standby_settings_changed = pyqtSignal()
+
+    def __init__(self, settings_manager, theme_manager=None, session_id=1, memory_monitor=None, module_cache=None,
+                 request_rules=None, download_manager=None, module_catalog=None, module_usage=None):
         """初始化登录对话框
 
         Args:
             settings_manager: 设置管理器实例
+            theme_manager: 主题管理器实例（用于向网页同步主题）
+            session_id: 会话编号，1为默认会话；其他会话使用独立的Profile（cookie、存储与缓存互相隔离）
+            memory_monitor: 共享的内存监控实例（多会话时由应用程序统一采样），为None时自行创建
+            module_cache: 共享的模块页面离线缓存，为None时自行创建
+            request_rules: 共享的请求拦截规则引擎（命中计数跨会话汇总），为None时自行创建
+            download_manager: 共享的下载管理，为None时自行创建
+            module_catalog: 共享的模块目录，为None时自行创建
+            module_usage: 共享的模块使用记录，为None时自行创建
         """
         super().__init__()
         self.settings_manager = settings_manager
+        self.theme_manager = theme_manager
+        self.session_id = session_id
+        self.session_name = "" if session_id == 1 else f"会话{session_id}"
+        self.memory_monitor = memory_monitor
+        self._owns_module_cache = module_cache is None
+        self.module_cache = module_cache or ModuleResponseCache(settings_manager, parent=self)
+        self._module_windows = []
+        self.request_rules = request_rules or RequestRuleEngine(settings_manager)
+        # 登录后预连接各模块主机，减少首次点击模块的等待
+        self.module_warmup = ModuleWarmup(settings_manager, parent=self)
+        self._owns_download_manager = download_manager is None
+        self.download_manager = download_manager or DownloadManager(settings_manager, parent=self)
+        self._download_panel = None
+        self._owns_module_catalog = module_catalog is None
+        self.module_catalog = module_catalog or ModuleCatalog(settings_manager, parent=self)
+        self.module_catalog.catalog_changed.connect(self._push_catalog_delta)
+        if self._owns_module_catalog:
+            self.module_catalog.start()
+        self._owns_module_usage = module_usage is None
+        self.module_usage = module_usage or ModuleUsage(settings_manager)
+        # 本窗口登录的用户（模块使用记录按用户区分，登录前为空）
+        self.current_user = ""
+        self.command_palette = None
+        # 命令面板选择设置项时若需先打开设置页面，页面加载完成后再定位 (分区, 设置项)
+        self._pending_setting_focus = None
+        # 由应用程序按待机设置维护：为True时关闭窗口只隐藏，WebEngine资源保持常驻
+        self.hide_on_close = False
         self.webview = None
         self.web_profile = None
-        self._external_link_pages = []
+        self._external_link_page = None
+        self._load_started_at = None
         self.app_name = self.settings_manager.get('app.name', '桌面管理程序')
+        if self.session_name:
+            self.app_name = f"{self.app_name} [{self.session_name}]"
         self.app_logo_text = self.settings_manager.get('app.logo_text', 'DM')
 
+        # 外部浏览器启动服务（后台线程解析并启动浏览器）
+        self.browser_launcher = BrowserLauncher(self.settings_manager.get('default_browser', 'system'), parent=self)
+        self.browser_launcher.launch_finished.connect(self._on_external_launch_finished)
+        self.browser_launcher.warm_up()
+
+        self._snapshot_label = None
+        self._snapshot_shown_at = None
+
         self.setup_ui()
         self.load_saved_credentials()
-        self._maximized_once = False
+
+        if self.settings_manager.get('command_palette.enabled', True):
+            # 索引在窗口创建时建立，按键时只查询
+            self.command_palette = CommandPalette(self.settings_manager, self.module_catalog, self)
+            self.command_palette.command_triggered.connect(self.run_command)
+            QShortcut(QKeySequence("Ctrl+K"), self, self.show_command_palette)
 
     def setup_ui(self):
         """设置用户界面"""
@@ -153,14 +441,12 @@ class LoginDialog(QDialog):
         flags |= Qt.WindowType.Window
         self.setWindowFlags(flags)
         
-        # 设置窗口大小（可调整大小，默认1920x1080）
-        self.resize(1920, 1080)
         self.setMinimumSize(800, 600)  # 设置最小尺寸
-        self.setModal(True)
-        self.setWindowState(self.windowState() | Qt.WindowState.WindowMaximized)
+        # 非模态：多个会话窗口同时打开时互不阻塞
+        self.setModal(False)
 
-        # 居中显示
-        self.center_dialog()
+        # 显示前一次性设置为上次关闭时的几何与状态，首帧即为最终布局
+        self._restore_window_state()
 
         # 创建布局
         main_layout = QVBoxLayout()
@@ -173,20 +459,64 @@ class LoginDialog(QDialog):
         # 使用持久化Profile，确保外部页面的cookie/localStorage可跨重启保留
         profile_path = self._get_web_profile_path()
         profile_path.mkdir(parents=True, exist_ok=True)
-        self.web_profile = QWebEngineProfile("desktop_manager_profile", self)
+
+        # 缓存管理：在Profile打开存储之前执行上次计划的淘汰
+        self.cache_manager = WebCacheManager(profile_path, self.settings_manager, self)
+        self.cache_manager.prepare_storage()
+
+        # 每个会话一个命名Profile；所有Profile共用同一个浏览器进程，仅渲染进程按会话分开
+        profile_name = "desktop_manager_profile" if self.session_id == 1 else f"desktop_manager_profile_{self.session_id}"
+        self.web_profile = QWebEngineProfile(profile_name, self)
         self.web_profile.setPersistentStoragePath(str(profile_path.resolve()))
         self.web_profile.setCachePath(str((profile_path / "cache").resolve()))
         self.web_profile.setPersistentCookiesPolicy(
             QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies
         )
+        self.cache_manager.apply_to_profile(self.web_profile)
+        # 配置的模块的静态资源经离线缓存加载（拦截器把脚本、样式表、图片与字体重定向到缓存方案）
+        install_module_cache(self.web_profile, self.module_cache, self.session_name)
+        # 按规则拦截分析统计、在线客服、字体CDN等在内网无法访问的请求，避免页面等待超时
+        install_request_interceptor(self.web_profile, self.request_rules, self.module_cache)
+        # 页面发起的下载交给下载管理（分块并行、可续传），并显示下载面板
+        cookies = install_download_handler(
+            self.web_profile, self.download_manager, self.session_name, self.show_download_panel
+        )
+        # 模块缓存的后台请求同样带上本会话的Cookie
+        self.module_cache.set_headers_provider(self.session_name, cookies.headers_for)
+        if self.theme_manager:
+            # 主题样式作为持久化用户脚本安装，页面首帧前即应用当前主题
+            self.theme_manager.attach_profile(self.web_profile)
+        self.cache_manager.stats_ready.connect(self._push_cache_stats)
+        self.cache_manager.start()
+
+        # 网页性能采集（导航、绘制与长任务，按路由汇总）
+        self.web_perf = WebPerfCollector(self)
+        self.web_perf.attach_profile(self.web_profile)
+
+        # 渲染进程内存监控（多会话时共享同一实例，按会话汇总）
+        self._owns_memory_monitor = self.memory_monitor is None
+        if self._owns_memory_monitor:
+            self.memory_monitor = ProcessMemoryMonitor(self.settings_manager, self)
+        self.memory_monitor.metrics_updated.connect(self._push_memory_metrics)
         
         # 设置自定义页面来拦截URL
         self.login_page = LoginPage(self, self.web_profile)
         self.webview.setPage(self.login_page)
+        self.memory_monitor.register_page(self.login_page, "main", session=self.session_name)
+        if self.theme_manager:
+            self.theme_manager.attach_page(self.login_page)
+        self.memory_monitor.start()
 
-        # 设置启动页面路径（可配置）
+        # 设置启动页面路径（可配置；未配置时显示登录页，上次关闭在登录页时以其截图作为首帧）
         startup_page_url = self.settings_manager.get('startup_page_url', '').strip()
-        html_path = Path(__file__).parent.parent / "01-登录.html"
+        html_path = Path(__file__).parent.parent / LOGIN_PAGE
+        restored_path = None if startup_page_url else self._get_restore_path()
+        if restored_path is None and self.session_id == 1:
+            # 不显示的截图不保留在磁盘上（包括旧版本保存的登录后页面截图）
+            try:
+                self._get_snapshot_path().unlink(missing_ok=True)
+            except OSError:
+                pass
 
         if startup_page_url:
             if startup_page_url.startswith(("http://", "https://")):
@@ -211,48 +541,188 @@ class LoginDialog(QDialog):
             return
 
         # 连接信号
+        self.webview.page().loadStarted.connect(self._on_load_started)
         self.webview.page().loadFinished.connect(self.on_page_loaded)
 
-        main_layout.addWidget(self.webview)
+        # 上次关闭时的页面截图叠在WebView之上作为首帧，页面加载完成后移除
+        self._snapshot_label = self._create_snapshot_label() if restored_path else None
+        if self._snapshot_label:
+            web_layout = QStackedLayout()
+            web_layout.setStackingMode(QStackedLayout.StackingMode.StackAll)
+            web_layout.addWidget(self.webview)
+            web_layout.addWidget(self._snapshot_label)
+            web_layout.setCurrentWidget(self._snapshot_label)
+            main_layout.addLayout(web_layout)
+            QTimer.singleShot(SNAPSHOT_TIMEOUT_MS, self._dismiss_snapshot)
+        else:
+            main_layout.addWidget(self.webview)
         self.setLayout(main_layout)
 
-    def showEvent(self, event):
-        super().showEvent(event)
-        if not self._maximized_once:
-            self._maximized_once = True
-            QTimer.singleShot(0, self.showMaximized)
-
-    def _get_web_profile_path(self) -> Path:
-        """获取WebView持久化目录（优先用户可写路径）"""
+    def _get_app_data_dir(self) -> Path:
+        """获取用户可写的数据目录"""
         app_data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
-        if app_data_dir:
-            return Path(app_data_dir) / "web_profile"
-
         # 兜底到项目目录（开发环境）
-        return Path("config") / "web_profile"
+        return Path(app_data_dir) if app_data_dir else Path("config")
 
-    def register_external_link_page(self):
-        """注册用于处理新窗口/新标签链接的页面，避免被垃圾回收"""
-        page = ExternalLinkPage(self, self.web_profile)
-        self._external_link_pages.append(page)
-        page.destroyed.connect(lambda: self._cleanup_external_link_page(page))
-        return page
+    def _get_snapshot_path(self) -> Path:
+        """获取启动恢复截图路径"""
+        return self._get_app_data_dir() / "session_snapshot.jpg"
 
-    def _cleanup_external_link_page(self, page):
-        if page in self._external_link_pages:
-            self._external_link_pages.remove(page)
+    def _restore_window_state(self):
+        """按保存的窗口状态设置几何（仅默认会话恢复位置；位置不在任何屏幕内时居中）"""
+        state = self.settings_manager.get_window_state()
+        self.resize(max(int(state.get('width', 1920)), 800), max(int(state.get('height', 1080)), 600))
+
+        position = QPoint(int(state.get('x', 100)), int(state.get('y', 100)))
+        if self.session_id == 1 and QApplication.screenAt(position + QPoint(self.width() // 2, 20)) is not None:
+            self.move(position)
+        else:
+            self.center_dialog()
+
+        if state.get('maximized', False):
+            self.setWindowState(self.windowState() | Qt.WindowState.WindowMaximized)
+
+    def _get_restore_path(self):
+        """获取需要恢复的页面（仅默认会话）
+
+        只恢复登录页：其他页面需要登录后才能访问，启动时不能绕过登录直接打开，其截图也不保存。
+
+        Returns:
+            页面文件路径，无需恢复时返回None
+        """
+        if self.session_id != 1 or not self.settings_manager.get('session_restore.enabled', True):
+            return None
+        if self.settings_manager.get('window.route', '') != LOGIN_PAGE:
+            return None
+        html_path = Path(__file__).parent.parent / LOGIN_PAGE
+        return html_path if html_path.exists() else None
+
+    def _create_snapshot_label(self):
+        """加载上次关闭时的页面截图
+
+        Returns:
+            显示截图的QLabel，没有可用截图时返回None
+        """
+        start = time.perf_counter()
+        pixmap = QPixmap(str(self._get_snapshot_path()))
+        if pixmap.isNull():
+            return None
+        label = QLabel()
+        label.setPixmap(pixmap)
+        # 窗口尺寸与截图不同（例如屏幕变化）时拉伸填充，仅短暂显示
+        label.setScaledContents(True)
+        label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self._snapshot_shown_at = time.perf_counter()
+        metrics.histogram("restore.snapshot_load_ms", "启动恢复截图加载耗时").observe(
+            (self._snapshot_shown_at - start) * 1000
+        )
+        return label
+
+    def _dismiss_snapshot(self):
+        """移除启动恢复截图，露出已加载的页面"""
+        if self._snapshot_label is None:
+            return
+        metrics.histogram("restore.snapshot_visible_ms", "启动恢复截图显示时长（至页面可见）").observe(
+            (time.perf_counter() - self._snapshot_shown_at) * 1000
+        )
+        self._snapshot_label.hide()
+        self._snapshot_label.deleteLater()
+        self._snapshot_label = None
+
+    def _get_current_route(self) -> str:
+        """获取当前页面对应的项目内HTML文件名（外部页面返回空字符串）"""
+        if not self.webview:
+            return ""
+        url = self.webview.url()
+        if not url.isLocalFile():
+            return ""
+        path = Path(url.toLocalFile())
+        return path.name if path.parent.resolve() == Path(__file__).parent.parent.resolve() else ""
+
+    def _save_session_state(self):
+        """保存窗口几何、当前页面与页面截图，供下次启动时作为首帧显示（仅默认会话）"""
+        if self.session_id != 1 or not self.settings_manager.get('session_restore.enabled', True):
+            return
+
+        geometry = self.normalGeometry() if self.isMaximized() else self.geometry()
+        route = self._get_current_route()
+        self.settings_manager.save_window_state(
+            geometry.width(), geometry.height(), geometry.x(), geometry.y(), self.isMaximized(), route
+        )
+        self.settings_manager.save()
+
+        snapshot_path = self._get_snapshot_path()
+        try:
+            if route != LOGIN_PAGE or not self.webview:
+                # 只保存登录页的截图：登录后的页面可能显示患者数据，不能未加密地留在磁盘上、在登录前显示
+                snapshot_path.unlink(missing_ok=True)
+            elif self._snapshot_label is None:
+                snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+                quality = int(self.settings_manager.get('session_restore.snapshot_quality', 70))
+                self.webview.grab().save(str(snapshot_path), "JPG", quality)
+            # 截图仍在显示（页面尚未加载完成）时保留上次的截图
+        except OSError as e:
+            print(f"保存启动恢复截图失败: {e}")
+
+    def _get_web_profile_path(self) -> Path:
+        """获取WebView持久化目录（优先用户可写路径，非默认会话使用各自的子目录）"""
+        base_dir = self._get_app_data_dir()
+        if self.session_id == 1:
+            return base_dir / "web_profile"
+
+        # 与默认会话目录并列，避免被默认会话的缓存管理扫描与淘汰
+        return base_dir / "web_sessions" / str(self.session_id)
+
+    def get_external_link_page(self):
+        """获取用于承接无URL弹窗的页面（常驻单实例，避免每次弹窗创建新页面）"""
+        if self._external_link_page is None:
+            self._external_link_page = ExternalLinkPage(self, self.web_profile)
+        return self._external_link_page
 
     def closeEvent(self, event):
-        """关闭窗口时清理WebEngine资源，避免后台进程残留"""
+        """关闭窗口时清理WebEngine资源，避免后台进程残留（待机模式下只隐藏到托盘）"""
+        self._save_session_state()
+        if self.hide_on_close:
+            event.ignore()
+            self._enter_standby()
+            return
         try:
+            self.browser_launcher.shutdown()
+            self.module_warmup.shutdown()
+            if self.command_palette:
+                self.command_palette.shutdown()
+            if self._owns_module_catalog:
+                self.module_catalog.shutdown()
+            else:
+                self.module_catalog.catalog_changed.disconnect(self._push_catalog_delta)
+            if self._owns_module_usage:
+                self.module_usage.shutdown()
+            if self._owns_download_manager:
+                self.download_manager.shutdown()
+            else:
+                self.download_manager.set_headers_provider(self.session_name, None)
+            self.cache_manager.shutdown()
+            if self._owns_module_cache:
+                self.module_cache.shutdown()
+            else:
+                self.module_cache.set_headers_provider(self.session_name, None)
+
+            # 模块窗口的页面使用本会话的Profile，需先于Profile释放
+            for window in list(self._module_windows):
+                window.close()
+            if self._owns_memory_monitor:
+                self.memory_monitor.shutdown()
+            else:
+                self.memory_monitor.metrics_updated.disconnect(self._push_memory_metrics)
+
             if self.webview:
                 self.webview.setPage(QWebEnginePage(self.web_profile, self))
                 self.webview.deleteLater()
                 self.webview = None
 
-            for page in self._external_link_pages:
-                page.deleteLater()
-            self._external_link_pages.clear()
+            if self._external_link_page:
+                self._external_link_page.deleteLater()
+                self._external_link_page = None
 
             if self.login_page:
                 self.login_page.deleteLater()
@@ -264,9 +734,18 @@ class LoginDialog(QDialog):
 
         super().closeEvent(event)
 
-        app = QApplication.instance()
-        if app:
-            app.quit()
+    def reject(self):
+        """Esc等关闭操作：待机模式下同样只隐藏到托盘"""
+        if self.hide_on_close:
+            self._save_session_state()
+            self._enter_standby()
+            return
+        super().reject()
+
+    def _enter_standby(self):
+        """隐藏窗口并通知应用程序进入待机"""
+        self.hide()
+        self.standby_entered.emit()
 
     def create_native_login_ui(self, main_layout):
         """创建原生Qt登录界面（备用方案）
@@ -441,13 +920,29 @@ class LoginDialog(QDialog):
 
         self.move(x, y)
 
+    def _on_load_started(self):
+        """页面开始加载（记录起始时间用于统计加载耗时）"""
+        self._load_started_at = time.perf_counter()
+
     def on_page_loaded(self, success):
         """页面加载完成回调
 
         Args:
             success: 是否加载成功
         """
+        if self._load_started_at is not None:
+            metrics.histogram("page.load_ms", "页面加载耗时（loadStarted到loadFinished）").observe(
+                (time.perf_counter() - self._load_started_at) * 1000
+            )
+            self._load_started_at = None
+        if not success:
+            metrics.counter("page.load_failures", "页面加载失败次数").inc()
+        # 等页面完成首次绘制后再移除截图，避免闪白
+        QTimer.singleShot(SNAPSHOT_DISMISS_DELAY_MS, self._dismiss_snapshot)
+
         if success:
+            self.memory_monitor.touch(self.webview.page())
+
             # 获取当前加载的URL，判断是登录页面还是主页面
             current_url = self.webview.url().toString()
             if "01-登录.html" in current_url or "登录" in current_url:
@@ -499,51 +994,235 @@ class LoginDialog(QDialog):
                     })();
                 """)
             elif "02-主页面.html" in current_url or "主页面" in current_url:
-                # 注入JavaScript来拦截主页面中的点击事件
+                # 注入JavaScript来拦截主页面中的点击事件（在捕获阶段委托处理，目录渲染的卡片同样适用）
                 self.webview.page().runJavaScript("""
                     (function() {
-                        // 拦截功能卡片的点击事件
-                        function initMainPageHandler() {
-                            const functionCards = document.querySelectorAll('.function-card');
-                            
-                            functionCards.forEach(card => {
-                                // 移除原有的事件监听器（如果有）
-                                const newCard = card.cloneNode(true);
-                                card.parentNode.replaceChild(newCard, card);
-                                
-                                // 添加新的事件监听器
-                                newCard.addEventListener('click', function(e) {
-                                    e.preventDefault();
-                                    e.stopPropagation();
-                                    
-                                    const url = this.dataset.url;
-                                    const title = this.dataset.title;
-                                    
-                                    if (!url) return;
-                                    
-                                    // 检查是否是本地HTML文件（如 03-设置.html）
-                                    if (url.endsWith('.html') && !url.startsWith('http')) {
-                                        // 本地HTML文件，在当前窗口加载
-                                        window.location.href = url;
-                                    } else if (url.startsWith('http')) {
-                                        // 外部URL，通过Python在系统浏览器中打开
-                                        window.location.href = 'python://openurl?url=' + encodeURIComponent(url);
-                                    } else {
-                                        // 其他情况，尝试作为本地文件加载
-                                        window.location.href = url;
-                                    }
-                                });
-                            });
-                        }
-                        
-                        // 等待DOM加载完成
-                        if (document.readyState === 'loading') {
-                            document.addEventListener('DOMContentLoaded', initMainPageHandler);
-                        } else {
-                            initMainPageHandler();
-                        }
+                        if (window.__desktopCardHandler) return;
+                        window.__desktopCardHandler = true;
+
+                        document.addEventListener('click', function(e) {
+                            const card = e.target.closest('.function-card');
+                            if (!card) return;
+                            e.preventDefault();
+                            e.stopPropagation();
+
+                            const url = card.dataset.url;
+                            if (!url) return;
+
+                            if (url.startsWith('http')) {
+                                // 外部URL，通过Python在系统浏览器中打开
+                                window.location.href = 'python://openurl?url=' + encodeURIComponent(url);
+                            } else {
+                                // 本地HTML文件（如 03-设置.html），在当前窗口加载
+                                window.location.href = url;
+                            }
+                        }, true);
+
+                        // 悬停时提高该模块主机的预热优先级（每个卡片只通知一次）
+                        document.addEventListener('mouseover', function(e) {
+                            const card = e.target.closest('.function-card');
+                            if (!card || card.dataset.warmed) return;
+                            const url = card.dataset.url;
+                            if (url && url.startsWith('http')) {
+                                card.dataset.warmed = '1';
+                                window.location.href = 'python://warmup?url=' + encodeURIComponent(url);
+                            }
+                        });
                     })();
                 """)
+                # 推送模块目录（远程清单或内置模块）
+                self._push_module_catalog()
+                # 登录（或恢复到主页面）后开始预热当前科室可见、在程序内打开的模块主机（常用的模块优先）；
+                # 预连接只对WebEngine有效，交给外部浏览器的模块不预热
+                urls = [url for url in self.module_catalog.get_module_urls() if self.module_cache.handles(url)]
+                usage = self.module_usage.for_user(self.current_user)
+                self.module_warmup.start(self.webview.page(), usage.rank(urls) if usage else urls)
+            elif "03-设置.html" in current_url or "设置" in current_url:
+                # 设置页面：推送最近的缓存统计并触发一次刷新
+                if self.cache_manager.get_stats():
+                    self._push_cache_stats(self.cache_manager.get_stats())
+                self.cache_manager.refresh_stats()
+                self.handle_diagnostics_request('memory')
+                self.handle_diagnostics_request('metrics')
+                if self._pending_setting_focus:
+                    self._focus_setting(*self._pending_setting_focus)
+                    self._pending_setting_focus = None
+
+    def handle_cache_request(self, action):
+        """处理来自设置页面的缓存管理请求
+
+        Args:
+            action: 操作类型（stats: 刷新统计，clear: 清除模块缓存）
+        """
+        if action == 'clear':
+            self.cache_manager.clear_module_cache()
+            self.module_cache.clear()
+        self.cache_manager.refresh_stats()
+
+    def _push_cache_stats(self, stats):
+        """将缓存统计推送到设置页面
+
+        Args:
+            stats: 缓存统计字典
+        """
+        if self.webview and self.webview.page():
+            stats = dict(stats, module_pages=self.module_cache.get_stats())
+            self.webview.page().runJavaScript(
+                f"window.onCacheStats && window.onCacheStats({json.dumps(stats, ensure_ascii=False)});"
+            )
+
+    def _is_main_page_loaded(self):
+        """当前是否显示主页面"""
+        return bool(self.webview and self.webview.page()) and "主页面" in self.webview.url().toString()
+
+    def _push_module_catalog(self):
+        """将完整的模块目录推送到主页面（附带最常用模块的得分，页面将其排在前面）"""
+        if self._is_main_page_loaded():
+            snapshot = self.module_catalog.get_snapshot()
+            snapshot["usage"] = {}
+            usage = self.module_usage.for_user(self.current_user)
+            if usage is not None and usage.enabled:
+                promote_count = int(self.settings_manager.get('usage.promote_count', 6))
+                module_ids = {module["url"]: module["id"] for module in snapshot["modules"]}
+                ranked = usage.rank(module_ids, limit=promote_count)
+                scores = usage.get_scores()
+                snapshot["usage"] = {
+                    module_ids[url]: round(scores[url], 4) for url in ranked[:promote_count] if scores.get(url, 0) > 0
+                }
+            self.webview.page().runJavaScript(
+                f"window.onModuleCatalog && window.onModuleCatalog({json.dumps(snapshot, ensure_ascii=False)});"
+            )
+
+    def _push_catalog_delta(self, delta):
+        """将模块目录的增量推送到主页面（远程清单更新后）
+
+        Args:
+            delta: 目录增量
+        """
+        if self._is_main_page_loaded():
+            departments = self.module_catalog.get_departments()
+            self.webview.page().runJavaScript(
+                f"window.onModuleCatalogDelta && window.onModuleCatalogDelta({json.dumps(delta, ensure_ascii=False)});"
+                f"window.onModuleDepartments && window.onModuleDepartments({json.dumps(departments, ensure_ascii=False)});"
+            )
+
+    def handle_catalog_request(self, department):
+        """处理主页面的科室选择
+
+        Args:
+            department: 科室名称，空字符串表示全部
+        """
+        self.module_catalog.set_department(department)
+
+    def handle_standby_request(self, enabled, auto_start):
+        """处理设置页面提交的待机与开机自启动设置
+
+        Args:
+            enabled: 是否启用托盘待机
+            auto_start: 是否开机自启动
+        """
+        self.settings_manager.set('standby.enabled', enabled)
+        self.settings_manager.set('auto_start', auto_start)
+        self.settings_manager.save()
+        self.standby_settings_changed.emit()
+
+    def handle_browser_request(self, browser):
+        """处理设置页面提交的默认浏览器
+
+        Args:
+            browser: 浏览器名称（system/chrome/firefox/edge/safari）
+        """
+        if browser != 'system' and browser not in BROWSER_CANDIDATES:
+            logger.warning(f"忽略未知的默认浏览器设置: {browser}")
+            return
+        if browser == self.settings_manager.get('default_browser', 'system'):
+            return
+        self.settings_manager.set('default_browser', browser)
+        self.settings_manager.save()
+        self.browser_launcher.set_browser(browser)
+        # 预先探测新的浏览器，保存后的首次点击不承担探测开销
+        self.browser_launcher.warm_up()
+
+    def handle_session_request(self, action):
+        """处理页面发起的会话请求
+
+        Args:
+            action: 请求类型（new）
+        """
+        if action == 'new':
+            self.new_session_requested.emit()
+
+    def handle_theme_request(self, theme_name):
+        """处理来自网页的主题切换（同步到原生界面及所有页面）
+
+        Args:
+            theme_name: 主题名称（system表示跟随系统配色）
+        """
+        if not self.theme_manager or theme_name == self.theme_manager.get_theme_mode():
+            return
+        if self.theme_manager.apply_theme(theme_name):
+            self.settings_manager.set('theme_mode', theme_name)
+
+    def handle_diagnostics_request(self, action):
+        """处理来自设置页面的诊断请求
+
+        Args:
+            action: 操作类型（memory: 重新采样内存，metrics: 刷新性能指标，export: 导出性能指标）
+        """
+        if action == 'memory':
+            if self.memory_monitor.get_metrics():
+                self._push_memory_metrics(self.memory_monitor.get_metrics())
+            self.memory_monitor.sample()
+        elif action == 'metrics':
+            self._push_perf_metrics()
+        elif action == 'export':
+            self.export_perf_metrics()
+
+    def _collect_perf_metrics(self):
+        """更新按需采集的仪表（日志量、WebEngine内存）并返回指标快照（含按路由汇总的网页性能）"""
+        log_stats = get_log_stats()
+        metrics.gauge("log.records", "已写入日志队列的记录数").set(log_stats["records"])
+        metrics.gauge("log.dropped", "因队列已满被丢弃的日志记录数").set(log_stats["dropped"])
+        metrics.gauge("log.bytes_written", "日志文件写入字节数").set(log_stats["bytes_written"])
+        metrics.gauge("log.queue_size", "日志队列当前长度").set(log_stats["queue_size"])
+        snapshot = metrics.snapshot()
+        snapshot["web_routes"] = self.web_perf.snapshot()
+        snapshot["request_rules"] = self.request_rules.get_stats()
+        snapshot["warmup"] = self.module_warmup.get_stats()
+        snapshot["catalog"] = self.module_catalog.get_stats()
+        snapshot["usage"] = self.module_usage.get_stats()
+        return snapshot
+
+    def _push_perf_metrics(self):
+        """将性能指标推送到设置页面的诊断面板"""
+        if self.webview and self.webview.page():
+            self.webview.page().runJavaScript(
+                f"window.onPerfMetrics && window.onPerfMetrics({json.dumps(self._collect_perf_metrics(), ensure_ascii=False)});"
+            )
+
+    def export_perf_metrics(self):
+        """将性能指标导出为JSON文件"""
+        default_name = f"metrics_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出性能指标", default_name, "JSON 文件 (*.json)")
+        if not file_path:
+            return
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(self._collect_perf_metrics(), f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            QMessageBox.warning(self, "错误", f"导出性能指标失败: {e}")
+
+    def _push_memory_metrics(self, memory_metrics):
+        """将内存采样结果推送到设置页面的诊断面板
+
+        Args:
+            memory_metrics: 内存采样结果
+        """
+        metrics.gauge("webengine.pss_bytes", "WebEngine进程PSS合计").set(memory_metrics['total_pss'])
+        if self.webview and self.webview.page():
+            self.webview.page().runJavaScript(
+                f"window.onMemoryMetrics && window.onMemoryMetrics({json.dumps(memory_metrics, ensure_ascii=False)});"
+            )
 
     def on_forgot_password(self, event):
         """忘记密码事件处理
@@ -631,6 +1310,7 @@ class LoginDialog(QDialog):
         
         # 保存用户名用于显示
         self.settings_manager.set('display_name', username)
+        self.current_user = username
 
         # 不关闭对话框，而是在WebView中加载主页面
         if self.webview and self.webview.page():
@@ -688,32 +1368,130 @@ class LoginDialog(QDialog):
             
             if html_path.exists() and html_path.suffix == '.html':
                 if self.webview and self.webview.page():
+                    self._record_module_launch(html_path.name)
                     self.webview.load(QUrl.fromLocalFile(str(html_path.resolve())))
-                    # 更新窗口标题
-                    file_name = html_path.stem
-                    if "设置" in file_name:
-                        self.setWindowTitle(f"{self.app_name} - 设置")
-                    elif "登录" in file_name:
-                        self.setWindowTitle(f"{self.app_name} - 登录")
-                    elif "主页面" in file_name or "主页" in file_name:
-                        self.setWindowTitle(f"{self.app_name} - 主页面")
-                    else:
-                        self.setWindowTitle(f"{self.app_name} - {file_name}")
+                    self._update_window_title(html_path)
             else:
                 QMessageBox.warning(self, "错误", f"HTML文件不存在: {html_path}")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"加载HTML文件失败: {str(e)}")
     
+    def _update_window_title(self, html_path):
+        """按页面文件更新窗口标题
+
+        Args:
+            html_path: HTML文件路径
+        """
+        file_name = html_path.stem
+        if "设置" in file_name:
+            self.setWindowTitle(f"{self.app_name} - 设置")
+        elif "登录" in file_name:
+            self.setWindowTitle(f"{self.app_name} - 登录")
+        elif "主页面" in file_name or "主页" in file_name:
+            self.setWindowTitle(f"{self.app_name} - 主页面")
+        else:
+            self.setWindowTitle(f"{self.app_name} - {file_name}")
+
     def open_external_url(self, url):
         """在系统浏览器中打开外部URL
         
         Args:
             url: 要打开的URL
         """
-        try:
-            webbrowser.open(url)
-        except Exception as e:
-            QMessageBox.warning(self, "错误", f"无法打开链接: {str(e)}")
+        self.module_warmup.record_click(url)
+        self._record_module_launch(url)
+        if self.module_cache.handles(url):
+            self.open_module_window(url)
+            return
+        self.browser_launcher.set_browser(self.settings_manager.get('default_browser', 'system'))
+        self.browser_launcher.open(url)
+
+    def show_command_palette(self):
+        """显示命令面板（登录后可用）"""
+        if not self.command_palette or not self.webview or "登录" in self.webview.url().toString():
+            return
+        self.command_palette.show_palette()
+
+    def run_command(self, entry):
+        """执行命令面板中选择的条目
+
+        Args:
+            entry: 命令面板条目（模块、设置项、设置键或页面命令）
+        """
+        kind = entry["kind"]
+        if kind == "module":
+            # 与点击主页面的模块卡片一致
+            if entry["url"].startswith(("http://", "https://")):
+                self.open_external_url(entry["url"])
+            else:
+                self.load_html_file(entry["url"])
+        elif kind == "setting":
+            if SETTINGS_PAGE in self.webview.url().toString():
+                self._focus_setting(entry["section"], entry["label"])
+            else:
+                self._pending_setting_focus = (entry["section"], entry["label"])
+                self.load_html_file(SETTINGS_PAGE)
+        elif kind == "config":
+            # 设置页面中没有的设置键，打开设置文件查看与修改
+            self.settings_manager.save()
+            QDesktopServices.openUrl(QUrl.fromLocalFile(str(self.settings_manager.settings_file)))
+        elif entry["action"] == "page":
+            self.load_html_file(entry["target"])
+        elif entry["action"] == "downloads":
+            self.show_download_panel()
+        elif entry["action"] == "session":
+            self.new_session_requested.emit()
+
+    def _focus_setting(self, section, label):
+        """在设置页面中切换到分区并突出显示设置项
+
+        Args:
+            section: 分区名（侧边栏的 data-section）
+            label: 设置项名称，为空时只切换分区
+        """
+        self.webview.page().runJavaScript(
+            f"window.focusSetting && window.focusSetting({json.dumps(section)}, {json.dumps(label, ensure_ascii=False)});"
+        )
+
+    def _record_module_launch(self, url):
+        """目录中的模块被打开时计入当前用户的使用记录（未登录时、其他链接与页面不记录）
+
+        Args:
+            url: 模块地址（网页地址或程序目录内的页面文件名）
+        """
+        usage = self.module_usage.for_user(self.current_user)
+        if usage is not None and any(module["url"] == url for module in self.module_catalog.get_modules()):
+            usage.record(url)
+
+    def show_download_panel(self):
+        """显示下载面板（首次使用时创建）"""
+        if self._download_panel is None:
+            self._download_panel = DownloadPanel(self.download_manager, self)
+        self._download_panel.show_panel()
+
+    def open_module_window(self, url):
+        """在程序内打开配置了离线缓存的模块页面
+
+        Args:
+            url: 模块地址
+        """
+        window = ModuleWindow(self, url)
+        self._module_windows.append(window)
+        window.destroyed.connect(lambda: self._module_windows.remove(window))
+        window.show()
+
+    def _on_external_launch_finished(self, url, success, elapsed_ms):
+        """外部浏览器启动完成回调（GUI线程）
+
+        Args:
+            url: 打开的URL
+            success: 是否成功
+            elapsed_ms: 启动耗时（毫秒）
+        """
+        metrics.histogram("external.launch_ms", "外部浏览器启动耗时").observe(elapsed_ms)
+        if not success:
+            metrics.counter("external.launch_failures", "外部浏览器启动失败次数").inc()
+            QMessageBox.warning(self, "错误", f"无法打开链接: {url}")
 
     def on_login_failed(self):
         """登录失败处理"""
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模块页面离线缓存
+将配置的模块的静态资源（脚本、样式表、图片、字体）保存在磁盘上，页面本身与接口请求仍直接访问源站：
+命中时立即返回缓存副本，同时在后台向源站重新验证（stale-while-revalidate）；
+网络不可用时继续使用缓存，总大小超出上限时按最近最少使用淘汰
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from PyQt6.QtCore import QObject, QStandardPaths, pyqtSignal
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INDEX_FILE = "index.json"
+
+# 请求源站的超时时间（秒）
+FETCH_TIMEOUT_SECONDS = 15
+
+# 并发请求源站的线程数
+MAX_FETCH_WORKERS = 4
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def get_module_cache_dir() -> Path:
+    """获取模块缓存目录（优先用户可写路径）"""
+    app_data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    # 兜底到项目目录（开发环境）
+    return (Path(app_data_dir) if app_data_dir else Path("config")) / "module_cache"
+
+
+class ModuleResponseCache(QObject):
+    """模块页面离线缓存类（磁盘存储与后台重新验证，不依赖WebEngine）"""
+
+    fetch_finished = pyqtSignal(str)  # 后台请求完成信号（源站URL），成功与否以 lookup 结果为准
+
+    def __init__(self, settings_manager, cache_dir: Optional[Path] = None, parent=None):
+        """初始化模块缓存
+
+        Args:
+            settings_manager: 设置管理器实例
+            cache_dir: 缓存目录，为None时使用用户数据目录下的 module_cache
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.settings_manager = settings_manager
+        self.cache_dir = Path(cache_dir) if cache_dir else get_module_cache_dir()
+        self.prefixes = [
+            url for url in self.settings_manager.get('module_cache.urls', [])
+            if url.startswith(("http://", "https://"))
+        ]
+        # 缓存方案的URL只保留主机与端口，按此找回源站的协议
+        self._origin_schemes = {}
+        for prefix in self.prefixes:
+            parts = urlsplit(prefix)
+            self._origin_schemes[(parts.hostname, parts.port or DEFAULT_PORTS[parts.scheme])] = parts.scheme
+
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self._inflight = set()
+        self._headers_providers = {}  # 会话名称 -> 返回请求头（Cookie等）的函数
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "not_modified": 0,
+            "updated": 0,
+            "errors": 0,
+            "evictions": 0,
+        }
+        self._executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="module-cache")
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用（需要配置至少一个模块入口）"""
+        return bool(self.settings_manager.get('module_cache.enabled', True)) and bool(self.prefixes)
+
+    @property
+    def max_bytes(self) -> int:
+        """缓存总大小上限（字节）"""
+        return int(self.settings_manager.get('module_cache.max_size_mb', 128)) * 1024 * 1024
+
+    @property
+    def revalidate_seconds(self) -> int:
+        """同一资源两次后台重新验证的最小间隔（秒）"""
+        return int(self.settings_manager.get('module_cache.revalidate_seconds', 60))
+
+    def handles(self, url: str) -> bool:
+        """URL是否属于需要缓存的模块资源
+
+        Args:
+            url: 源站URL
+        """
+        return self.enabled and url.startswith(tuple(self.prefixes))
+
+    def to_cache_path(self, url: str) -> str:
+        """源站URL -> 缓存方案URL中的主机、端口与路径部分（不含方案名）
+
+        Args:
+            url: 源站URL
+
+        Returns:
+            形如 //host:port/path?query 的字符串
+        """
+        parts = urlsplit(url)
+        port = parts.port or DEFAULT_PORTS.get(parts.scheme, 443)
+        path = parts.path or "/"
+        query = f"?{parts.query}" if parts.query else ""
+        return f"//{parts.hostname}:{port}{path}{query}"
+
+    def to_origin_url(self, host: str, port: int, path: str, query: str) -> str:
+        """缓存方案URL的各部分 -> 源站URL
+
+        Args:
+            host: 主机
+            port: 端口（缓存方案URL未带端口时为443）
+            path: 路径
+            query: 查询字符串（不含?）
+
+        Returns:
+            源站URL
+        """
+        scheme = self._origin_schemes.get((host, port), "https")
+        netloc = host if port == DEFAULT_PORTS[scheme] else f"{host}:{port}"
+        return f"{scheme}://{netloc}{path or '/'}" + (f"?{query}" if query else "")
+
+    def set_headers_provider(self, session: str, provider: Optional[Callable[[str], Dict[str, str]]]) -> None:
+        """设置会话的请求头来源（需要登录的资源要带上该会话的Cookie）
+
+        Args:
+            session: 会话名称（默认会话为空字符串）
+            provider: 参数为URL、返回请求头字典的函数，None表示移除
+        """
+        with self._lock:
+            if provider is None:
+                self._headers_providers.pop(session, None)
+            else:
+                self._headers_providers[session] = provider
+
+    def lookup(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """读取缓存副本
+
+        Args:
+            url: 源站URL
+
+        Returns:
+            (内容, Content-Type)，未缓存时返回None
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            entry["last_used"] = time.time()
+        try:
+            body = (self.cache_dir / entry["file"]).read_bytes()
+        except OSError:
+            with self._lock:
+                self._index.pop(url, None)
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+        return body, entry["content_type"]
+
+    def fetch(self, url: str, session: str = "") -> None:
+        """在后台请求源站并更新缓存，完成后发出 fetch_finished
+
+        Args:
+            url: 源站URL
+            session: 发起请求的会话名称（决定携带的Cookie）
+        """
+        with self._lock:
+            if url in self._inflight:
+                return
+            self._inflight.add(url)
+        self._executor.submit(self._fetch, url, session)
+
+    def revalidate(self, url: str, session: str = "") -> bool:
+        """缓存命中后在后台重新验证（距上次验证不足间隔时跳过）
+
+        Args:
+            url: 源站URL
+            session: 发起请求的会话名称（决定携带的Cookie）
+
+        Returns:
+            是否有后台请求（新提交或已在进行中），有则稍后发出 fetch_finished
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if entry and time.time() - entry["fetched_at"] < self.revalidate_seconds:
+                return False
+        self.fetch(url, session)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计
+
+        Returns:
+            包含entries、bytes、max_bytes、命中/验证/淘汰计数与urls的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._index)
+            stats["bytes"] = sum(entry["size"] for entry in self._index.values())
+        stats["max_bytes"] = self.max_bytes
+        stats["urls"] = list(self.prefixes)
+        return stats
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            entries = list(self._index.values())
+            self._index.clear()
+            self._save_index()
+        for entry in entries:
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+        logger.info(f"已清除模块页面缓存（{len(entries)} 项）")
+
+    def shutdown(self) -> None:
+        """停止后台请求"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, url: str, session: str = "") -> None:
+        """请求源站（工作线程）：带会话的Cookie与条件请求头，304只刷新验证时间，200写入缓存"""
+        with self._lock:
+            entry = dict(self._index.get(url) or {})
+            provider = self._headers_providers.get(session)
+        request = urllib.request.Request(url, headers=dict(provider(url)) if provider else {})
+        if entry.get("etag"):
+            request.add_header("If-None-Match", entry["etag"])
+        if entry.get("last_modified"):
+            request.add_header("If-Modified-Since", entry["last_modified"])
+
+        try:
+            try:
+                with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT_SECONDS) as response:
+                    if response.status == 200:
+                        self._store(url, response.read(), response.headers)
+            except urllib.error.HTTPError as e:
+                if e.code != 304 or not entry:
+                    raise
+                with self._lock:
+                    if url in self._index:
+                        self._index[url]["fetched_at"] = time.time()
+                    self._stats["not_modified"] += 1
+                    self._stats["revalidated"] += 1
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            logger.warning(f"模块资源请求失败{'（继续使用缓存）' if entry else ''}: {url} - {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(url)
+            self.fetch_finished.emit(url)
+
+    def _store(self, url: str, body: bytes, headers) -> None:
+        """写入缓存文件并更新索引，超出上限时淘汰（工作线程）"""
+        file_name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_dir / f"{file_name}.tmp"
+        temp_path.write_bytes(body)
+        os.replace(temp_path, self.cache_dir / file_name)
+
+        now = time.time()
+        with self._lock:
+            revalidated = url in self._index
+            self._index[url] = {
+                "file": file_name,
+                "content_type": headers.get("Content-Type", "application/octet-stream"),
+                "etag": headers.get("ETag", ""),
+                "last_modified": headers.get("Last-Modified", ""),
+                "size": len(body),
+                "fetched_at": now,
+                "last_used": self._index.get(url, {}).get("last_used", now),
+            }
+            self._stats["updated"] += 1
+            if revalidated:
+                self._stats["revalidated"] += 1
+            evicted = self._evict()
+            self._save_index()
+        for file in evicted:
+            (self.cache_dir / file).unlink(missing_ok=True)
+
+    def _evict(self) -> List[str]:
+        """按最近最少使用淘汰，直到总大小不超过上限（需持有锁）
+
+        Returns:
+            被淘汰的缓存文件名
+        """
+        max_bytes = self.max_bytes
+        total = sum(entry["size"] for entry in self._index.values())
+        evicted = []
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= max_bytes:
+                break
+            del self._index[url]
+            total -= entry["size"]
+            evicted.append(entry["file"])
+            self._stats["evictions"] += 1
+        return evicted
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """读取缓存索引"""
+        try:
+            with open(self.cache_dir / INDEX_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self) -> None:
+        """写入缓存索引（需持有锁）"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_dir / f"{INDEX_FILE}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f, ensure_ascii=False)
+            os.replace(temp_path, self.cache_dir / INDEX_FILE)
+        except OSError as e:
+            logger.warning(f"写入模块缓存索引失败: {e}")
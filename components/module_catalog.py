@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模块目录
+主页面的模块卡片由目录数据生成：配置了清单地址时从远程清单获取（ETag/If-Modified-Since条件请求），
+保存在本地供离线启动使用，更新时按模块ID计算增量（新增/修改/删除）推送给页面；
+未配置清单时由 urls 设置生成内置的模块
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from PyQt6.QtCore import QObject, QStandardPaths, QTimer, pyqtSignal
+
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+CATALOG_FILE = "module_catalog.json"
+
+# 请求清单的超时时间（秒）
+FETCH_TIMEOUT_SECONDS = 15
+
+# 内置模块：urls 设置中的键 -> 卡片信息（与主页面原有的卡片一致）
+BUILTIN_MODULES = [
+    ("user_management", "患者管理", "管理患者信息、病历记录和健康状况跟踪", "👥", "users"),
+    ("assessment", "评估管理", "进行健康评估、风险分析和智能诊断建议", "📊", "analytics"),
+    ("diet", "饮食管理", "制定饮食计划、营养分析和膳食建议", "🍎", "settings"),
+    ("exercise", "运动管理", "设计运动方案、健身计划和康复训练指导", "🏃", "monitor"),
+    ("system", "系统管理", "配置系统参数、用户权限和数据安全管理", "⚙️", "settings"),
+    ("work", "工作管理", "管理工作任务、日程安排和团队协作", "💼", "messages"),
+    ("ai", "人工智能", "智能诊断助手、AI健康顾问和数据分析工具", "🤖", "help"),
+    ("help", "帮助文档", "查看使用教程、常见问题和操作指南", "📖", "help"),
+]
+
+# 系统管理卡片打开程序内的设置页面
+BUILTIN_LOCAL_PAGES = {"system": "03-设置.html"}
+
+
+def get_catalog_path() -> Path:
+    """获取本地目录文件路径（优先用户可写路径）"""
+    app_data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    # 兜底到项目目录（开发环境）
+    return (Path(app_data_dir) if app_data_dir else Path("config")) / CATALOG_FILE
+
+
+def normalize_module(entry: Any) -> Optional[Dict[str, Any]]:
+    """校验并规范化清单中的一个模块
+
+    模块字段：id、title、description、url、icon、icon_class、departments（或单个 department）、order。
+    未指定 order 的模块按0处理，同序号的按标题排序（不按清单中的位置，避免增删一项导致其后所有模块都算作修改）。
+
+    Args:
+        entry: 清单中的模块
+
+    Returns:
+        规范化后的模块，无效时返回None
+    """
+    if not isinstance(entry, dict):
+        return None
+    url = str(entry.get("url", ""))
+    # 只接受网页地址或程序目录内的页面文件名，避免清单引入 javascript: 等地址
+    if not (url.startswith(("http://", "https://")) or (url.endswith(".html") and Path(url).name == url)):
+        return None
+    module_id = str(entry.get("id") or url)
+    departments = entry.get("departments", entry.get("department", []))
+    if isinstance(departments, str):
+        departments = [departments]
+    order = entry.get("order", 0)
+    if not isinstance(order, (int, float)) or isinstance(order, bool):
+        order = 0
+    return {
+        "id": module_id,
+        "title": str(entry.get("title") or module_id),
+        "description": str(entry.get("description", "")),
+        "url": url,
+        "icon": str(entry.get("icon", "📦")),
+        "icon_class": str(entry.get("icon_class", "users")),
+        "departments": sorted(str(d) for d in departments if d),
+        "order": order,
+    }
+
+
+class ModuleCatalog(QObject):
+    """模块目录类"""
+
+    catalog_changed = pyqtSignal(dict)  # 目录增量 {"added": [...], "updated": [...], "removed": [id], "version"}
+
+    def __init__(self, settings_manager, catalog_path: Optional[Path] = None, parent=None):
+        """初始化模块目录并读取本地保存的清单
+
+        Args:
+            settings_manager: 设置管理器实例
+            catalog_path: 本地目录文件路径，为None时使用用户数据目录下的 module_catalog.json
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.settings_manager = settings_manager
+        self.catalog_path = Path(catalog_path) if catalog_path else get_catalog_path()
+        self._lock = threading.Lock()
+        self._modules = {}  # id -> 模块
+        self._state = {"etag": "", "last_modified": "", "fetched_at": 0, "version": ""}
+        self._stats = {"fetches": 0, "not_modified": 0, "updated": 0, "errors": 0}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="module-catalog")
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._load()
+
+    @property
+    def manifest_url(self) -> str:
+        """远程清单地址（为空时使用内置模块）"""
+        return str(self.settings_manager.get('catalog.manifest_url', '') or '')
+
+    @property
+    def department(self) -> str:
+        """当前选择的科室（为空时显示全部）"""
+        return str(self.settings_manager.get('catalog.department', '') or '')
+
+    def start(self) -> None:
+        """立即刷新一次清单并按间隔定期刷新"""
+        if not self.manifest_url:
+            return
+        minutes = int(self.settings_manager.get('catalog.refresh_minutes', 30))
+        if minutes > 0:
+            self._timer.start(minutes * 60 * 1000)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """在后台请求远程清单，有变化时发出 catalog_changed"""
+        if self.manifest_url:
+            self._executor.submit(self._fetch, self.manifest_url)
+
+    def set_department(self, department: str) -> None:
+        """选择科室（保存到设置，下次启动沿用）
+
+        Args:
+            department: 科室名称，空字符串表示全部
+        """
+        self.settings_manager.set('catalog.department', department)
+        self.settings_manager.save()
+
+    def get_modules(self) -> List[Dict[str, Any]]:
+        """获取全部模块（按order排序）"""
+        with self._lock:
+            modules = list(self._modules.values()) if self.manifest_url else self._builtin_modules()
+        return sorted(modules, key=lambda module: (module["order"], module["title"]))
+
+    def get_departments(self) -> List[str]:
+        """获取目录中出现的全部科室"""
+        return sorted({department for module in self.get_modules() for department in module["departments"]})
+
+    def get_module_urls(self) -> List[str]:
+        """获取当前科室可见模块的网页地址（用于登录后预热）"""
+        department = self.department
+        return [
+            module["url"] for module in self.get_modules()
+            if module["url"].startswith(("http://", "https://"))
+            and (not department or not module["departments"] or department in module["departments"])
+        ]
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """获取推送给页面的完整目录
+
+        Returns:
+            {"modules", "departments", "department", "version"}
+        """
+        return {
+            "modules": self.get_modules(),
+            "departments": self.get_departments(),
+            "department": self.department,
+            "version": self._state["version"],
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取清单请求统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["modules"] = len(self._modules)
+            stats["fetched_at"] = self._state["fetched_at"]
+        stats["manifest_url"] = self.manifest_url
+        return stats
+
+    def shutdown(self) -> None:
+        """停止定期刷新与后台请求"""
+        self._timer.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def apply_manifest(self, manifest: Any) -> Dict[str, Any]:
+        """按清单增量更新目录
+
+        清单为 {"version", "modules": [...]} 或直接为模块列表，模块字段见 normalize_module（其他字段忽略）。
+
+        Args:
+            manifest: 解析后的清单
+
+        Returns:
+            增量 {"added", "updated", "removed", "version"}
+        """
+        entries = manifest.get("modules", []) if isinstance(manifest, dict) else manifest
+        version = str(manifest.get("version", "")) if isinstance(manifest, dict) else ""
+        modules = {}
+        for entry in entries if isinstance(entries, list) else []:
+            module = normalize_module(entry)
+            if module is not None:
+                modules[module["id"]] = module
+
+        with self._lock:
+            old = self._modules
+            delta = {
+                "added": [module for module_id, module in modules.items() if module_id not in old],
+                "updated": [
+                    module for module_id, module in modules.items()
+                    if module_id in old and old[module_id] != module
+                ],
+                "removed": [module_id for module_id in old if module_id not in modules],
+                "version": version,
+            }
+            self._modules = modules
+            self._state["version"] = version
+        return delta
+
+    def _builtin_modules(self) -> List[Dict[str, Any]]:
+        """由 urls 设置生成内置模块"""
+        urls = self.settings_manager.get('urls', {})
+        modules = []
+        for index, (key, title, description, icon, icon_class) in enumerate(BUILTIN_MODULES):
+            url = BUILTIN_LOCAL_PAGES.get(key) or urls.get(key)
+            if url:
+                modules.append(normalize_module({
+                    "id": key, "title": title, "description": description,
+                    "url": url, "icon": icon, "icon_class": icon_class, "order": index,
+                }))
+        return [module for module in modules if module is not None]
+
+    def _fetch(self, url: str) -> None:
+        """请求远程清单（工作线程）：带条件请求头，304只更新时间，200增量应用并保存"""
+        started = time.perf_counter()
+        request = urllib.request.Request(url)
+        with self._lock:
+            if self._state["etag"]:
+                request.add_header("If-None-Match", self._state["etag"])
+            if self._state["last_modified"]:
+                request.add_header("If-Modified-Since", self._state["last_modified"])
+            self._stats["fetches"] += 1
+
+        try:
+            try:
+                with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT_SECONDS) as response:
+                    manifest = json.loads(response.read().decode('utf-8'))
+                    headers = response.headers
+            except urllib.error.HTTPError as e:
+                if e.code != 304:
+                    raise
+                with self._lock:
+                    self._state["fetched_at"] = time.time()
+                    self._stats["not_modified"] += 1
+                    self._save()
+                return
+
+            delta = self.apply_manifest(manifest)
+            with self._lock:
+                self._state["etag"] = headers.get("ETag", "")
+                self._state["last_modified"] = headers.get("Last-Modified", "")
+                self._state["fetched_at"] = time.time()
+                self._stats["updated"] += 1
+                self._save()
+            metrics.histogram("catalog.fetch_ms", "模块清单请求耗时").observe((time.perf_counter() - started) * 1000)
+            if delta["added"] or delta["updated"] or delta["removed"]:
+                logger.info(
+                    f"模块目录已更新: 新增 {len(delta['added'])}，修改 {len(delta['updated'])}，"
+                    f"删除 {len(delta['removed'])}（共 {len(self._modules)} 个）"
+                )
+                self.catalog_changed.emit(delta)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            logger.warning(f"获取模块清单失败（继续使用本地目录）: {url} - {e}")
+
+    def _load(self) -> None:
+        """读取本地保存的目录（清单地址变更后作废）"""
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("manifest_url") != self.manifest_url:
+            return
+        self._modules = {module["id"]: module for module in data.get("modules", [])}
+        for key in self._state:
+            self._state[key] = data.get(key, self._state[key])
+
+    def _save(self) -> None:
+        """保存目录（需持有锁）"""
+        try:
+            self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.catalog_path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    dict(self._state, manifest_url=self.manifest_url, modules=list(self._modules.values())),
+                    f, ensure_ascii=False
+                )
+            os.replace(temp_path, self.catalog_path)
+        except OSError as e:
+            logger.warning(f"保存模块目录失败: {e}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模块缓存的WebEngine接入
+Profile的请求拦截器（见 request_interceptor）把配置的模块的静态资源重定向到自定义方案 dm-cache://host:port/path，
+方案处理器从 ModuleResponseCache 返回缓存副本（未缓存时等待后台请求完成）。
+主框架导航与XHR/fetch不重定向，页面保持在https源上（Cookie、localStorage与同源接口请求不受影响）
+"""
+
+from PyQt6.QtCore import QBuffer, QUrl
+from PyQt6.QtWebEngineCore import QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MODULE_CACHE_SCHEME = b"dm-cache"
+
+# 方案URL未带端口时的默认端口（与https一致）
+MODULE_CACHE_DEFAULT_PORT = 443
+
+# 经模块缓存加载的资源类型（见 request_rules.RESOURCE_TYPE_NAMES 的取值）
+MODULE_CACHE_RESOURCE_TYPES = ("script", "stylesheet", "image", "font")
+
+
+def register_module_cache_scheme() -> None:
+    """注册模块缓存方案（必须在创建QApplication之前调用）"""
+    scheme = QWebEngineUrlScheme(MODULE_CACHE_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.HostAndPort)
+    scheme.setDefaultPort(MODULE_CACHE_DEFAULT_PORT)
+    scheme.setFlags(
+        QWebEngineUrlScheme.Flag.SecureScheme
+        | QWebEngineUrlScheme.Flag.CorsEnabled
+        | QWebEngineUrlScheme.Flag.FetchApiAllowed
+    )
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def to_cache_url(cache, url: str) -> QUrl:
+    """源站URL -> 模块缓存方案URL
+
+    Args:
+        cache: ModuleResponseCache实例
+        url: 源站URL
+    """
+    return QUrl(f"{MODULE_CACHE_SCHEME.decode()}:{cache.to_cache_path(url)}")
+
+
+def install_module_cache(profile, cache, session: str = "") -> None:
+    """在Profile中安装模块缓存的方案处理器
+
+    Args:
+        profile: QWebEngineProfile实例
+        cache: ModuleResponseCache实例
+        session: 会话名称（后台请求带上该会话的Cookie，见 ModuleResponseCache.set_headers_provider）
+    """
+    if cache.enabled:
+        profile.installUrlSchemeHandler(MODULE_CACHE_SCHEME, ModuleCacheSchemeHandler(cache, session, profile))
+
+
+class ModuleCacheSchemeHandler(QWebEngineUrlSchemeHandler):
+    """模块缓存方案处理器：命中立即返回并后台重新验证，未命中等待后台请求"""
+
+    def __init__(self, cache, session: str = "", parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.session = session
+        self._pending = {}  # 源站URL -> [等待中的请求]
+        self.cache.fetch_finished.connect(self._on_fetch_finished)
+
+    def requestStarted(self, job):
+        if bytes(job.requestMethod()) != b"GET":
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+
+        request_url = job.requestUrl()
+        url = self.cache.to_origin_url(
+            request_url.host(),
+            request_url.port(MODULE_CACHE_DEFAULT_PORT),
+            request_url.path(QUrl.ComponentFormattingOption.FullyEncoded),
+            request_url.query(QUrl.ComponentFormattingOption.FullyEncoded),
+        )
+
+        cached = self.cache.lookup(url)
+        if cached is not None:
+            self._reply(job, *cached)
+            self.cache.revalidate(url, self.session)
+            return
+
+        # 请求被取消（页面关闭或跳转）时Qt会删除job，不能再回复
+        jobs = self._pending.setdefault(url, [])
+        jobs.append(job)
+        job.destroyed.connect(lambda: jobs.remove(job) if job in jobs else None)
+        self.cache.fetch(url, self.session)
+
+    def _on_fetch_finished(self, url: str) -> None:
+        jobs = self._pending.pop(url, [])
+        if not jobs:
+            return
+        cached = self.cache.lookup(url)
+        for job in jobs:
+            if cached is not None:
+                self._reply(job, *cached)
+            else:
+                job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+
+    def _reply(self, job, body: bytes, content_type: str) -> None:
+        # 页面在https源上，缓存方案是另一个源：字体与模块脚本按CORS加载，需允许发起请求的源
+        initiator = job.initiator()
+        if initiator.isValid():
+            origin = initiator.toString(QUrl.UrlFormattingOption.RemovePath | QUrl.UrlFormattingOption.RemoveQuery)
+            job.setAdditionalResponseHeaders({b"Access-Control-Allow-Origin": origin.encode()})
+        buffer = QBuffer(job)
+        buffer.setData(body)
+        job.reply(content_type.encode('latin-1', 'ignore'), buffer)
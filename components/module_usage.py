@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模块使用记录
+按登录用户分别记录（同一台电脑上的多个用户各自排序）：每次打开模块追加一行到该用户的使用日志（序号、时间、模块地址），日志达到一定行数或程序退出时合并进固定大小的摘要：
+每个模块一项衰减得分（frecency，按半衰期指数衰减，打开一次加1），只保留得分最高的若干项。
+启动时读取摘要并重放未合并的日志（行数有上限），读取量与模块数相关而与使用历史长度无关
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from PyQt6.QtCore import QStandardPaths
+
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# 摘要与日志文件名（{user}为用户名转换后的安全文件名）
+SUMMARY_FILE = "module_usage_{user}.json"
+LOG_FILE = "module_usage_{user}.log"
+
+
+def get_usage_dir() -> Path:
+    """获取使用记录目录（优先用户可写路径）"""
+    app_data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    # 兜底到项目目录（开发环境）
+    return Path(app_data_dir) if app_data_dir else Path("config")
+
+
+def user_file_key(username: str) -> str:
+    """用户名 -> 文件名中使用的标识（只保留字母数字等安全字符，有替换时附加哈希避免重名）"""
+    safe = re.sub(r'[^\w.-]', "_", username)[:64]
+    if safe != username:
+        safe += "_" + hashlib.sha1(username.encode('utf-8')).hexdigest()[:8]
+    return safe
+
+
+class ModuleUsage:
+    """模块使用记录类（按用户名管理各用户的记录，跨会话共享）"""
+
+    def __init__(self, settings_manager, usage_dir: Optional[Path] = None):
+        """初始化
+
+        Args:
+            settings_manager: 设置管理器实例
+            usage_dir: 摘要与日志所在目录，为None时使用用户数据目录
+        """
+        self.settings_manager = settings_manager
+        self.usage_dir = Path(usage_dir) if usage_dir else get_usage_dir()
+        self._lock = threading.Lock()
+        self._users = {}  # 用户名 -> UserModuleUsage
+
+    def for_user(self, username: str) -> Optional["UserModuleUsage"]:
+        """获取用户的使用记录（首次获取时读取该用户的摘要与日志）
+
+        Args:
+            username: 登录用户名
+
+        Returns:
+            该用户的使用记录，用户名为空时返回None
+        """
+        if not username:
+            return None
+        with self._lock:
+            usage = self._users.get(username)
+            if usage is None:
+                key = user_file_key(username)
+                usage = self._users[username] = UserModuleUsage(
+                    self.settings_manager,
+                    self.usage_dir / SUMMARY_FILE.format(user=key),
+                    self.usage_dir / LOG_FILE.format(user=key),
+                )
+            return usage
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各用户使用记录的合计统计"""
+        with self._lock:
+            users = list(self._users.values())
+        stats = {"users": len(users)}
+        for usage in users:
+            for key, value in usage.get_stats().items():
+                stats[key] = stats.get(key, 0) + value
+        return stats
+
+    def shutdown(self) -> None:
+        """退出前合并各用户的日志"""
+        with self._lock:
+            users = list(self._users.values())
+        for usage in users:
+            usage.compact()
+
+
+class UserModuleUsage:
+    """单个用户的模块使用记录类"""
+
+    def __init__(self, settings_manager, summary_path: Path, log_path: Path):
+        """初始化并读取摘要与未合并的日志
+
+        Args:
+            settings_manager: 设置管理器实例
+            summary_path: 摘要文件路径
+            log_path: 使用日志路径
+        """
+        self.settings_manager = settings_manager
+        self.summary_path = summary_path
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._entries = {}  # 模块地址 -> [得分, 得分对应的时间, 打开次数, 最近打开时间]
+        self._seq = 0  # 最近一条日志的序号
+        self._compacted_seq = 0  # 已合并进摘要的最大序号
+        self._pending = 0  # 日志中未合并的行数
+        self._stats = {"launches": 0, "compactions": 0, "replayed": 0}
+        self._load()
+
+    @property
+    def enabled(self) -> bool:
+        """是否按使用记录排序"""
+        return bool(self.settings_manager.get('usage.enabled', True))
+
+    @property
+    def half_life_seconds(self) -> float:
+        """得分的半衰期（秒）"""
+        return max(float(self.settings_manager.get('usage.half_life_days', 14)), 0.01) * 86400
+
+    def record(self, key: str, now: Optional[float] = None) -> None:
+        """记录一次打开模块（追加日志，达到合并行数时合并）
+
+        Args:
+            key: 模块地址
+            now: 打开时间，为None时使用当前时间
+        """
+        if not self.enabled or not key or any(c in key for c in "\t\r\n"):
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            self._seq += 1
+            self._apply(key, now)
+            self._stats["launches"] += 1
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(f"{self._seq}\t{now:.0f}\t{key}\n")
+                self._pending += 1
+            except OSError as e:
+                logger.warning(f"写入模块使用日志失败: {e}")
+            compact = self._pending >= int(self.settings_manager.get('usage.compact_every', 64))
+        metrics.counter("usage.launches", "模块打开次数").inc()
+        if compact:
+            self.compact()
+
+    def get_scores(self, now: Optional[float] = None) -> Dict[str, float]:
+        """获取各模块当前的衰减得分
+
+        Args:
+            now: 计算得分的时间，为None时使用当前时间
+
+        Returns:
+            模块地址 -> 得分
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return {key: self._decayed(entry, now) for key, entry in self._entries.items()}
+
+    def rank(self, keys: Iterable[str], limit: Optional[int] = None) -> List[str]:
+        """按得分从高到低排列模块（未使用过的保持原顺序排在后面）
+
+        Args:
+            keys: 模块地址
+            limit: 只提前得分最高的若干个，为None时提前全部使用过的模块
+
+        Returns:
+            排序后的模块地址
+        """
+        keys = list(keys)
+        if not self.enabled:
+            return keys
+        scores = self.get_scores()
+        used = sorted((key for key in keys if scores.get(key, 0) > 0), key=lambda key: -scores[key])
+        promoted = used if limit is None else used[:limit]
+        promoted_set = set(promoted)
+        return promoted + [key for key in keys if key not in promoted_set]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取使用记录统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["modules"] = len(self._entries)
+            stats["pending"] = self._pending
+        return stats
+
+    def compact(self) -> None:
+        """将日志合并进摘要（只保留得分最高的 usage.max_entries 个模块）并清空日志"""
+        started = time.perf_counter()
+        now = time.time()
+        max_entries = int(self.settings_manager.get('usage.max_entries', 256))
+        with self._lock:
+            if self._pending == 0 and self._compacted_seq == self._seq:
+                return
+            if len(self._entries) > max_entries:
+                ranked = sorted(self._entries.items(), key=lambda item: -self._decayed(item[1], now))
+                self._entries = dict(ranked[:max_entries])
+            summary = {
+                "seq": self._seq,
+                "modules": {
+                    key: [round(score, 6), round(ref), count, round(last)]
+                    for key, (score, ref, count, last) in self._entries.items()
+                },
+            }
+            try:
+                self.summary_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.summary_path.with_suffix(".tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(summary, f, ensure_ascii=False)
+                os.replace(temp_path, self.summary_path)
+                # 摘要已记录合并到的序号，清空日志前中断也不会重复计算
+                with open(self.log_path, 'w', encoding='utf-8'):
+                    pass
+            except OSError as e:
+                logger.warning(f"合并模块使用日志失败: {e}")
+                return
+            self._compacted_seq = self._seq
+            self._pending = 0
+            self._stats["compactions"] += 1
+        metrics.histogram("usage.compact_ms", "模块使用日志合并耗时").observe((time.perf_counter() - started) * 1000)
+
+    def _apply(self, key: str, now: float) -> None:
+        """把一次打开计入得分（需持有锁）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [1.0, now, 1, now]
+        else:
+            entry[0] = self._decayed(entry, now) + 1
+            entry[1] = now
+            entry[2] += 1
+            entry[3] = max(entry[3], now)
+
+    def _decayed(self, entry: List[Any], now: float) -> float:
+        """得分衰减到指定时间"""
+        return entry[0] * math.pow(2, -max(now - entry[1], 0) / self.half_life_seconds)
+
+    def _load(self) -> None:
+        """读取摘要并重放其后的日志"""
+        try:
+            with open(self.summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+            self._entries = {key: list(entry) for key, entry in summary.get("modules", {}).items()}
+            self._seq = self._compacted_seq = int(summary.get("seq", 0))
+        except (OSError, json.JSONDecodeError, TypeError, ValueError):
+            pass
+
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 3:
+                        continue
+                    try:
+                        seq, launched_at = int(parts[0]), float(parts[1])
+                    except ValueError:
+                        continue
+                    self._pending += 1
+                    if seq > self._compacted_seq:
+                        self._apply(parts[2], launched_at)
+                        self._seq = max(self._seq, seq)
+                        self._stats["replayed"] += 1
+        except OSError:
+            pass
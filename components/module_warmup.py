@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模块主机预热
+登录后在主页面插入各模块主机的 dns-prefetch / preconnect 提示，由WebEngine（Chromium）预先完成
+DNS、TCP与TLS握手，程序内的模块窗口与主页面共用Profile的连接池与DNS缓存
+（只对程序内打开的模块有效，交给外部浏览器的模块不在预热范围内）；
+同时进行的主机数受并发上限约束，GUI事件循环明显滞后或系统负载较高时推迟，
+鼠标悬停在模块卡片上时该主机提到队首（已预热的主机重新预连接）
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from PyQt6.QtCore import QObject, QTimer
+
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# 调度检查间隔（毫秒）
+WARMUP_TICK_MS = 250
+
+# 每个主机占用并发槽位的时间（毫秒）；预连接提示没有完成通知，按此错开握手
+PRECONNECT_HOLD_MS = 300
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# 在页面中插入连接提示（不带crossorigin，与页面导航使用同一类连接）
+PRECONNECT_SCRIPT = """
+(function(origin) {
+    for (const rel of ['dns-prefetch', 'preconnect']) {
+        const link = document.createElement('link');
+        link.rel = rel;
+        link.href = origin;
+        document.head.appendChild(link);
+    }
+})(%s);
+"""
+
+
+def preconnect_page(page, origin: str) -> None:
+    """在页面中插入主机的连接提示，由WebEngine解析域名并建立连接
+
+    Args:
+        page: QWebEnginePage实例（与模块窗口使用同一Profile）
+        origin: 主机源，如 https://example.com
+    """
+    page.runJavaScript(PRECONNECT_SCRIPT % json.dumps(origin))
+
+
+class _HostJob:
+    """一个主机的预热任务"""
+
+    __slots__ = ("origin", "state")
+
+    def __init__(self, origin: str):
+        self.origin = origin
+        self.state = "queued"  # queued / running / done
+
+
+class ModuleWarmup(QObject):
+    """模块主机预热类"""
+
+    def __init__(self, settings_manager, parent=None):
+        """初始化预热调度
+
+        Args:
+            settings_manager: 设置管理器实例
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.settings_manager = settings_manager
+        self._page = None
+        self._jobs = {}  # origin -> _HostJob
+        self._queue = []  # 等待中的origin，队首优先
+        self._started = False
+        self._last_tick = None
+        self._stats = {"preconnected": 0, "repreconnected": 0, "deferred": 0, "prioritized": 0}
+        self._timer = QTimer(self)
+        self._timer.setInterval(WARMUP_TICK_MS)
+        self._timer.timeout.connect(self._pump)
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用预热"""
+        return bool(self.settings_manager.get('warmup.enabled', True))
+
+    @property
+    def max_concurrent(self) -> int:
+        """同时预热的主机数上限"""
+        return max(int(self.settings_manager.get('warmup.max_concurrent', 2)), 1)
+
+    def start(self, page, urls: Optional[List[str]] = None) -> None:
+        """登录后开始预热（重复调用无效果）
+
+        Args:
+            page: 插入连接提示的页面（主页面，与模块窗口使用同一Profile）
+            urls: 需要预热的模块地址（程序内打开的模块），为None时使用 urls 设置
+        """
+        if self._started or not self.enabled:
+            return
+        urls = self._get_module_urls() if urls is None else urls
+        if not urls:
+            # 没有在程序内打开的模块，不预热
+            return
+        self._started = True
+        self._page = page
+
+        for url in urls:
+            self._get_job(url, create=True)
+        self._queue = list(self._jobs)
+        if not self._queue:
+            return
+
+        logger.info(f"登录后预热 {len(self._queue)} 个模块主机（并发 {self.max_concurrent}）")
+        # 先让主页面完成渲染，再开始预热
+        QTimer.singleShot(int(self.settings_manager.get('warmup.delay_ms', 1500)), self._start_timer)
+
+    def prioritize(self, url: str) -> None:
+        """提高模块所在主机的预热优先级（鼠标悬停在卡片上时调用）
+
+        悬停代表即将点击，排到队首并立即尝试开始，不受繁忙推迟的约束（仍受并发上限约束）；
+        已预热的主机重新预连接（浏览器内核会关闭长时间未使用的预连接）。
+
+        Args:
+            url: 模块地址
+        """
+        job = self._get_job(url)
+        if job is None or not self._started:
+            return
+        if job.state == "done":
+            preconnect_page(self._page, job.origin)
+            self._stats["repreconnected"] += 1
+            return
+        if job.state != "queued":
+            return
+        self._queue.remove(job.origin)
+        self._queue.insert(0, job.origin)
+        self._stats["prioritized"] += 1
+        self._pump(force=True)
+
+    def record_click(self, url: str) -> None:
+        """记录模块点击时对应主机是否已完成预热
+
+        Args:
+            url: 模块地址
+        """
+        job = self._get_job(url)
+        if job is None:
+            return
+        warm = job.state == "done"
+        metrics.counter(
+            "warmup.clicks_warm" if warm else "warmup.clicks_cold", "模块点击时主机已/未完成预热次数"
+        ).inc()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取预热统计
+
+        Returns:
+            各计数与 hosts（origin -> 状态）
+        """
+        stats = dict(self._stats)
+        stats["hosts"] = {origin: job.state for origin, job in self._jobs.items()}
+        return stats
+
+    def shutdown(self) -> None:
+        """停止预热"""
+        self._timer.stop()
+        self._queue.clear()
+
+    def _get_module_urls(self) -> List[str]:
+        urls = self.settings_manager.get('urls', {})
+        return [url for url in urls.values() if isinstance(url, str) and url.startswith(("http://", "https://"))]
+
+    def _get_job(self, url: str, create: bool = False) -> Optional[_HostJob]:
+        parts = urlsplit(url)
+        if parts.scheme not in DEFAULT_PORTS or not parts.hostname:
+            return None
+        port = parts.port or DEFAULT_PORTS[parts.scheme]
+        netloc = parts.hostname if port == DEFAULT_PORTS[parts.scheme] else f"{parts.hostname}:{port}"
+        origin = f"{parts.scheme}://{netloc}"
+        job = self._jobs.get(origin)
+        if job is None and create:
+            job = self._jobs[origin] = _HostJob(origin)
+        return job
+
+    def _start_timer(self) -> None:
+        self._last_tick = time.monotonic()
+        self._timer.start()
+        self._pump()
+
+    def _is_busy(self) -> bool:
+        """机器是否繁忙：GUI事件循环滞后超过阈值，或（POSIX）每核平均负载超过阈值"""
+        now = time.monotonic()
+        last_tick, self._last_tick = self._last_tick, now
+        lag_ms = (now - last_tick) * 1000 - WARMUP_TICK_MS if last_tick is not None else 0
+        if lag_ms > int(self.settings_manager.get('warmup.busy_lag_ms', 200)):
+            return True
+        if hasattr(os, 'getloadavg'):
+            load_per_cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+            if load_per_cpu > float(self.settings_manager.get('warmup.busy_load', 0.8)):
+                return True
+        return False
+
+    def _pump(self, force: bool = False) -> None:
+        """按并发上限开始排队中的主机（定时器与悬停触发）"""
+        running = sum(1 for job in self._jobs.values() if job.state == "running")
+        if not force and self._queue and running < self.max_concurrent and self._is_busy():
+            self._stats["deferred"] += 1
+            metrics.counter("warmup.deferred", "机器繁忙时推迟预热的次数").inc()
+            return
+
+        while self._queue and running < self.max_concurrent:
+            self._run(self._jobs[self._queue.pop(0)])
+            running += 1
+
+        if not self._queue and running == 0:
+            self._timer.stop()
+
+    def _run(self, job: _HostJob) -> None:
+        """在页面中插入主机的连接提示，占用并发槽位一段时间后完成"""
+        job.state = "running"
+        preconnect_page(self._page, job.origin)
+        self._stats["preconnected"] += 1
+        metrics.counter("warmup.preconnects", "预连接的模块主机数").inc()
+        QTimer.singleShot(PRECONNECT_HOLD_MS, lambda: self._finish(job))
+
+    def _finish(self, job: _HostJob) -> None:
+        if job.state != "running":
+            return
+        job.state = "done"
+        self._pump(force=True)
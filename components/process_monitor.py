@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebEngine进程内存监控
+定期通过/proc采样浏览器进程及其QtWebEngineProcess子进程（渲染/GPU/工具进程）的RSS与PSS，
+按页面归集，超出预算时丢弃最久未使用的后台页面
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEnginePage
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PROC_ROOT = Path("/proc")
+
+# WebEngine子进程的可执行文件名（本进程启动的其他程序，如外部浏览器，不计入）
+WEBENGINE_PROCESS_NAME = "QtWebEngineProcess"
+
+
+class ProcessMemoryMonitor(QObject):
+    """WebEngine进程内存监控类"""
+
+    metrics_updated = pyqtSignal(dict)  # 采样完成信号
+    page_discarded = pyqtSignal(str)  # 页面被回收信号（页面名称）
+
+    def __init__(self, settings_manager, parent=None):
+        """初始化内存监控
+
+        Args:
+            settings_manager: 设置管理器实例
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.settings_manager = settings_manager
+        self.supported = sys.platform.startswith('linux') and PROC_ROOT.exists()
+        self._pages = {}  # page -> {"name": str, "session": str, "last_used": float}
+        self._last_metrics = {}
+        self._budget_cap = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-monitor")
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.sample)
+        self.metrics_updated.connect(self.handle_metrics)
+
+    @property
+    def budget_bytes(self) -> int:
+        """内存预算（字节），0表示不限制；设置了临时上限时取两者中较小者"""
+        budget = int(self.settings_manager.get('memory_monitor.budget_mb', 0)) * 1024 * 1024
+        if self._budget_cap > 0:
+            return min(budget, self._budget_cap) if budget > 0 else self._budget_cap
+        return budget
+
+    def set_budget_cap(self, cap_bytes: int) -> None:
+        """设置临时内存上限（如托盘待机期间），0表示取消
+
+        Args:
+            cap_bytes: 上限（字节）
+        """
+        self._budget_cap = max(int(cap_bytes), 0)
+
+    def start(self) -> None:
+        """按配置的间隔启动周期采样（多个会话共享同一监控时重复调用无副作用）"""
+        if not self.settings_manager.get('memory_monitor.enabled', True) or self._timer.isActive():
+            return
+        if not self.supported:
+            logger.info("当前平台不支持/proc内存采样，内存监控未启用")
+            return
+        interval_seconds = int(self.settings_manager.get('memory_monitor.interval_seconds', 30))
+        self._timer.start(max(interval_seconds, 1) * 1000)
+        QTimer.singleShot(3000, self.sample)
+
+    def shutdown(self) -> None:
+        """停止采样"""
+        self._timer.stop()
+        self._executor.shutdown(wait=False)
+
+    def register_page(self, page: QWebEnginePage, name: str, session: str = "") -> None:
+        """登记需要归集内存的页面
+
+        Args:
+            page: WebEngine页面
+            name: 页面名称（用于日志与诊断面板）
+            session: 所属会话名称（多会话时按会话汇总渲染进程内存）
+        """
+        self._pages[page] = {"name": name, "session": session, "last_used": time.monotonic()}
+        page.destroyed.connect(lambda: self._pages.pop(page, None))
+
+    def touch(self, page: QWebEnginePage) -> None:
+        """标记页面最近被使用（切换到前台、加载新页面时调用）
+
+        Args:
+            page: WebEngine页面
+        """
+        if page in self._pages:
+            self._pages[page]["last_used"] = time.monotonic()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取最近一次的采样结果"""
+        return dict(self._last_metrics)
+
+    def sample(self) -> None:
+        """发起一次采样（页面信息在GUI线程收集，/proc读取在后台线程完成）"""
+        if not self.supported:
+            return
+        pages = []
+        for page, info in self._pages.items():
+            pages.append({
+                "name": info["name"],
+                "session": info["session"],
+                "pid": page.renderProcessPid(),
+                "visible": page.isVisible(),
+                "state": page.lifecycleState().name,
+                "idle_seconds": round(time.monotonic() - info["last_used"], 1),
+            })
+        # 设置只在GUI线程读取
+        budget = self.budget_bytes
+        self._executor.submit(self._collect, pages, budget).add_done_callback(self._on_collected)
+
+    def _on_collected(self, future) -> None:
+        """后台采样完成，经信号排队回到GUI线程"""
+        if future.exception() is not None:
+            logger.warning(f"内存采样失败: {future.exception()}")
+            return
+        self.metrics_updated.emit(future.result())
+
+    def handle_metrics(self, metrics: Dict[str, Any]) -> None:
+        """处理采样结果：记录日志并在超出预算时回收页面（GUI线程）
+
+        Args:
+            metrics: 采样结果
+        """
+        self._last_metrics = metrics
+        logger.info(
+            f"WebEngine内存: RSS {metrics['total_rss'] / 1048576:.1f} MB, "
+            f"PSS {metrics['total_pss'] / 1048576:.1f} MB, 进程数 {len(metrics['processes'])}"
+        )
+        if len(metrics['sessions']) > 1:
+            logger.info(
+                f"共享进程 PSS {metrics['shared_pss'] / 1048576:.1f} MB；各会话额外开销: " + ", ".join(
+                    f"{name or '默认'} {session['pss'] / 1048576:.1f} MB"
+                    for name, session in sorted(metrics['sessions'].items())
+                )
+            )
+
+        budget = self.budget_bytes
+        if budget > 0 and metrics['total_pss'] > budget:
+            self._reclaim(metrics['total_pss'] - budget, metrics)
+
+    def _reclaim(self, excess: int, metrics: Dict[str, Any]) -> None:
+        """按最近最少使用顺序丢弃后台页面，直到估计释放量覆盖超出部分"""
+        process_pss = {p["pid"]: p["pss"] for p in metrics["processes"]}
+        candidates = sorted(
+            (
+                (info["last_used"], page, info["name"])
+                for page, info in self._pages.items()
+                if not page.isVisible() and page.lifecycleState() != QWebEnginePage.LifecycleState.Discarded
+            ),
+            key=lambda item: item[0]
+        )
+
+        freed = 0
+        for _, page, name in candidates:
+            if freed >= excess:
+                break
+            pid = page.renderProcessPid()
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+            freed += process_pss.get(pid, 0)
+            logger.warning(f"内存超出预算，已回收后台页面: {name} (pid {pid})")
+            self.page_discarded.emit(name)
+
+    def _collect(self, pages: List[Dict[str, Any]], budget: int) -> Dict[str, Any]:
+        """读取浏览器进程及其全部WebEngine子进程的内存（工作线程）"""
+        start = time.monotonic()
+        processes = read_process_tree(os.getpid())
+
+        by_pid = {p["pid"]: p for p in processes}
+        for page in pages:
+            process = by_pid.get(page["pid"])
+            page["rss"] = process["rss"] if process else 0
+            page["pss"] = process["pss"] if process else 0
+            if process:
+                process.setdefault("pages", []).append(
+                    f"{page['session']}/{page['name']}" if page["session"] else page["name"]
+                )
+
+        # 会话的额外开销 = 其页面独占的渲染进程；浏览器/GPU/网络等进程由所有会话共享
+        sessions = {}
+        for page in pages:
+            session = sessions.setdefault(page["session"], {"pages": 0, "pids": set(), "rss": 0, "pss": 0})
+            session["pages"] += 1
+            if page["pid"] in by_pid and page["pid"] not in session["pids"]:
+                session["pids"].add(page["pid"])
+                session["rss"] += page["rss"]
+                session["pss"] += page["pss"]
+        renderer_pids = {pid for session in sessions.values() for pid in session["pids"]}
+        for session in sessions.values():
+            session["pids"] = sorted(session["pids"])
+
+        return {
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "total_rss": sum(p["rss"] for p in processes),
+            "total_pss": sum(p["pss"] for p in processes),
+            "shared_pss": sum(p["pss"] for p in processes if p["pid"] not in renderer_pids),
+            "budget": budget,
+            "processes": processes,
+            "pages": pages,
+            "sessions": sessions,
+            "sample_ms": round((time.monotonic() - start) * 1000, 2),
+        }
+
+
+def read_process_tree(root_pid: int) -> List[Dict[str, Any]]:
+    """读取进程及其全部WebEngine子孙进程的内存信息
+
+    Args:
+        root_pid: 根进程ID（通常为浏览器进程，即本进程）
+
+    Returns:
+        进程信息列表，每项包含pid、type、rss、pss（字节）
+    """
+    processes = []
+    for pid in [root_pid] + _descendants(root_pid):
+        memory = _read_memory(pid)
+        if memory is None:
+            continue
+        memory["pid"] = pid
+        memory["type"] = "browser" if pid == root_pid else _process_type(pid)
+        processes.append(memory)
+    return processes
+
+
+def _descendants(pid: int) -> List[int]:
+    """获取进程的全部WebEngine子孙进程（其他子进程及其后代不计入）"""
+    parents = {}
+    for entry in PROC_ROOT.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # /proc/<pid>/stat第二个字段为带括号的进程名，可能包含空格，从右括号之后解析
+            stat = (entry / "stat").read_text()
+            ppid = int(stat[stat.rindex(')') + 2:].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry.name))
+
+    result = []
+    stack = list(parents.get(pid, []))
+    while stack:
+        child = stack.pop()
+        if not _is_webengine_process(child):
+            continue
+        result.append(child)
+        stack.extend(parents.get(child, []))
+    return result
+
+
+def _is_webengine_process(pid: int) -> bool:
+    """根据 /proc/<pid>/exe（无法读取时用命令行第一项）判断是否为QtWebEngineProcess"""
+    base = PROC_ROOT / str(pid)
+    try:
+        executable = os.readlink(base / "exe")
+    except OSError:
+        try:
+            executable = (base / "cmdline").read_bytes().split(b'\0')[0].decode(errors='replace')
+        except OSError:
+            return False
+    # 可执行文件被替换（如升级）后链接目标带 " (deleted)" 后缀
+    return os.path.basename(executable).startswith(WEBENGINE_PROCESS_NAME)
+
+
+def _read_memory(pid: int) -> Optional[Dict[str, int]]:
+    """读取进程RSS与PSS（字节），进程已退出时返回None"""
+    base = PROC_ROOT / str(pid)
+    rss = pss = 0
+    try:
+        for line in (base / "status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) * 1024
+                break
+    except (OSError, ValueError):
+        return None
+
+    try:
+        for line in (base / "smaps_rollup").read_text().splitlines():
+            if line.startswith("Pss:"):
+                pss = int(line.split()[1]) * 1024
+                break
+    except (OSError, ValueError):
+        # 旧内核没有smaps_rollup，退化为RSS
+        pss = rss
+
+    return {"rss": rss, "pss": pss}
+
+
+def _process_type(pid: int) -> str:
+    """根据命令行参数识别Chromium子进程类型"""
+    try:
+        args = (PROC_ROOT / str(pid) / "cmdline").read_bytes().split(b'\0')
+    except OSError:
+        return "unknown"
+    for arg in args:
+        if arg.startswith(b"--type="):
+            return arg[len(b"--type="):].decode(errors='replace')
+    return "other"
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profile请求拦截器
+每个Profile只能设置一个拦截器，这里依次执行：按规则引擎拦截请求，
+再把配置了离线缓存的模块的静态资源重定向到模块缓存方案
+"""
+
+from PyQt6.QtWebEngineCore import QWebEngineUrlRequestInterceptor
+
+from components.module_scheme import MODULE_CACHE_RESOURCE_TYPES, to_cache_url
+from components.request_rules import RESOURCE_TYPE_NAMES
+
+
+class ProfileRequestInterceptor(QWebEngineUrlRequestInterceptor):
+    """Profile请求拦截器类"""
+
+    def __init__(self, rule_engine, module_cache, parent=None):
+        """初始化请求拦截器
+
+        Args:
+            rule_engine: RequestRuleEngine实例
+            module_cache: ModuleResponseCache实例
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.rule_engine = rule_engine
+        self.module_cache = module_cache
+
+    def interceptRequest(self, info):
+        url = info.requestUrl()
+        resource_type = RESOURCE_TYPE_NAMES.get(info.resourceType().name, "other")
+        if self.rule_engine.enabled:
+            if self.rule_engine.should_block(url.host().lower(), url.path(), resource_type):
+                info.block(True)
+                return
+
+        # 只重定向静态资源：主框架与XHR保持在源站，页面的源、Cookie与接口请求不变
+        if resource_type in MODULE_CACHE_RESOURCE_TYPES and self.module_cache.enabled \
+                and bytes(info.requestMethod()) == b"GET":
+            url_str = url.toString()
+            if self.module_cache.handles(url_str):
+                info.redirect(to_cache_url(self.module_cache, url_str))
+
+
+def install_request_interceptor(profile, rule_engine, module_cache) -> None:
+    """在Profile中安装请求拦截器（没有规则也没有模块缓存时不安装，避免逐请求回调）
+
+    Args:
+        profile: QWebEngineProfile实例
+        rule_engine: RequestRuleEngine实例
+        module_cache: ModuleResponseCache实例
+    """
+    if rule_engine.enabled or module_cache.enabled:
+        profile.setUrlRequestInterceptor(ProfileRequestInterceptor(rule_engine, module_cache, profile))
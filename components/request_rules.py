@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求拦截规则引擎
+把配置的拦截/放行规则（主机后缀、路径通配、资源类型）编译为按反转域名组织的前缀树，
+每个请求只需沿主机的各级域名走一遍树即可找到候选规则；放行规则优先于拦截规则
+"""
+
+import fnmatch
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# QWebEngineUrlRequestInfo.ResourceType 枚举名 -> 规则中使用的资源类型名
+RESOURCE_TYPE_NAMES = {
+    "ResourceTypeMainFrame": "main_frame",
+    "ResourceTypeSubFrame": "sub_frame",
+    "ResourceTypeStylesheet": "stylesheet",
+    "ResourceTypeScript": "script",
+    "ResourceTypeImage": "image",
+    "ResourceTypeFontResource": "font",
+    "ResourceTypeSubResource": "other",
+    "ResourceTypeObject": "object",
+    "ResourceTypeMedia": "media",
+    "ResourceTypeWorker": "worker",
+    "ResourceTypeSharedWorker": "worker",
+    "ResourceTypeServiceWorker": "worker",
+    "ResourceTypePrefetch": "prefetch",
+    "ResourceTypeFavicon": "image",
+    "ResourceTypeXhr": "xhr",
+    "ResourceTypePing": "ping",
+    "ResourceTypeCspReport": "ping",
+    "ResourceTypePluginResource": "object",
+    "ResourceTypeWebSocket": "websocket",
+}
+
+# 前缀树节点中存放规则列表的键（域名标签不会以该字符开头）
+_RULES_KEY = "#"
+
+
+class RequestRule:
+    """一条编译后的拦截/放行规则"""
+
+    __slots__ = ("name", "action", "host", "path", "types", "_path_regex", "hits")
+
+    def __init__(self, name: str, action: str, host: str = "", path: str = "", types: Optional[List[str]] = None):
+        self.name = name
+        self.action = action
+        self.host = host.lower().lstrip(".")
+        self.path = path
+        self.types = frozenset(types) if types else None
+        self._path_regex = re.compile(fnmatch.translate(path)).match if path else None
+        self.hits = 0
+
+    def matches(self, path: str, resource_type: str) -> bool:
+        """主机已由前缀树匹配，这里只检查资源类型与路径（未限定类型的规则不作用于主框架导航）"""
+        if self.types is None:
+            if resource_type == "main_frame":
+                return False
+        elif resource_type not in self.types:
+            return False
+        return self._path_regex is None or self._path_regex(path) is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "action": self.action,
+            "host": self.host,
+            "path": self.path,
+            "types": sorted(self.types) if self.types else [],
+            "hits": self.hits,
+        }
+
+
+class RequestRuleEngine:
+    """请求拦截规则引擎类"""
+
+    def __init__(self, settings_manager):
+        """初始化规则引擎并编译设置中的规则
+
+        Args:
+            settings_manager: 设置管理器实例
+        """
+        self.settings_manager = settings_manager
+        self._lock = threading.Lock()
+        self.rules = []
+        self._trie = {}
+        self.blocked = 0
+        self.checked = 0
+        self.compile()
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用且至少有一条规则"""
+        return bool(self.settings_manager.get('request_rules.enabled', True)) and bool(self.rules)
+
+    def compile(self) -> None:
+        """从设置编译规则（规则变更后调用，命中计数清零）
+
+        规则可以是字符串（主机后缀的简写）或字典 {"host", "path", "types", "name"}，
+        host 按域名后缀匹配（"example.com" 同时匹配 "cdn.example.com"），path 为通配模式，
+        types 为资源类型列表（见 RESOURCE_TYPE_NAMES 的取值），省略的条件视为不限
+        （省略 types 时不包括主框架导航，需要拦截整页跳转时显式写 "main_frame"）。
+        """
+        rules = []
+        for action in ("allow", "block"):
+            for i, config in enumerate(self.settings_manager.get(f'request_rules.{action}', [])):
+                if isinstance(config, str):
+                    config = {"host": config}
+                if not isinstance(config, dict) or not (config.get("host") or config.get("path") or config.get("types")):
+                    logger.warning(f"忽略无效的请求规则: {action}[{i}] {config}")
+                    continue
+                target = f"{config.get('host', '')}{config.get('path', '')}" or ",".join(config.get("types", []))
+                name = config.get("name") or f"{action}[{i}] {target}"
+                rules.append(RequestRule(name, action, config.get("host", ""), config.get("path", ""), config.get("types")))
+
+        trie = {}
+        for rule in rules:
+            node = trie
+            if rule.host:
+                for label in reversed(rule.host.split(".")):
+                    node = node.setdefault(label, {})
+            node.setdefault(_RULES_KEY, []).append(rule)
+
+        with self._lock:
+            self.rules = rules
+            self._trie = trie
+            self.blocked = 0
+            self.checked = 0
+
+    def match(self, host: str, path: str, resource_type: str) -> Optional[RequestRule]:
+        """查找对请求生效的规则并计数
+
+        Args:
+            host: 请求主机（小写）
+            path: 请求路径
+            resource_type: 资源类型名
+
+        Returns:
+            生效的规则（放行规则优先），没有匹配时返回None
+        """
+        node = self._trie
+        candidates = node.get(_RULES_KEY, [])
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            rules = node.get(_RULES_KEY)
+            if rules:
+                candidates = candidates + rules
+
+        matched = None
+        for rule in candidates:
+            if rule.matches(path, resource_type):
+                if rule.action == "allow":
+                    matched = rule
+                    break
+                if matched is None:
+                    matched = rule
+
+        with self._lock:
+            self.checked += 1
+            if matched is not None:
+                matched.hits += 1
+                if matched.action == "block":
+                    self.blocked += 1
+        return matched
+
+    def should_block(self, host: str, path: str, resource_type: str) -> bool:
+        """请求是否应被拦截
+
+        Args:
+            host: 请求主机（小写）
+            path: 请求路径
+            resource_type: 资源类型名
+        """
+        rule = self.match(host, path, resource_type)
+        return rule is not None and rule.action == "block"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取拦截统计
+
+        Returns:
+            {"checked", "blocked", "rules": [规则及命中次数]}
+        """
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "blocked": self.blocked,
+                "rules": [rule.snapshot() for rule in self.rules],
+            }
@@ -9,7 +9,9 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from utils.metrics import metrics
 
 class SettingsManager:
     """设置管理器类"""
@@ -24,6 +26,7 @@ class SettingsManager:
         self.settings_file = self._resolve_user_settings_path(self.packaged_settings_rel_path)
         self.settings_file.parent.mkdir(parents=True, exist_ok=True)
         self._settings = self._load_settings()
+        self._change_listeners = []
 
     def _resolve_user_settings_path(self, default_rel_path: Path) -> Path:
         """解析用户可写的settings路径（优先AppData）"""
@@ -108,6 +111,7 @@ class SettingsManager:
             # 外观设置
             "theme_mode": "light",  # light, dark, system
             "theme_shortcut": "Ctrl+Shift+T",
+            "native_theme_engine": "palette",  # palette, stylesheet
             "enable_animations": True,
             "font_size": "medium",  # small, medium, large, xlarge
             "zoom_level": 100,  # 80, 90, 100, 110, 125, 150
@@ -118,7 +122,128 @@ class SettingsManager:
                 "width": 1920,
                 "height": 1080,
                 "x": 100,
-                "y": 100
+                "y": 100,
+                "route": ""  # 上次关闭时的页面（项目内HTML文件名），为登录页时启动显示其截图
+            },
+
+            # 启动恢复：以上次关闭时的窗口几何与登录页截图作为首帧，WebEngine在其后加载（不恢复登录后的页面）
+            "session_restore": {
+                "enabled": True,
+                "snapshot_quality": 70  # 截图JPEG质量（1-100）
+            },
+
+            # WebEngine缓存设置
+            "web_cache": {
+                "http_cache_type": "disk",  # disk, memory, none
+                "http_cache_size_mb": 256,  # 0 表示由引擎自动决定
+                "storage_budget_mb": 512,  # 可裁剪缓存（GPU/代码/Service Worker缓存，不含HTTP缓存与网页数据）的预算，0 表示不限制
+                "scan_interval_minutes": 30
+            },
+
+            # 模块页面离线缓存：urls中的模块在程序内打开，其静态资源（脚本、样式表、图片、字体）的缓存副本立即返回并在后台更新
+            "module_cache": {
+                "enabled": True,
+                "urls": [],  # 需要缓存的模块地址前缀，如 "https://example.com/assessment"，前缀下的静态资源经缓存加载
+                "max_size_mb": 128,
+                "revalidate_seconds": 60  # 同一资源两次后台更新的最小间隔
+            },
+
+            # 模块目录：配置清单地址后主页面的模块卡片由远程清单生成（未配置时使用上面的 urls）
+            "catalog": {
+                "manifest_url": "",
+                "refresh_minutes": 30,
+                "department": ""  # 主页面当前选择的科室，为空时显示全部
+            },
+
+            # 下载管理：服务器支持Range时分块并行下载，中断后可续传
+            "downloads": {
+                "takeover": True,
+                "directory": "",  # 为空时使用系统下载目录
+                "max_active": 3,
+                "max_connections": 4,
+                "chunk_size_mb": 4,
+                "min_chunked_size_mb": 8,
+                "bandwidth_kbps": 0  # 所有下载合计的速率上限，0为不限速
+            },
+
+            # 登录后预热模块主机（在主页面插入预连接提示，由网页引擎完成DNS与握手）；机器繁忙时推迟
+            "warmup": {
+                "enabled": True,
+                "delay_ms": 1500,
+                "max_concurrent": 2,
+                "busy_lag_ms": 200,
+                "busy_load": 0.8
+            },
+
+            # 模块使用记录（按登录用户分别记录）：按打开频率与时间（半衰期衰减）把常用模块排在主页面前面，并优先预热其主机
+            "usage": {
+                "enabled": True,
+                "half_life_days": 14,
+                "promote_count": 6,  # 排在前面的常用模块数
+                "max_entries": 256,  # 摘要中保留的模块数
+                "compact_every": 64  # 日志达到该行数时合并进摘要
+            },
+
+            # 命令面板（Ctrl+K）：搜索模块、设置项与页面命令
+            "command_palette": {
+                "enabled": True,
+                "max_results": 20,
+                "max_recent": 10,
+                "recent": []  # 最近执行的命令ID（最近的在前）
+            },
+
+            # 请求拦截规则：内网无法访问的第三方资源直接拦截，不再等待超时（放行规则优先）
+            # 规则为主机后缀字符串，或 {"host": 后缀, "path": 通配, "types": [资源类型], "name": 名称}
+            "request_rules": {
+                "enabled": True,
+                "block": [
+                    "google-analytics.com",
+                    "googletagmanager.com",
+                    "doubleclick.net",
+                    "hm.baidu.com",
+                    "cnzz.com",
+                    "fonts.googleapis.com",
+                    "fonts.gstatic.com",
+                    "embed.tawk.to"
+                ],
+                "allow": []
+            },
+
+            # 网页引擎设置（启动时生效）
+            "engine": {
+                "preset": "default",  # default, balanced, low_memory, minimal
+                "process_model": "",  # default, process-per-site, single-process；为空时沿用预设
+                "experimental_single_process": False,  # single-process 不受QtWebEngine支持，需显式开启才生效
+                "renderer_process_limit": 0,
+                "js_heap_mb": 0,
+                "enable_features": [],
+                "disable_features": [],
+                "extra_flags": []
+            },
+
+            # 内存监控设置
+            "memory_monitor": {
+                "enabled": True,
+                "interval_seconds": 30,
+                "budget_mb": 1024  # 渲染相关进程PSS预算，超出时回收后台页面，0 表示不限制
+            },
+
+            # 托盘待机：关闭主窗口时隐藏到托盘，Profile与页面保持常驻
+            "standby": {
+                "enabled": False,
+                "memory_cap_mb": 300  # 待机期间的内存上限，超出时回收页面，0 表示沿用内存监控预算
+            },
+
+            # 多会话设置（同一进程内的独立登录窗口）
+            "sessions": {
+                "max_sessions": 4
+            },
+
+            # GUI线程卡顿看门狗
+            "watchdog": {
+                "enabled": True,
+                "heartbeat_ms": 100,
+                "threshold_ms": 500  # 心跳延迟超过该值时记录GUI线程调用栈
             },
 
             # 其他设置
@@ -192,6 +317,41 @@ class SettingsManager:
 
         # 设置值
         settings[keys[-1]] = value
+        self._notify_change(key)
+
+    def add_change_listener(self, listener: Callable[[str], None]) -> None:
+        """注册设置变化的回调
+
+        Args:
+            listener: 回调函数，参数为变化的设置键（重置或导入全部设置时为空字符串）
+        """
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[str], None]) -> None:
+        """移除设置变化的回调"""
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    def _notify_change(self, key: str) -> None:
+        for listener in list(self._change_listeners):
+            listener(key)
+
+    def iter_items(self, prefix: str = "") -> Iterator[Tuple[str, Any]]:
+        """遍历全部设置项（嵌套字典展开为点号分隔的键，列表等作为一个值）
+
+        Args:
+            prefix: 只遍历该键下的设置，为空时遍历全部
+
+        Yields:
+            (设置键, 设置值)
+        """
+        stack = [(prefix, self.get(prefix) if prefix else self._settings)]
+        while stack:
+            key, value = stack.pop()
+            if isinstance(value, dict) and value:
+                stack.extend((f"{key}.{k}" if key else k, v) for k, v in reversed(list(value.items())))
+            elif key:
+                yield key, value
 
     def save(self) -> bool:
         """保存设置到文件
@@ -199,6 +359,11 @@ class SettingsManager:
         Returns:
             是否保存成功
         """
+        with metrics.timer("settings.save_ms", "保存设置耗时"):
+            return self._save()
+
+    def _save(self) -> bool:
+        """写入设置文件（保留上一版本为.bak）"""
         try:
             # 创建备份
             if self.settings_file.exists():
@@ -217,6 +382,7 @@ class SettingsManager:
     def reset(self) -> None:
         """重置设置为默认值"""
         self._settings = self._get_default_settings()
+        self._notify_change("")
 
     def get_url(self, name: str) -> str:
         """获取功能模块URL
@@ -246,7 +412,7 @@ class SettingsManager:
         """
         return self.get("window", {})
 
-    def save_window_state(self, width: int, height: int, x: int, y: int, maximized: bool) -> None:
+    def save_window_state(self, width: int, height: int, x: int, y: int, maximized: bool, route: str = "") -> None:
         """保存窗口状态
 
         Args:
@@ -255,13 +421,15 @@ class SettingsManager:
             x: 窗口X坐标
             y: 窗口Y坐标
             maximized: 是否最大化
+            route: 当前页面（项目内HTML文件名）
         """
         self.set("window", {
             "width": width,
             "height": height,
             "x": x,
             "y": y,
-            "maximized": maximized
+            "maximized": maximized,
+            "route": route
         })
 
     def export_settings(self, export_file: str) -> bool:
@@ -293,6 +461,7 @@ class SettingsManager:
         try:
             with open(import_file, 'r', encoding='utf-8') as f:
                 self._settings = json.load(f)
+            self._notify_change("")
             return True
         except (json.JSONDecodeError, IOError) as e:
             print(f"导入设置失败: {e}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GUI线程卡顿看门狗
+GUI线程的定时器周期性更新心跳，后台线程检查心跳是否超时；
+超时即抓取GUI线程当前调用栈写入日志，卡顿结束后记录总时长
+"""
+
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+from PyQt6.QtCore import QObject, QTimer
+
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# 单次卡顿最多抓取的调用栈次数（阈值、2倍阈值、4倍阈值……）
+MAX_STACK_CAPTURES = 3
+
+
+class StallWatchdog(QObject):
+    """GUI线程卡顿看门狗类"""
+
+    def __init__(self, settings_manager, parent=None):
+        """初始化看门狗
+
+        Args:
+            settings_manager: 设置管理器实例
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.settings_manager = settings_manager
+        self.heartbeat_ms = max(int(settings_manager.get('watchdog.heartbeat_ms', 100)), 10)
+        self.threshold_ms = max(int(settings_manager.get('watchdog.threshold_ms', 500)), self.heartbeat_ms)
+        self._last_beat = time.monotonic()
+        self._gui_thread_id = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.heartbeat_ms)
+        self._timer.timeout.connect(self._beat)
+
+    def start(self) -> None:
+        """启动心跳与看门狗线程（需在GUI线程调用）"""
+        if not self.settings_manager.get('watchdog.enabled', True) or self._thread is not None:
+            return
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._timer.start()
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """停止看门狗"""
+        self._timer.stop()
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _beat(self) -> None:
+        """心跳（GUI线程，仅记录时间）"""
+        self._last_beat = time.monotonic()
+
+    def _watch(self) -> None:
+        """检查心跳（看门狗线程）"""
+        poll_seconds = self.heartbeat_ms / 1000
+        # 定时器本身有一个心跳周期的正常间隔，超出该间隔的部分才算延迟
+        allowed_seconds = (self.heartbeat_ms + self.threshold_ms) / 1000
+        stall_beat = None  # 当前卡顿开始前的最后一次心跳
+        captures = 0
+        next_capture = 0.0
+
+        while not self._stop_event.wait(poll_seconds):
+            last_beat = self._last_beat
+            late = time.monotonic() - last_beat
+
+            if stall_beat is not None and last_beat != stall_beat:
+                # 心跳恢复，卡顿结束
+                duration_ms = (last_beat - stall_beat - self.heartbeat_ms / 1000) * 1000
+                logger.warning(f"GUI线程卡顿结束，持续约 {duration_ms:.0f} ms")
+                metrics.histogram("gui.stall_ms", "GUI线程卡顿时长").observe(duration_ms)
+                stall_beat = None
+                continue
+
+            if late < allowed_seconds:
+                continue
+
+            if stall_beat is None:
+                stall_beat = last_beat
+                captures = 0
+                next_capture = allowed_seconds
+                metrics.counter("gui.stalls", "GUI线程卡顿次数").inc()
+
+            if captures < MAX_STACK_CAPTURES and late >= next_capture:
+                captures += 1
+                next_capture *= 2
+                stack = self._capture_stack()
+                logger.warning(
+                    f"GUI线程已 {(late - self.heartbeat_ms / 1000) * 1000:.0f} ms 未响应"
+                    f"（阈值 {self.threshold_ms} ms，第 {captures} 次采样），当前调用栈:\n{stack}"
+                )
+
+    def _capture_stack(self) -> Optional[str]:
+        """抓取GUI线程当前调用栈"""
+        frame = sys._current_frames().get(self._gui_thread_id)
+        if frame is None:
+            return None
+        return "".join(traceback.format_stack(frame))
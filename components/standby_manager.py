@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+托盘待机管理
+启用待机模式后关闭主窗口只隐藏到系统托盘，Profile与已加载的页面保持常驻，
+再次打开时无需冷启动；待机期间冻结页面并以更低的内存上限回收
+"""
+
+import time
+from typing import Any, Dict, Optional
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QIcon, QAction
+from PyQt6.QtWidgets import QMenu, QSystemTrayIcon
+from PyQt6.QtWebEngineCore import QWebEnginePage
+
+from components.autostart import set_auto_start
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# 进入待机后延迟冻结页面的时间（毫秒），让刚开始加载的页面先完成渲染
+STANDBY_FREEZE_DELAY_MS = 5000
+
+
+class StandbyManager(QObject):
+    """托盘待机管理类"""
+
+    activate_requested = pyqtSignal()  # 托盘请求打开主窗口
+    new_session_requested = pyqtSignal()  # 托盘请求新建会话窗口
+    quit_requested = pyqtSignal()  # 托盘请求退出程序
+
+    def __init__(self, settings_manager, memory_monitor, app_id: str, app_name: str, icon: QIcon, parent=None):
+        """初始化待机管理
+
+        Args:
+            settings_manager: 设置管理器实例
+            memory_monitor: 内存监控实例（待机期间收紧内存上限）
+            app_id: 应用标识（用于开机自启动项）
+            app_name: 应用名称
+            icon: 托盘图标
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.settings_manager = settings_manager
+        self.memory_monitor = memory_monitor
+        self.app_id = app_id
+        self.app_name = app_name
+        self._icon = icon
+        self._tray = None
+        self._tray_menu = None
+        self._dialog = None  # 当前处于待机的窗口
+        self._entered_at = None
+        self.memory_monitor.metrics_updated.connect(self._on_metrics_updated)
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用待机模式（需要系统托盘可用）"""
+        return bool(self.settings_manager.get('standby.enabled', False)) and QSystemTrayIcon.isSystemTrayAvailable()
+
+    @property
+    def in_standby(self) -> bool:
+        """主窗口是否处于待机（已隐藏到托盘）"""
+        return self._dialog is not None
+
+    def apply(self) -> None:
+        """按当前设置显示/隐藏托盘图标，并同步开机自启动项（与系统中的实际项一致时不改写）"""
+        set_auto_start(self.app_id, self.app_name, bool(self.settings_manager.get('auto_start', False)))
+        if self.enabled:
+            self._get_tray().show()
+        elif self._tray is not None:
+            self._tray.hide()
+
+    def enter(self, dialog) -> None:
+        """主窗口进入待机：收紧内存上限，稍后冻结页面
+
+        Args:
+            dialog: 已隐藏的会话窗口
+        """
+        if self._dialog is dialog:
+            return
+        self._dialog = dialog
+        self._entered_at = time.monotonic()
+        cap_mb = int(self.settings_manager.get('standby.memory_cap_mb', 0))
+        self.memory_monitor.set_budget_cap(cap_mb * 1024 * 1024)
+        metrics.counter("standby.entered", "进入托盘待机次数").inc()
+        QTimer.singleShot(STANDBY_FREEZE_DELAY_MS, self._freeze_page)
+        logger.info(f"主窗口已隐藏到托盘待机（内存上限 {cap_mb or '不限'} MB）")
+
+    def leave(self) -> None:
+        """主窗口退出待机：恢复页面与内存预算（在窗口显示之前调用）"""
+        dialog = self._dialog
+        if dialog is None:
+            return
+        self._dialog = None
+        self.memory_monitor.set_budget_cap(0)
+
+        page = self._get_page(dialog)
+        if page is not None:
+            # 被回收（Discarded）的页面切回Active时会自动重新加载
+            was_discarded = page.lifecycleState() == QWebEnginePage.LifecycleState.Discarded
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+            metrics.counter(
+                "standby.resumed_discarded" if was_discarded else "standby.resumed_warm", "从托盘待机恢复次数"
+            ).inc()
+        metrics.histogram("standby.duration_s", "托盘待机时长（秒）").observe(time.monotonic() - self._entered_at)
+
+    def shutdown(self) -> None:
+        """退出前隐藏托盘图标"""
+        if self._tray is not None:
+            self._tray.hide()
+
+    def _get_tray(self) -> QSystemTrayIcon:
+        if self._tray is None:
+            self._tray = QSystemTrayIcon(self._icon, self)
+            self._tray.setToolTip(self.app_name)
+            menu = QMenu()
+            for text, signal in (
+                ("打开主窗口", self.activate_requested),
+                ("新建会话窗口", self.new_session_requested),
+            ):
+                action = QAction(text, menu)
+                action.triggered.connect(signal.emit)
+                menu.addAction(action)
+            menu.addSeparator()
+            quit_action = QAction("退出", menu)
+            quit_action.triggered.connect(self.quit_requested.emit)
+            menu.addAction(quit_action)
+            self._tray.setContextMenu(menu)
+            self._tray_menu = menu
+            self._tray.activated.connect(self._on_tray_activated)
+        return self._tray
+
+    def _on_tray_activated(self, reason) -> None:
+        if reason in (QSystemTrayIcon.ActivationReason.Trigger, QSystemTrayIcon.ActivationReason.DoubleClick):
+            self.activate_requested.emit()
+
+    def _get_page(self, dialog) -> Optional[QWebEnginePage]:
+        webview = getattr(dialog, 'webview', None)
+        return webview.page() if webview else None
+
+    def _freeze_page(self) -> None:
+        """冻结待机窗口的页面（停止脚本与定时器，DOM保留，恢复时无需重新加载）"""
+        page = self._get_page(self._dialog) if self._dialog else None
+        if page is None or page.isVisible():
+            return
+        if page.lifecycleState() == QWebEnginePage.LifecycleState.Active:
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+
+    def _on_metrics_updated(self, memory_metrics: Dict[str, Any]) -> None:
+        """记录待机期间的内存占用（超出上限时的回收由内存监控完成）"""
+        if not self.in_standby:
+            return
+        metrics.gauge("standby.pss_bytes", "托盘待机时WebEngine进程PSS").set(memory_metrics['total_pss'])
+        logger.info(
+            f"待机内存: PSS {memory_metrics['total_pss'] / 1048576:.1f} MB "
+            f"(已待机 {time.monotonic() - self._entered_at:.0f} 秒)"
+        )
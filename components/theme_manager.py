@@ -8,24 +8,184 @@
 import sys
 import os
 import json
+import time
+import uuid
 from pathlib import Path
-from PyQt6.QtCore import QObject, pyqtSignal
-from PyQt6.QtWidgets import QApplication
+from typing import Optional
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QRectF, QSize, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QGuiApplication, QPainter, QPalette, QPen
+from PyQt6.QtWidgets import (
+    QApplication, QLineEdit, QProxyStyle, QPushButton, QStyle, QStyleOptionButton, QTextEdit
+)
+
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# 原生主题引擎：palette（QPalette + 按主题绘制按钮与输入框的样式）或 stylesheet（整个应用的QSS）
+NATIVE_THEME_ENGINES = ("palette", "stylesheet")
+
+# 跟随系统配色的主题模式名称
+SYSTEM_THEME = "system"
+
+# 系统配色变化的防抖间隔（部分平台切换时会连续发出多次信号）
+SYSTEM_THEME_DEBOUNCE_MS = 200
+
+# 主题文件变化的防抖间隔（编辑器保存时常见先截断再写入）
+THEME_RELOAD_DEBOUNCE_MS = 300
+
+
+class ThemeStyle(QProxyStyle):
+    """在Fusion样式上按主题颜色绘制按钮与输入框（圆角、悬停色、焦点边框）
+
+    样式对整个应用只设置一次，切换主题只更新颜色；控件不经过样式表引擎，新建控件也无需额外处理。
+    """
+
+    RADIUS = 6
+    BUTTON_PADDING = QSize(32, 16)  # 按钮内容的左右/上下留白合计（16px / 8px）
+    INPUT_PADDING = QSize(24, 16)  # 输入框文字的左右/上下留白合计（12px / 8px）
+
+    def __init__(self):
+        super().__init__("Fusion")
+        self.active = True  # 样式表引擎生效时只保留Fusion的绘制
+        self._primary = QColor("#2563EB")
+        self._primary_hover = QColor("#1D4ED8")
+        self._border = QColor("#E2E8F0")
+
+    def set_colors(self, colors: dict) -> None:
+        """设置主题颜色（之后的重绘生效）
+
+        Args:
+            colors: 主题颜色字典
+        """
+        primary = colors.get("primary", "#2563EB")
+        self._primary = QColor(primary)
+        self._primary_hover = QColor(colors.get("primary_hover", primary))
+        self._border = QColor(colors.get("border", "#E2E8F0"))
+
+    def drawPrimitive(self, element, option, painter, widget=None):
+        if self.active and isinstance(widget, QPushButton) and element == QStyle.PrimitiveElement.PE_PanelButtonCommand:
+            self._draw_button_panel(option, painter)
+        elif self.active and isinstance(widget, QLineEdit) and element == QStyle.PrimitiveElement.PE_PanelLineEdit \
+                and option.lineWidth > 0:
+            self._draw_input_frame(option, painter, option.palette.color(QPalette.ColorRole.Base))
+        elif self.active and isinstance(widget, QTextEdit) and element == QStyle.PrimitiveElement.PE_Frame:
+            self._draw_input_frame(option, painter, None)
+        else:
+            super().drawPrimitive(element, option, painter, widget)
+
+    def drawControl(self, element, option, painter, widget=None):
+        if self.active and isinstance(widget, QPushButton) and element == QStyle.ControlElement.CE_PushButtonLabel:
+            option = QStyleOptionButton(option)
+            option.palette.setColor(QPalette.ColorRole.ButtonText, QColor("#FFFFFF"))
+        super().drawControl(element, option, painter, widget)
+
+    def sizeFromContents(self, contents_type, option, size, widget=None):
+        result = super().sizeFromContents(contents_type, option, size, widget)
+        if self.active and contents_type == QStyle.ContentsType.CT_PushButton:
+            result = result.expandedTo(size + self.BUTTON_PADDING)
+        elif self.active and contents_type == QStyle.ContentsType.CT_LineEdit and option.lineWidth > 0:
+            result = result.expandedTo(size + self.INPUT_PADDING)
+        return result
+
+    def subElementRect(self, element, option, widget=None):
+        rect = super().subElementRect(element, option, widget)
+        if self.active and element == QStyle.SubElement.SE_LineEditContents and option.lineWidth > 0:
+            inset = self.INPUT_PADDING.width() // 2 - (rect.left() - option.rect.left())
+            if inset > 0:
+                rect.adjust(inset, 0, -inset, 0)
+        return rect
+
+    def _draw_button_panel(self, option, painter) -> None:
+        state = option.state
+        color = QColor(self._primary_hover if state & QStyle.StateFlag.State_MouseOver else self._primary)
+        if state & QStyle.StateFlag.State_Sunken:
+            color = color.darker(110)
+        if not state & QStyle.StateFlag.State_Enabled:
+            color.setAlphaF(0.5)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(QRectF(option.rect), self.RADIUS, self.RADIUS)
+        painter.restore()
+
+    def _draw_input_frame(self, option, painter, fill: Optional[QColor]) -> None:
+        focused = option.state & QStyle.StateFlag.State_HasFocus
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(self._primary if focused else self._border, 1))
+        if fill is None:
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+        else:
+            painter.setBrush(fill)
+        painter.drawRoundedRect(QRectF(option.rect).adjusted(0.5, 0.5, -0.5, -0.5), self.RADIUS, self.RADIUS)
+        painter.restore()
+
 
 class ThemeManager(QObject):
     """主题管理器类"""
 
     theme_changed = pyqtSignal(str)  # 主题变更信号
 
-    def __init__(self):
-        """初始化主题管理器"""
+    def __init__(self, theme_dir: Optional[Path] = None, engine: str = "palette"):
+        """初始化主题管理器
+
+        Args:
+            theme_dir: 自定义主题目录（为空时使用resources/themes）
+            engine: 原生主题引擎（palette/stylesheet）
+        """
         super().__init__()
         self._current_theme = "light"
         self._theme_cache = {}
+        self._theme_dir = Path(theme_dir) if theme_dir else None
+        self._engine = engine if engine in NATIVE_THEME_ENGINES else "palette"
+        self._palette_cache = {}
+        self._style = None  # ThemeStyle，palette引擎首次应用主题时设置
+        self._web_profiles = []
+        self._web_pages = []
+        self._web_css_cache = {}
+        self._web_script = ""
+        self._web_script_cache_key = None
+        self._web_installed_key = None  # 已安装到各Profile的脚本版本
+        # 本次运行的标识：页面记录的当前主题只在同一次运行内有效（上次运行留下的记录不采用）
+        self._web_run_id = uuid.uuid4().hex[:8]
+        self._web_defined_css = {}
+        self._follow_system = False
+        self._system_hooked = False
+        self._pending_scheme = None
+        self._last_system_switch = {}
+        self._system_timer = QTimer(self)
+        self._system_timer.setSingleShot(True)
+        self._system_timer.setInterval(SYSTEM_THEME_DEBOUNCE_MS)
+        self._system_timer.timeout.connect(self._apply_pending_scheme)
+        self._theme_path = self._resolve_theme_dir()
+        self._web_css_version = 0
+        self._changed_paths = set()
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(THEME_RELOAD_DEBOUNCE_MS)
+        self._reload_timer.timeout.connect(self._reload_changed_themes)
+        self._watcher = None
         self._load_themes()
 
     def _load_themes(self):
-        """加载主题文件"""
+        """建立主题索引：预定义主题直接可用，自定义主题只记录文件路径，首次使用时才解析"""
+        # 预定义主题
+        self._theme_cache = {
+            "light": self._get_light_theme(),
+            "dark": self._get_dark_theme()
+        }
+        self._theme_mtimes = {}
+        self._theme_files = {}
+        self._index_theme_files()
+
+    def _resolve_theme_dir(self) -> Path:
+        """获取自定义主题目录（打包后位于只读的_MEIPASS中，不在此创建目录）"""
+        if self._theme_dir:
+            return self._theme_dir
+
         # 获取程序运行时的正确路径
         if getattr(sys, 'frozen', False):
             # 如果是打包后的exe程序
@@ -34,31 +194,108 @@ class ThemeManager(QObject):
             # 如果是开发环境
             base_path = Path(__file__).parent.parent
 
-        theme_dir = base_path / "resources" / "themes"
+        return base_path / "resources" / "themes"
 
-        # 尝试创建主题目录，如果失败则跳过（可能是只读环境）
+    def _index_theme_files(self) -> None:
+        """扫描主题目录，只读取文件名（不解析内容）"""
+        theme_files = {}
         try:
-            theme_dir.mkdir(parents=True, exist_ok=True)
-        except Exception:
-            pass  # 在只读环境中静默失败
+            with os.scandir(self._theme_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        theme_files[entry.name[:-len(".json")]] = entry.path
+        except OSError:
+            pass  # 目录不存在或无法访问时没有自定义主题
+
+        # 文件被删除的自定义主题从缓存中移除（预定义主题保留）
+        for theme_name in set(self._theme_files) - set(theme_files):
+            self._forget_theme(theme_name)
+            if theme_name == "light":
+                self._theme_cache["light"] = self._get_light_theme()
+            elif theme_name == "dark":
+                self._theme_cache["dark"] = self._get_dark_theme()
+        self._theme_files = theme_files
+
+    def _get_theme(self, theme_name: str, revalidate: bool = False) -> Optional[dict]:
+        """获取主题，自定义主题在首次请求时解析并按文件修改时间缓存
 
-        # 预定义主题
-        self._theme_cache = {
-            "light": self._get_light_theme(),
-            "dark": self._get_dark_theme()
-        }
+        Args:
+            theme_name: 主题名称
+            revalidate: 是否检查文件修改时间（应用主题时检查，查询颜色时直接使用缓存）
+
+        Returns:
+            主题字典，不存在或解析失败时返回None
+        """
+        theme_file = self._theme_files.get(theme_name)
+        if theme_file is None:
+            return self._theme_cache.get(theme_name)
+        if theme_name in self._theme_mtimes and not revalidate:
+            return self._theme_cache[theme_name]
+
+        try:
+            mtime = os.stat(theme_file).st_mtime_ns
+        except OSError:
+            return self._theme_cache.get(theme_name)
+        if self._theme_mtimes.get(theme_name) == mtime:
+            return self._theme_cache[theme_name]
 
-        # 加载自定义主题文件（只有当目录存在且可访问时）
         try:
-            for theme_file in theme_dir.glob("*.json"):
-                theme_name = theme_file.stem
-                try:
-                    with open(theme_file, 'r', encoding='utf-8') as f:
-                        self._theme_cache[theme_name] = json.load(f)
-                except Exception as e:
-                    print(f"加载主题文件 {theme_file} 失败: {e}")
-        except Exception:
-            pass  # 如果无法访问目录，则跳过自定义主题加载
+            with open(theme_file, 'r', encoding='utf-8') as f:
+                theme = json.load(f)
+        except Exception as e:
+            print(f"加载主题文件 {theme_file} 失败: {e}")
+            return self._theme_cache.get(theme_name)
+
+        self._forget_theme(theme_name)
+        self._theme_cache[theme_name] = theme
+        self._theme_mtimes[theme_name] = mtime
+        self._watch(theme_file)
+        return theme
+
+    def _watch(self, theme_file: str) -> None:
+        """监视已加载的主题文件及主题目录（首次加载自定义主题时才创建监视器）"""
+        if self._watcher is None:
+            self._watcher = QFileSystemWatcher(self)
+            self._watcher.directoryChanged.connect(self._on_theme_path_changed)
+            self._watcher.fileChanged.connect(self._on_theme_path_changed)
+            self._watcher.addPath(str(self._theme_path))
+        # 编辑器以替换文件方式保存后监视会失效，重新加载时再次加入
+        if theme_file not in self._watcher.files():
+            self._watcher.addPath(theme_file)
+
+    def _forget_theme(self, theme_name: str) -> None:
+        """丢弃主题的解析结果及其派生缓存（调色板、网页CSS）"""
+        self._theme_cache.pop(theme_name, None)
+        self._theme_mtimes.pop(theme_name, None)
+        self._palette_cache.pop(theme_name, None)
+        self._web_css_cache.pop(theme_name, None)
+        self._web_css_version += 1
+
+    def _on_theme_path_changed(self, path: str) -> None:
+        """主题目录或已加载的主题文件发生变化（编辑器保存时会连续触发，防抖后统一处理）"""
+        self._changed_paths.add(path)
+        self._reload_timer.start()
+
+    def _reload_changed_themes(self) -> None:
+        """热重载：重新索引目录，已加载的主题按修改时间重新解析，当前主题变化时重新应用"""
+        changed_paths, self._changed_paths = self._changed_paths, set()
+        self._index_theme_files()
+
+        current_changed = False
+        for theme_name, theme_file in self._theme_files.items():
+            if theme_name not in self._theme_mtimes:
+                continue
+            if theme_file in changed_paths or str(self._theme_path) in changed_paths:
+                previous = self._theme_cache.get(theme_name)
+                if self._get_theme(theme_name, revalidate=True) is not previous:
+                    print(f"主题 {theme_name} 已重新加载")
+                    current_changed = current_changed or theme_name == self._current_theme
+
+        if self._get_theme(self._current_theme) is None:
+            # 当前主题文件被删除，回退到明亮主题
+            self._apply_resolved_theme("light")
+        elif current_changed:
+            self._apply_resolved_theme(self._current_theme)
 
     def _get_light_theme(self) -> dict:
         """获取明亮主题样式"""
@@ -206,9 +443,12 @@ class ThemeManager(QObject):
         """获取可用主题列表
 
         Returns:
-            主题名称列表
+            主题名称列表（自定义主题无需解析即可列出）
         """
-        return list(self._theme_cache.keys())
+        if self._watcher is None:
+            # 尚未监视目录时重新扫描文件名，确保运行期间新增的主题可见
+            self._index_theme_files()
+        return list(dict.fromkeys([*self._theme_cache, *self._theme_files]))
 
     def get_theme_info(self, theme_name: str) -> dict:
         """获取主题信息
@@ -219,28 +459,47 @@ class ThemeManager(QObject):
         Returns:
             主题信息字典
         """
-        return self._theme_cache.get(theme_name, self._get_light_theme())
+        return self._get_theme(theme_name) or self._get_light_theme()
 
     def apply_theme(self, theme_name: str) -> bool:
         """应用主题
 
         Args:
-            theme_name: 主题名称
+            theme_name: 主题名称（system表示跟随系统配色）
 
         Returns:
             是否应用成功
         """
-        if theme_name not in self._theme_cache:
+        if theme_name == SYSTEM_THEME:
+            return self._follow_system_scheme()
+        if self._get_theme(theme_name, revalidate=True) is None:
             return False
+        self._follow_system = False
+        return self._apply_resolved_theme(theme_name)
 
-        theme = self._theme_cache[theme_name]
+    def _apply_resolved_theme(self, theme_name: str) -> bool:
+        """应用具体主题（不改变是否跟随系统）"""
+        theme = self._get_theme(theme_name)
+        if theme is None:
+            return False
+        start = time.perf_counter()
         app = QApplication.instance()
 
-        if app and "css" in theme:
-            app.setStyleSheet(theme["css"])
+        if app:
+            if self._engine == "stylesheet":
+                if self._style is not None:
+                    self._style.active = False
+                if "css" in theme:
+                    app.setStyleSheet(theme["css"])
+            else:
+                self._apply_palette_theme(app, theme_name)
 
         self._current_theme = theme_name
+        self._sync_web_theme()
         self.theme_changed.emit(theme_name)
+        metrics.histogram("theme.switch_ms", "主题切换耗时（原生界面与网页）").observe(
+            (time.perf_counter() - start) * 1000
+        )
 
         return True
 
@@ -248,10 +507,70 @@ class ThemeManager(QObject):
         """获取当前主题
 
         Returns:
-            当前主题名称
+            当前主题名称（跟随系统时为实际生效的主题）
         """
         return self._current_theme
 
+    def get_theme_mode(self) -> str:
+        """获取主题模式
+
+        Returns:
+            跟随系统时为system，否则为当前主题名称
+        """
+        return SYSTEM_THEME if self._follow_system else self._current_theme
+
+    def get_last_system_switch(self) -> dict:
+        """获取最近一次由系统配色变化触发的主题切换
+
+        Returns:
+            {"theme", "elapsed_ms", "timestamp"}，尚未发生时为空字典
+        """
+        return dict(self._last_system_switch)
+
+    def _follow_system_scheme(self) -> bool:
+        """进入跟随系统模式：订阅配色变化信号并立即应用当前系统配色"""
+        app = QGuiApplication.instance()
+        if app is None:
+            return False
+        hints = app.styleHints()
+        if not self._system_hooked:
+            hints.colorSchemeChanged.connect(self._on_color_scheme_changed)
+            self._system_hooked = True
+        self._follow_system = True
+        self._system_timer.stop()
+        return self._apply_resolved_theme(self._theme_for_scheme(hints.colorScheme()))
+
+    def _on_color_scheme_changed(self, scheme) -> None:
+        """系统配色变化（只记录并重启防抖计时器，连续变化只应用最后一次）"""
+        if not self._follow_system:
+            return
+        self._pending_scheme = scheme
+        self._system_timer.start()
+
+    def _apply_pending_scheme(self) -> None:
+        """防抖结束后应用系统配色，并记录切换耗时"""
+        if not self._follow_system or self._pending_scheme is None:
+            return
+        theme_name = self._theme_for_scheme(self._pending_scheme)
+        self._pending_scheme = None
+        if theme_name == self._current_theme:
+            return
+
+        start = time.perf_counter()
+        self._apply_resolved_theme(theme_name)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._last_system_switch = {
+            "theme": theme_name,
+            "elapsed_ms": round(elapsed_ms, 2),
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        metrics.histogram("theme.system_switch_ms", "跟随系统配色切换主题耗时").observe(elapsed_ms)
+        logger.debug(f"系统配色变化，已切换到{theme_name}主题（耗时 {elapsed_ms:.1f} ms）")
+
+    def _theme_for_scheme(self, scheme) -> str:
+        """系统配色 -> 主题名称（未知配色按浅色处理）"""
+        return "dark" if scheme == Qt.ColorScheme.Dark else "light"
+
     def toggle_theme(self) -> str:
         """切换主题
 
@@ -279,62 +598,324 @@ class ThemeManager(QObject):
         colors = theme.get("colors", {})
         return colors.get(color_name, "#000000")
 
+    def get_engine(self) -> str:
+        """获取当前原生主题引擎"""
+        return self._engine
+
+    def set_engine(self, engine: str) -> None:
+        """切换原生主题引擎并重新应用当前主题
+
+        Args:
+            engine: 原生主题引擎（palette/stylesheet）
+        """
+        if engine not in NATIVE_THEME_ENGINES or engine == self._engine:
+            return
+        self._engine = engine
+        self._apply_resolved_theme(self._current_theme)
+
+    def _apply_palette_theme(self, app, theme_name: str) -> None:
+        """以QPalette应用主题，按钮与输入框由ThemeStyle按主题颜色绘制，不经过样式表引擎"""
+        if app.styleSheet():
+            app.setStyleSheet("")
+        if self._style is None:
+            # 基于Fusion：完整遵循QPalette，平台原生样式会忽略部分调色板角色
+            self._style = ThemeStyle()
+            app.setStyle(self._style)
+        self._style.active = True
+        self._style.set_colors(self._theme_cache.get(theme_name, {}).get("colors", {}))
+
+        # 调色板变化会触发全部控件重绘，新的颜色随之生效
+        app.setPalette(self._get_palette(theme_name))
+
+    def _get_palette(self, theme_name: str) -> QPalette:
+        """将主题颜色映射为QPalette（每个主题只构建一次）"""
+        if theme_name not in self._palette_cache:
+            colors = self._theme_cache.get(theme_name, {}).get("colors", {})
+
+            def color(name, fallback):
+                return QColor(colors.get(name, fallback))
+
+            palette = QPalette()
+            roles = {
+                QPalette.ColorRole.Window: color("background", "#F8FAFC"),
+                QPalette.ColorRole.WindowText: color("text_primary", "#1E293B"),
+                QPalette.ColorRole.Base: color("surface", "#FFFFFF"),
+                QPalette.ColorRole.AlternateBase: color("background", "#F8FAFC"),
+                QPalette.ColorRole.Text: color("text_primary", "#1E293B"),
+                QPalette.ColorRole.Button: color("surface", "#FFFFFF"),
+                QPalette.ColorRole.ButtonText: color("text_primary", "#1E293B"),
+                QPalette.ColorRole.BrightText: color("error", "#DC2626"),
+                QPalette.ColorRole.Highlight: color("primary", "#2563EB"),
+                QPalette.ColorRole.HighlightedText: QColor("#FFFFFF"),
+                QPalette.ColorRole.PlaceholderText: color("text_secondary", "#64748B"),
+                QPalette.ColorRole.ToolTipBase: color("surface", "#FFFFFF"),
+                QPalette.ColorRole.ToolTipText: color("text_primary", "#1E293B"),
+                QPalette.ColorRole.Link: color("primary", "#2563EB"),
+                QPalette.ColorRole.LinkVisited: color("primary_hover", "#1D4ED8"),
+                QPalette.ColorRole.Mid: color("border", "#E2E8F0"),
+                QPalette.ColorRole.Dark: color("border", "#E2E8F0"),
+            }
+            for role, value in roles.items():
+                palette.setColor(role, value)
+
+            disabled_text = color("text_secondary", "#64748B")
+            for role in (QPalette.ColorRole.Text, QPalette.ColorRole.WindowText, QPalette.ColorRole.ButtonText):
+                palette.setColor(QPalette.ColorGroup.Disabled, role, disabled_text)
+
+            self._palette_cache[theme_name] = palette
+        return self._palette_cache[theme_name]
+
     def inject_theme_to_webview(self, webview) -> None:
         """向WebView注入主题样式
 
+        主题样式已作为持久化用户脚本安装到Profile中，这里只确保该页面已安装脚本并切换主题属性。
+
         Args:
             webview: WebView实例
         """
-        theme = self._theme_cache.get(self._current_theme, {})
-        colors = theme.get("colors", {})
+        page = webview.page()
+        if page:
+            page.runJavaScript(self._get_web_theme_script())
+            page.runJavaScript(self._get_web_switch_script())
 
-        # 生成CSS变量
-        css_vars = []
-        for key, value in colors.items():
-            css_var_name = f"--{key.replace('_', '-')}"
-            css_vars.append(f"{css_var_name}: {value};")
-
-        css_variables = "\n  ".join(css_vars)
-
-        # JavaScript代码注入主题
-        js_code = f"""
-        (function() {{
-            // 创建或更新主题样式
-            let themeStyle = document.getElementById('theme-override');
-            if (!themeStyle) {{
-                themeStyle = document.createElement('style');
-                themeStyle.id = 'theme-override';
-                document.head.appendChild(themeStyle);
-            }}
-
-            // 设置CSS变量
-            themeStyle.textContent = `
-                :root {{
-                    {css_variables}
-                }}
-
-                body {{
-                    background-color: var(--background);
-                    color: var(--text-primary);
-                }}
-
-                .card, .navbar, .sidebar, .settings-group {{
-                    background-color: var(--surface);
-                    border-color: var(--border);
-                }}
-
-                .primary-button, .login-button {{
-                    background-color: var(--primary);
-                    color: white;
-                }}
+    def attach_profile(self, profile) -> None:
+        """将主题样式安装为Profile的持久化用户脚本，此后该Profile加载的每个本地页面都在首帧前应用主题
+
+        Args:
+            profile: QWebEngineProfile实例
+        """
+        if profile not in self._web_profiles:
+            self._web_profiles.append(profile)
+            profile.destroyed.connect(lambda: profile in self._web_profiles and self._web_profiles.remove(profile))
+        self._install_profile_script(profile)
+
+    def attach_page(self, page) -> None:
+        """登记存活页面，主题切换时同步切换
+
+        Args:
+            page: QWebEnginePage实例
+        """
+        if page not in self._web_pages:
+            self._web_pages.append(page)
+            page.destroyed.connect(lambda: page in self._web_pages and self._web_pages.remove(page))
+            # 切换主题时页面可能不是本地页面（未安装脚本），加载完成后再同步一次（已一致时无变化）
+            page.loadFinished.connect(lambda ok: ok and page.runJavaScript(self._get_web_switch_script()))
+
+    def is_dark_theme(self, theme_name: str) -> bool:
+        """判断主题是否为深色（优先使用主题的is_dark字段，否则按背景亮度判断）
+
+        Args:
+            theme_name: 主题名称
 
-                .primary-button:hover, .login-button:hover {{
-                    background-color: var(--primary-hover);
-                }}
-            `;
-        }})();
+        Returns:
+            是否为深色主题
         """
+        theme = self._get_theme(theme_name) or {}
+        if "is_dark" in theme:
+            return bool(theme["is_dark"])
+        background = theme.get("colors", {}).get("background", "#FFFFFF").lstrip('#')
+        try:
+            r, g, b = (int(background[i:i + 2], 16) for i in (0, 2, 4))
+        except ValueError:
+            return False
+        return (0.299 * r + 0.587 * g + 0.114 * b) < 128
 
-        # 注入JavaScript
-        if webview.page():
-            webview.page().runJavaScript(js_code)
\ No newline at end of file
+    def _sync_web_theme(self) -> None:
+        """主题切换后同步存活页面（每个页面一次 __dmSetTheme 调用）
+
+        Profile脚本包含全部已加载主题，切换主题时不重新安装；新页面从切换时页面记录的当前主题开始。
+        只有主题集合或主题内容变化（按需加载、热重载）时才重建并重新安装脚本。
+        """
+        switch_script = self._get_web_switch_script()
+        self._get_web_theme_script()
+        if self._web_installed_key != self._web_script_cache_key:
+            for profile in self._web_profiles:
+                self._install_profile_script(profile)
+        for page in self._web_pages:
+            page.runJavaScript(switch_script)
+
+    def _install_profile_script(self, profile) -> None:
+        """在Profile脚本集合中安装（或更新）主题脚本"""
+        from PyQt6.QtWebEngineCore import QWebEngineScript
+
+        scripts = profile.scripts()
+        for script in scripts.find(WEB_THEME_SCRIPT_NAME):
+            scripts.remove(script)
+
+        script = QWebEngineScript()
+        script.setName(WEB_THEME_SCRIPT_NAME)
+        script.setSourceCode(self._get_web_theme_script())
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+        script.setRunsOnSubFrames(False)
+        scripts.insert(script)
+        self._web_installed_key = self._web_script_cache_key
+
+    def _get_web_switch_script(self) -> str:
+        """生成切换存活页面主题的脚本（只修改一个属性）
+
+        存活页面加载时的脚本可能还不包含该主题（按需加载或热重载的主题），此时先补充该主题的CSS。
+        """
+        theme_name = self._current_theme
+        css = self._compile_web_css(theme_name)
+        script = ""
+        if self._web_defined_css.get(theme_name) != css:
+            script = (
+                f"window.__dmDefineTheme && window.__dmDefineTheme({json.dumps(theme_name, ensure_ascii=False)}, "
+                f"{json.dumps(css, ensure_ascii=False)}, {json.dumps(self.is_dark_theme(theme_name))});"
+            )
+            self._web_defined_css[theme_name] = css
+        return script + f"window.__dmSetTheme && window.__dmSetTheme({json.dumps(theme_name, ensure_ascii=False)});"
+
+    def _get_web_theme_script(self) -> str:
+        """生成主题安装脚本（已加载主题的CSS已预编译，仅在主题集合或主题内容变化时重建，切换主题不重建）"""
+        cache_key = (tuple(self._theme_cache.keys()), self._web_css_version)
+        if self._web_script_cache_key != cache_key:
+            css = "\n".join(self._compile_web_css(name) for name in self._theme_cache) + WEB_THEME_COMMON_CSS
+            dark_themes = [name for name in self._theme_cache if self.is_dark_theme(name)]
+            self._web_script = (
+                WEB_THEME_SCRIPT_TEMPLATE
+                .replace("__THEME_CSS__", json.dumps(css, ensure_ascii=False))
+                .replace("__DARK_THEMES__", json.dumps(dark_themes, ensure_ascii=False))
+                .replace("__CURRENT_THEME__", json.dumps(self._current_theme, ensure_ascii=False))
+                .replace("__RUN_ID__", json.dumps(self._web_run_id))
+            )
+            self._web_script_cache_key = cache_key
+        return self._web_script
+
+    def _compile_web_css(self, theme_name: str) -> str:
+        """将主题颜色编译为按 data-dm-theme 属性生效的CSS变量（每个主题只编译一次）
+
+        Args:
+            theme_name: 主题名称
+
+        Returns:
+            CSS文本
+        """
+        if theme_name not in self._web_css_cache:
+            colors = self._theme_cache.get(theme_name, {}).get("colors", {})
+            declarations = [f"--{key.replace('_', '-')}: {value};" for key, value in colors.items()]
+            # 同时映射到页面自身使用的变量名，使页面样式与原生主题保持一致
+            declarations += [
+                f"{page_var}: var(--{color_var});"
+                for page_var, color_var in WEB_PAGE_VARIABLES.items()
+                if color_var.replace('-', '_') in colors
+            ]
+            selector = f'html[data-dm-theme="{theme_name}"], html[data-dm-theme="{theme_name}"] body'
+            self._web_css_cache[theme_name] = f"{selector} {{ {' '.join(declarations)} }}"
+        return self._web_css_cache[theme_name]
+
+
+# 页面变量名 -> 主题颜色变量名
+WEB_PAGE_VARIABLES = {
+    "--bg-color": "background",
+    "--card-bg": "surface",
+    "--border-color": "border",
+    "--primary-color": "primary",
+    "--success-color": "success",
+    "--warning-color": "warning",
+}
+
+WEB_THEME_SCRIPT_NAME = "desktop_manager_theme"
+
+WEB_THEME_COMMON_CSS = """
+html[data-dm-theme] body { background-color: var(--background); color: var(--text-primary); }
+html[data-dm-theme] .card, html[data-dm-theme] .navbar, html[data-dm-theme] .sidebar,
+html[data-dm-theme] .settings-group { background-color: var(--surface); border-color: var(--border); }
+html[data-dm-theme] .primary-button, html[data-dm-theme] .login-button { background-color: var(--primary); color: white; }
+html[data-dm-theme] .primary-button:hover, html[data-dm-theme] .login-button:hover { background-color: var(--primary-hover); }
+"""
+
+# 在文档创建时执行：挂载预编译样式表并设置主题属性，早于页面首帧，避免闪烁。
+# 当前主题取本次运行中最近一次切换时记录在localStorage中的主题（脚本安装后切换主题不需要重新安装），
+# 本次运行尚未切换过时使用脚本生成时的主题。
+# 页面自身的主题开关（body.dark-theme）变化时回传给桌面程序，保持原生与网页主题一致。
+WEB_THEME_SCRIPT_TEMPLATE = """
+(function() {
+    if (location.protocol !== 'file:' || window.__dmSetTheme) return;
+
+    const DARK_THEMES = __DARK_THEMES__;
+    const RUN_ID = __RUN_ID__;
+    let current = __CURRENT_THEME__;
+    try {
+        const stored = JSON.parse(localStorage.getItem('dmTheme') || 'null');
+        if (stored && stored.run === RUN_ID) current = stored.name;
+    } catch (e) {}
+
+    const sheet = new CSSStyleSheet();
+    sheet.replaceSync(__THEME_CSS__);
+    document.adoptedStyleSheets = [...document.adoptedStyleSheets, sheet];
+
+    function isDark(name) { return DARK_THEMES.includes(name); }
+
+    try { localStorage.setItem('theme', isDark(current) ? 'dark' : 'light'); } catch (e) {}
+
+    function applyRoot() {
+        if (document.documentElement) {
+            document.documentElement.setAttribute('data-dm-theme', current);
+        }
+    }
+
+    function applyBody() {
+        if (!document.body) return;
+        document.body.classList.toggle('dark-theme', isDark(current));
+        const toggle = document.getElementById('themeToggle');
+        if (toggle) toggle.classList.toggle('active', isDark(current));
+    }
+
+    function notifyNative(name) {
+        const frame = document.createElement('iframe');
+        frame.style.display = 'none';
+        frame.src = 'python://theme?name=' + encodeURIComponent(name);
+        document.body.appendChild(frame);
+        setTimeout(() => frame.remove(), 1000);
+    }
+
+    // 补充或替换单个主题的CSS（后加入的样式表优先）
+    const themeSheets = {};
+    window.__dmDefineTheme = function(name, css, dark) {
+        if (!themeSheets[name]) {
+            themeSheets[name] = new CSSStyleSheet();
+            document.adoptedStyleSheets = [...document.adoptedStyleSheets, themeSheets[name]];
+        }
+        themeSheets[name].replaceSync(css);
+        if (dark && !DARK_THEMES.includes(name)) DARK_THEMES.push(name);
+        if (!dark && DARK_THEMES.includes(name)) DARK_THEMES.splice(DARK_THEMES.indexOf(name), 1);
+    };
+
+    window.__dmSetTheme = function(name) {
+        current = name;
+        try {
+            localStorage.setItem('theme', isDark(name) ? 'dark' : 'light');
+            localStorage.setItem('dmTheme', JSON.stringify({ run: RUN_ID, name: name }));
+        } catch (e) {}
+        applyRoot();
+        applyBody();
+    };
+
+    if (document.documentElement) {
+        applyRoot();
+    } else {
+        const rootObserver = new MutationObserver(() => {
+            if (document.documentElement) {
+                applyRoot();
+                rootObserver.disconnect();
+            }
+        });
+        rootObserver.observe(document, { childList: true });
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+        applyBody();
+        new MutationObserver(() => {
+            const pageDark = document.body.classList.contains('dark-theme');
+            if (pageDark !== isDark(current)) {
+                // 页面自身切换了主题，以页面为准并通知桌面程序
+                const name = pageDark ? 'dark' : 'light';
+                window.__dmSetTheme(name);
+                notifyNative(name);
+            }
+        }).observe(document.body, { attributes: true, attributeFilter: ['class'] });
+    });
+})();
+"""
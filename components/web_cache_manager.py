@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebEngine缓存管理器
+负责HTTP缓存配置、持久化存储的容量统计与缓存目录的预算裁剪
+"""
+
+import json
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineProfile
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+HTTP_CACHE_TYPES = {
+    "disk": QWebEngineProfile.HttpCacheType.DiskHttpCache,
+    "memory": QWebEngineProfile.HttpCacheType.MemoryHttpCache,
+    "none": QWebEngineProfile.HttpCacheType.NoCache,
+}
+
+# 按预算裁剪的存储目录（相对Profile目录），按淘汰优先级排序（越靠前越先淘汰）；
+# 只包含可再生的缓存，Cookies、Local Storage、IndexedDB等页面保存的数据不裁剪，也不计入预算；
+# HTTP缓存在单独的 cache 目录，由 http_cache_size_mb 限制
+EVICTABLE_STORAGE = [
+    "GPUCache",
+    "DawnCache",
+    "GrShaderCache",
+    "Code Cache",
+    "Service Worker/CacheStorage",
+]
+
+# “清除模块缓存”涉及的目录：与预算裁剪相同的可再生缓存，不含Cookies与页面本地数据
+# （启动时只执行 EVICTABLE_STORAGE 中的目录，两者必须一致）
+MODULE_CACHE_STORAGE = list(EVICTABLE_STORAGE)
+
+PENDING_EVICTION_FILE = ".pending_eviction.json"
+TRASH_DIR = ".trash"
+
+
+class WebCacheManager(QObject):
+    """WebEngine缓存管理器类"""
+
+    stats_ready = pyqtSignal(dict)  # 缓存统计完成信号
+
+    def __init__(self, profile_path: Path, settings_manager, parent=None):
+        """初始化缓存管理器
+
+        Args:
+            profile_path: WebEngine持久化存储目录
+            settings_manager: 设置管理器实例
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.profile_path = Path(profile_path)
+        self.cache_path = self.profile_path / "cache"
+        self.settings_manager = settings_manager
+        self.profile = None
+        self._last_stats = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="web-cache")
+        self._scan_timer = QTimer(self)
+        self._scan_timer.timeout.connect(self.refresh_stats)
+
+    @property
+    def storage_budget(self) -> int:
+        """持久化存储预算（字节）"""
+        return int(self.settings_manager.get('web_cache.storage_budget_mb', 512)) * 1024 * 1024
+
+    def prepare_storage(self) -> None:
+        """在创建Profile之前执行上次计划的淘汰
+
+        只做目录重命名（移入回收目录），真正的删除在后台线程完成，不阻塞启动。
+        """
+        pending_file = self.profile_path / PENDING_EVICTION_FILE
+        if not pending_file.exists():
+            return
+
+        try:
+            with open(pending_file, 'r', encoding='utf-8') as f:
+                pending = json.load(f)
+            pending_file.unlink()
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"读取缓存淘汰计划失败: {e}")
+            return
+
+        trash_dir = self.profile_path / TRASH_DIR
+        removed = []
+        for name in pending.get("directories", []):
+            source = self.profile_path / name
+            if name not in EVICTABLE_STORAGE:
+                logger.warning(f"淘汰计划中的目录不在可淘汰列表中，已跳过: {name}")
+                continue
+            if not source.exists():
+                continue
+            try:
+                trash_dir.mkdir(parents=True, exist_ok=True)
+                source.rename(trash_dir / f"{name.replace('/', '_')}-{uuid.uuid4().hex[:8]}")
+                removed.append(name)
+            except OSError as e:
+                logger.warning(f"淘汰存储目录 {name} 失败: {e}")
+        logger.info(f"已淘汰WebEngine存储目录: {', '.join(removed) if removed else '无'}")
+
+    def apply_to_profile(self, profile: QWebEngineProfile) -> None:
+        """将HTTP缓存配置应用到Profile
+
+        Args:
+            profile: WebEngine Profile实例
+        """
+        self.profile = profile
+        cache_type = self.settings_manager.get('web_cache.http_cache_type', 'disk')
+        profile.setHttpCacheType(HTTP_CACHE_TYPES.get(cache_type, QWebEngineProfile.HttpCacheType.DiskHttpCache))
+        cache_size_mb = int(self.settings_manager.get('web_cache.http_cache_size_mb', 256))
+        # 0表示由Chromium自行决定大小
+        profile.setHttpCacheMaximumSize(max(cache_size_mb, 0) * 1024 * 1024)
+
+    def start(self) -> None:
+        """启动后台统计与回收目录清理"""
+        self._executor.submit(self._empty_trash)
+        interval_minutes = int(self.settings_manager.get('web_cache.scan_interval_minutes', 30))
+        if interval_minutes > 0:
+            self._scan_timer.start(interval_minutes * 60 * 1000)
+        QTimer.singleShot(10000, self.refresh_stats)
+
+    def shutdown(self) -> None:
+        """停止后台任务"""
+        self._scan_timer.stop()
+        self._executor.shutdown(wait=False)
+
+    def refresh_stats(self) -> None:
+        """在后台线程重新统计缓存与存储占用"""
+        self._executor.submit(self._scan)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取最近一次的统计结果"""
+        return dict(self._last_stats)
+
+    def clear_module_cache(self) -> None:
+        """清除模块缓存（HTTP缓存立即清除，其余缓存目录在下次启动时淘汰），保留Cookies"""
+        if self.profile:
+            self.profile.clearHttpCache()
+        self._executor.submit(self._write_pending_eviction, MODULE_CACHE_STORAGE)
+        logger.info("已清除HTTP缓存，其余模块缓存将在下次启动时清理")
+
+    def _scan(self) -> None:
+        """统计各目录大小，超出预算时生成淘汰计划（工作线程）"""
+        start = time.monotonic()
+        storage = {}
+        if self.profile_path.exists():
+            for entry in self.profile_path.iterdir():
+                if entry.name in ("cache", TRASH_DIR) or entry.name.startswith('.'):
+                    continue
+                storage[entry.name] = _directory_size(entry)
+
+        http_cache_size = _directory_size(self.cache_path)
+        storage_total = sum(storage.values())
+        # 预算只与可裁剪的缓存比较（其余数据无法淘汰，计入后可能永远超出预算）
+        evictable = {
+            name: storage[name] if name in storage else _directory_size(self.profile_path / name)
+            for name in EVICTABLE_STORAGE
+        }
+        evictable_total = sum(evictable.values())
+        budget = self.storage_budget
+
+        stats = {
+            "http_cache_type": self.settings_manager.get('web_cache.http_cache_type', 'disk'),
+            "http_cache_bytes": http_cache_size,
+            "http_cache_limit_bytes": int(self.settings_manager.get('web_cache.http_cache_size_mb', 256)) * 1024 * 1024,
+            "storage_bytes": storage_total,
+            "evictable_bytes": evictable_total,
+            "storage_budget_bytes": budget,
+            "storage": storage,
+            "pending_eviction": [],
+            "scanned_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "scan_ms": 0.0,
+        }
+
+        if budget > 0 and evictable_total > budget:
+            stats["pending_eviction"] = self._plan_eviction(evictable, evictable_total - budget)
+            self._write_pending_eviction(stats["pending_eviction"])
+            logger.warning(
+                f"WebEngine缓存 {evictable_total / 1048576:.1f} MB 超出预算 {budget / 1048576:.1f} MB，"
+                f"下次启动将淘汰: {', '.join(stats['pending_eviction'])}"
+            )
+
+        stats["scan_ms"] = round((time.monotonic() - start) * 1000, 1)
+        self._last_stats = stats
+        self.stats_ready.emit(stats)
+
+    def _plan_eviction(self, storage: Dict[str, int], excess: int) -> List[str]:
+        """按优先级挑选需要淘汰的目录，直到释放足够空间"""
+        plan = []
+        freed = 0
+        for name in EVICTABLE_STORAGE:
+            if freed >= excess:
+                break
+            size = storage.get(name, 0)
+            if size > 0:
+                plan.append(name)
+                freed += size
+        return plan
+
+    def _write_pending_eviction(self, directories: List[str]) -> None:
+        """写入（合并）下次启动时执行的淘汰计划"""
+        pending_file = self.profile_path / PENDING_EVICTION_FILE
+        merged = list(directories)
+        try:
+            if pending_file.exists():
+                with open(pending_file, 'r', encoding='utf-8') as f:
+                    merged = list(dict.fromkeys(json.load(f).get("directories", []) + merged))
+            with open(pending_file, 'w', encoding='utf-8') as f:
+                json.dump({"directories": merged}, f, ensure_ascii=False)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"写入缓存淘汰计划失败: {e}")
+
+    def _empty_trash(self) -> None:
+        """删除回收目录（工作线程）"""
+        trash_dir = self.profile_path / TRASH_DIR
+        if trash_dir.exists():
+            shutil.rmtree(trash_dir, ignore_errors=True)
+
+
+def _directory_size(path: Path) -> int:
+    """计算文件或目录的总字节数"""
+    try:
+        if path.is_file():
+            return path.stat().st_size
+        total = 0
+        for item in path.rglob('*'):
+            try:
+                if item.is_file():
+                    total += item.stat().st_size
+            except OSError:
+                pass
+        return total
+    except OSError:
+        return 0
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网页性能采集
+通过PerformanceObserver收集导航、绘制与长任务条目，在桌面程序中按路由汇总：
+程序自带的页面（file:）由Profile级用户脚本分批经 python://perf 回传；
+程序内的模块页面在隔离的ApplicationWorld中采集（不与页面脚本互相影响），由桌面程序定时读取
+"""
+
+import json
+import time
+from typing import Any, Dict
+from PyQt6.QtCore import QObject, QTimer
+
+from utils.logger import setup_logger
+from utils.metrics import Histogram, metrics
+
+logger = setup_logger(__name__)
+
+WEB_PERF_SCRIPT_NAME = "desktop_manager_perf"
+
+# 最多汇总的路由数，超出后计入 (other)
+MAX_ROUTES = 100
+
+# 每个路由保留的长任务来源数
+MAX_LONG_TASK_SOURCES = 10
+
+# 定时读取模块页面性能条目的间隔（毫秒）
+PULL_INTERVAL_MS = 5000
+
+# 导航/绘制条目字段 -> 汇总指标名
+NAVIGATION_FIELDS = {
+    "ttfb": "ttfb_ms",
+    "dcl": "dom_content_loaded_ms",
+    "load": "load_ms",
+}
+PAINT_NAMES = {
+    "first-paint": "first_paint_ms",
+    "first-contentful-paint": "first_contentful_paint_ms",
+}
+
+
+class WebPerfCollector(QObject):
+    """网页性能采集类"""
+
+    def __init__(self, parent=None):
+        """初始化网页性能采集
+
+        Args:
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._routes = {}  # route -> {"histograms": {指标: Histogram}, "long_task_sources": {来源: 次数}, ...}
+
+    def attach_profile(self, profile) -> None:
+        """在Profile中安装采集脚本，此后该Profile加载的每个页面都会上报性能条目
+
+        Args:
+            profile: QWebEngineProfile实例
+        """
+        from PyQt6.QtWebEngineCore import QWebEngineScript
+
+        scripts = profile.scripts()
+        for script in scripts.find(WEB_PERF_SCRIPT_NAME):
+            scripts.remove(script)
+
+        script = QWebEngineScript()
+        script.setName(WEB_PERF_SCRIPT_NAME)
+        script.setSourceCode(WEB_PERF_SCRIPT % "false")
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+        script.setRunsOnSubFrames(False)
+        scripts.insert(script)
+
+    def attach_page(self, page) -> None:
+        """在模块页面的ApplicationWorld中安装采集脚本，并定时读取累积的性能条目
+
+        Args:
+            page: QWebEnginePage实例（加载第三方模块页面）
+        """
+        from PyQt6.QtWebEngineCore import QWebEngineScript
+
+        script = QWebEngineScript()
+        script.setName(WEB_PERF_SCRIPT_NAME)
+        script.setSourceCode(WEB_PERF_SCRIPT % "true")
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld)
+        script.setRunsOnSubFrames(False)
+        page.scripts().insert(script)
+
+        # 定时器随页面释放
+        timer = QTimer(page)
+        timer.setInterval(PULL_INTERVAL_MS)
+        timer.timeout.connect(lambda: self._pull(page))
+        timer.start()
+
+    def _pull(self, page) -> None:
+        """读取模块页面累积的性能条目（无条目时返回空字符串）"""
+        from PyQt6.QtWebEngineCore import QWebEngineScript
+
+        page.runJavaScript(
+            "window.__dmPerfTake ? window.__dmPerfTake() : ''",
+            QWebEngineScript.ScriptWorldId.ApplicationWorld,
+            lambda data: data and self.handle_report(data),
+        )
+
+    def handle_report(self, data: str) -> None:
+        """处理页面上报的一批性能条目
+
+        Args:
+            data: JSON字符串 {"route": str, "entries": [...]}
+        """
+        try:
+            report = json.loads(data)
+            route = str(report["route"]) or "(unknown)"
+            entries = list(report["entries"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"无法解析网页性能上报: {e}")
+            return
+
+        aggregate = self._get_route(route)
+        aggregate["reports"] += 1
+        aggregate["last_report"] = time.strftime('%Y-%m-%d %H:%M:%S')
+        metrics.counter("web.perf_reports", "网页性能上报批次").inc()
+
+        for entry in entries:
+            entry_type = entry.get("type") if isinstance(entry, dict) else None
+            if entry_type == "navigation":
+                aggregate["navigations"] += 1
+                for field, name in NAVIGATION_FIELDS.items():
+                    if entry.get(field):
+                        self._observe(aggregate, name, entry[field])
+            elif entry_type == "paint" and entry.get("name") in PAINT_NAMES:
+                self._observe(aggregate, PAINT_NAMES[entry["name"]], entry.get("start", 0))
+            elif entry_type == "longtask":
+                self._observe(aggregate, "long_task_ms", entry.get("duration", 0))
+                metrics.counter("web.long_tasks", "网页长任务次数").inc()
+                sources = aggregate["long_task_sources"]
+                source = str(entry.get("source") or "unknown")
+                if source in sources or len(sources) < MAX_LONG_TASK_SOURCES:
+                    sources[source] = sources.get(source, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """按路由导出汇总结果
+
+        Returns:
+            {路由: {"reports", "navigations", "last_report", "metrics": {指标: 直方图数据}, "long_task_sources"}}
+        """
+        result = {}
+        for route, aggregate in sorted(self._routes.items()):
+            result[route] = {
+                "reports": aggregate["reports"],
+                "navigations": aggregate["navigations"],
+                "last_report": aggregate["last_report"],
+                "metrics": {name: histogram.snapshot() for name, histogram in sorted(aggregate["histograms"].items())},
+                "long_task_sources": dict(sorted(
+                    aggregate["long_task_sources"].items(), key=lambda item: item[1], reverse=True
+                )),
+            }
+        return result
+
+    def _get_route(self, route: str) -> Dict[str, Any]:
+        """获取路由汇总（路由数达到上限后新路由计入 (other)）"""
+        if route not in self._routes and len(self._routes) >= MAX_ROUTES:
+            route = "(other)"
+        if route not in self._routes:
+            self._routes[route] = {
+                "reports": 0,
+                "navigations": 0,
+                "last_report": None,
+                "histograms": {},
+                "long_task_sources": {},
+            }
+        return self._routes[route]
+
+    def _observe(self, aggregate: Dict[str, Any], name: str, value: Any) -> None:
+        """向路由的直方图记录一个观测值"""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        histograms = aggregate["histograms"]
+        if name not in histograms:
+            histograms[name] = Histogram(name)
+        histograms[name].observe(value)
+
+
+# 在文档创建时执行：订阅性能条目（%s 为是否由桌面程序读取）
+# 上报模式：Profile级脚本只在程序自带的页面运行，空闲时分批经隐藏iframe导航到 python://perf（不触发页面的beforeunload）；
+# 读取模式：模块页面的条目留在队列中，由桌面程序调用 __dmPerfTake 取走，不向第三方页面的DOM插入任何元素
+WEB_PERF_SCRIPT = """
+(function() {
+    const PULL = %s;
+    if (!PULL && location.protocol !== 'file:') return;
+    if (window.__dmPerfCollector || !window.PerformanceObserver) return;
+    window.__dmPerfCollector = true;
+
+    const FLUSH_DELAY_MS = 1000;
+    const MAX_BATCH = 50;
+    const MAX_QUEUE = 500;
+    const route = PULL
+        ? location.host + location.pathname
+        : decodeURIComponent(location.pathname.split('/').pop());
+
+    const queue = [];
+    let timer = null;
+
+    function schedule() {
+        if (PULL) {
+            // 长时间未被读取时只保留最近的条目
+            if (queue.length > MAX_QUEUE) queue.splice(0, queue.length - MAX_QUEUE);
+            return;
+        }
+        if (!timer) timer = setTimeout(flush, FLUSH_DELAY_MS);
+    }
+
+    if (PULL) {
+        window.__dmPerfTake = function() {
+            if (!queue.length) return '';
+            return JSON.stringify({ route: route, entries: queue.splice(0, queue.length) });
+        };
+    }
+
+    function flush() {
+        timer = null;
+        if (!queue.length) return;
+        if (!document.body) {
+            schedule();
+            return;
+        }
+        const batch = queue.splice(0, MAX_BATCH);
+        const frame = document.createElement('iframe');
+        frame.style.display = 'none';
+        frame.src = 'python://perf?data=' + encodeURIComponent(JSON.stringify({ route: route, entries: batch }));
+        document.body.appendChild(frame);
+        setTimeout(() => frame.remove(), 1000);
+        if (queue.length) schedule();
+    }
+
+    function observe(type, convert) {
+        try {
+            new PerformanceObserver(list => {
+                list.getEntries().forEach(entry => queue.push(convert(entry)));
+                schedule();
+            }).observe({ type: type, buffered: true });
+        } catch (e) {
+            // 当前引擎不支持该条目类型
+        }
+    }
+
+    observe('navigation', entry => ({
+        type: 'navigation',
+        ttfb: entry.responseStart,
+        dcl: entry.domContentLoadedEventEnd,
+        load: entry.loadEventEnd,
+    }));
+    observe('paint', entry => ({ type: 'paint', name: entry.name, start: entry.startTime }));
+    observe('longtask', entry => {
+        const attribution = entry.attribution && entry.attribution[0];
+        return {
+            type: 'longtask',
+            start: entry.startTime,
+            duration: entry.duration,
+            source: (attribution && (attribution.containerSrc || attribution.containerName)) || entry.name,
+        };
+    });
+})();
+"""
@@ -9,9 +9,11 @@ import sys
 import os
 import ctypes
 from pathlib import Path
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
 from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+from PyQt6 import sip
 
 # 添加当前目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -19,6 +21,17 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from components.settings_manager import SettingsManager
 from components.theme_manager import ThemeManager
 from components.login_dialog import LoginDialog
+from components.engine_profile import apply_engine_profile
+from components.stall_watchdog import StallWatchdog
+from components.process_monitor import ProcessMemoryMonitor
+from components.standby_manager import StandbyManager
+from components.autostart import STANDBY_ARG
+from components.module_cache import ModuleResponseCache
+from components.module_scheme import register_module_cache_scheme
+from components.request_rules import RequestRuleEngine
+from components.download_manager import DownloadManager
+from components.module_catalog import ModuleCatalog
+from components.module_usage import ModuleUsage
 from utils.logger import setup_logger
 
 # 设置日志
@@ -27,12 +40,17 @@ logger = setup_logger(__name__)
 class DesktopApp(QApplication):
     """桌面应用程序主类"""
 
-    def __init__(self, argv):
+    def __init__(self, argv, settings_manager=None):
         super().__init__(argv)
 
+        # 以 --new-session 启动时，若已有实例运行，则在该实例中新开一个会话窗口
+        self._request_new_session = "--new-session" in argv
+        # 开机自启动时带 --standby 参数，启用待机模式时不显示窗口，直接驻留托盘
+        self._start_in_standby = STANDBY_ARG in argv
+
         # 初始化管理器
-        self.settings_manager = SettingsManager()
-        self.theme_manager = ThemeManager()
+        self.settings_manager = settings_manager or SettingsManager()
+        self.theme_manager = ThemeManager(engine=self.settings_manager.get('native_theme_engine', 'palette'))
 
         # 设置应用属性（统一来源：settings.app）
         self.app_name = self.settings_manager.get('app.name', '桌面管理程序')
@@ -54,12 +72,56 @@ class DesktopApp(QApplication):
         if self.should_exit:
             return
 
+        # GUI线程卡顿看门狗（事件循环启动后才开始心跳，避免把启动过程误判为卡顿）
+        self.stall_watchdog = StallWatchdog(self.settings_manager, self)
+        QTimer.singleShot(0, self.stall_watchdog.start)
+        self.aboutToQuit.connect(self.stall_watchdog.shutdown)
+
         # 初始化样式
         self.init_style()
 
         # 主对话框引用，避免被回收
         self.login_dialog = None
 
+        # 会话窗口（会话编号 -> 对话框）；所有会话共用本进程的WebEngine浏览器进程
+        self.sessions = {}
+
+        # 渲染进程内存监控由所有会话共享，按会话汇总各自的额外开销
+        self.memory_monitor = ProcessMemoryMonitor(self.settings_manager, self)
+        self.aboutToQuit.connect(self.memory_monitor.shutdown)
+
+        # 模块页面离线缓存由所有会话共享
+        self.module_cache = ModuleResponseCache(self.settings_manager, parent=self)
+        self.aboutToQuit.connect(self.module_cache.shutdown)
+
+        # 请求拦截规则同样由所有会话共享，命中计数统一汇总
+        self.request_rules = RequestRuleEngine(self.settings_manager)
+
+        # 下载管理跨会话共享（统一限速，关闭某个会话窗口不会中断其他会话的下载）
+        self.download_manager = DownloadManager(self.settings_manager, parent=self)
+        self.aboutToQuit.connect(self.download_manager.shutdown)
+
+        # 模块目录跨会话共享（远程清单只请求一次，更新推送到各会话的主页面）
+        self.module_catalog = ModuleCatalog(self.settings_manager, parent=self)
+        self.module_catalog.start()
+        self.aboutToQuit.connect(self.module_catalog.shutdown)
+
+        # 模块使用记录跨会话共享（按登录用户分别记录，同一用户的多个会话合并计算常用模块）
+        self.module_usage = ModuleUsage(self.settings_manager)
+        self.aboutToQuit.connect(self.module_usage.shutdown)
+
+        # 托盘待机：窗口隐藏后应用仍需常驻，退出时机由会话管理决定
+        self.setQuitOnLastWindowClosed(False)
+        self.standby_manager = StandbyManager(
+            self.settings_manager, self.memory_monitor,
+            self._build_server_name(self.app_name), self.app_name, self.windowIcon(), self
+        )
+        self.standby_manager.activate_requested.connect(self._activate_main_window)
+        self.standby_manager.new_session_requested.connect(self.open_session)
+        self.standby_manager.quit_requested.connect(self.quit_all_sessions)
+        self.aboutToQuit.connect(self.standby_manager.shutdown)
+        self.standby_manager.apply()
+
         # 创建主窗口
         self.create_main_window()
 
@@ -110,7 +172,7 @@ class DesktopApp(QApplication):
         socket = QLocalSocket(self)
         socket.connectToServer(self.server_name)
         if socket.waitForConnected(300):
-            socket.write(b"ACTIVATE")
+            socket.write(b"NEW_SESSION" if self._request_new_session else b"ACTIVATE")
             socket.flush()
             socket.waitForBytesWritten(300)
             socket.disconnectFromServer()
@@ -127,17 +189,24 @@ class DesktopApp(QApplication):
     def _handle_activation_request(self):
         while self.local_server and self.local_server.hasPendingConnections():
             client = self.local_server.nextPendingConnection()
+            message = b""
             if client:
                 client.waitForReadyRead(100)
-                _ = client.readAll()
+                message = bytes(client.readAll())
                 client.disconnectFromServer()
-            self._activate_main_window()
+            if message == b"NEW_SESSION":
+                self.open_session()
+            else:
+                self._activate_main_window()
 
     def _activate_main_window(self):
-        """激活已打开窗口"""
+        """激活已打开窗口（托盘待机中的窗口恢复显示）"""
         if not self.login_dialog:
             return
 
+        if self.login_dialog.isHidden():
+            self.standby_manager.leave()
+            self.login_dialog.show()
         if self.login_dialog.isMinimized():
             self.login_dialog.showNormal()
         self.login_dialog.raise_()
@@ -156,16 +225,94 @@ class DesktopApp(QApplication):
         self.show_login_dialog()
 
     def show_login_dialog(self):
-        """显示登录对话框"""
-        self.login_dialog = LoginDialog(self.settings_manager)
-        # 对话框关闭后退出应用，避免后台残留进程
-        self.login_dialog.finished.connect(self.quit)
-        self.login_dialog.show()
+        """显示登录对话框（以待机方式自启动时只加载不显示）"""
+        start_hidden = self._start_in_standby and self.standby_manager.enabled
+        self.login_dialog = self.open_session(show=not start_hidden)
+        self._update_standby_window()
+        if start_hidden:
+            self.standby_manager.enter(self.login_dialog)
+
+    def open_session(self, show=True):
+        """新开一个会话窗口（使用最小的空闲会话编号，编号对应的Profile目录跨重启保留）
+
+        Args:
+            show: 是否立即显示
+
+        Returns:
+            新会话的对话框，已达到会话数上限时返回None
+        """
+        max_sessions = max(int(self.settings_manager.get('sessions.max_sessions', 4)), 1)
+        if len(self.sessions) >= max_sessions:
+            logger.warning(f"会话数已达上限 {max_sessions}，不再新建会话")
+            self._activate_main_window()
+            return None
+
+        session_id = 1
+        while session_id in self.sessions:
+            session_id += 1
+
+        dialog = LoginDialog(
+            self.settings_manager, self.theme_manager, session_id,
+            self.memory_monitor, self.module_cache, self.request_rules, self.download_manager,
+            self.module_catalog, self.module_usage
+        )
+        dialog.new_session_requested.connect(self.open_session)
+        dialog.finished.connect(lambda _result, sid=session_id: self._on_session_finished(sid))
+        dialog.standby_entered.connect(lambda d=dialog: self.standby_manager.enter(d))
+        dialog.standby_settings_changed.connect(self._on_standby_settings_changed)
+        self.sessions[session_id] = dialog
+        if show:
+            dialog.show()
+        logger.info(f"已打开会话 {session_id}，当前会话数 {len(self.sessions)}")
+        return dialog
+
+    def _on_session_finished(self, session_id):
+        """会话窗口关闭：最后一个会话关闭后退出应用，避免后台残留进程"""
+        dialog = self.sessions.pop(session_id, None)
+        if dialog is None:
+            return
+
+        if self.login_dialog is dialog:
+            self.login_dialog = next(iter(self.sessions.values()), None)
+            self._update_standby_window()
+
+        if not self.sessions:
+            self.quit()
+            return
+
+        # 交给Qt释放：在页面与Profile的延迟删除之后再删除对话框
+        sip.transferto(dialog, None)
+        dialog.deleteLater()
+        logger.info(f"已关闭会话 {session_id}，当前会话数 {len(self.sessions)}")
+
+    def _update_standby_window(self):
+        """只有主窗口在关闭时隐藏到托盘，其他会话窗口正常关闭"""
+        enabled = self.standby_manager.enabled
+        for dialog in self.sessions.values():
+            dialog.hide_on_close = enabled and dialog is self.login_dialog
+
+    def _on_standby_settings_changed(self):
+        """设置页面修改了待机/自启动设置"""
+        self.standby_manager.apply()
+        self._update_standby_window()
+
+    def quit_all_sessions(self):
+        """退出程序（托盘菜单）：关闭全部会话窗口并释放WebEngine资源"""
+        for dialog in list(self.sessions.values()):
+            dialog.hide_on_close = False
+            dialog.close()
+        self.quit()
 
 def main():
     """主函数"""
+    # 引擎参数必须在QApplication创建前写入环境变量
+    settings_manager = SettingsManager()
+    apply_engine_profile(settings_manager)
+    # 自定义URL方案同样需要在QApplication创建前注册
+    register_module_cache_scheme()
+
     # 创建QApplication实例
-    app = DesktopApp(sys.argv)
+    app = DesktopApp(sys.argv, settings_manager)
 
     if getattr(app, 'should_exit', False):
         sys.exit(0)
@@ -2,25 +2,52 @@
 # -*- coding: utf-8 -*-
 """
 日志工具模块
+所有日志记录器共用一条异步管道：调用线程只把记录放入有界队列，
+由单个写线程负责输出到控制台与按日期/大小轮转的日志文件，轮转出的文件在后台压缩并按天数清理；
+多个进程共用日志目录时只有持有目录锁的进程轮转与压缩，且只处理自己轮转出的文件
 """
 
-import sys
+import atexit
+import copy
+import gzip
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, Optional
 
-def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
-    """设置日志记录器
+# 队列容量，写线程跟不上时按丢弃策略处理，调用线程永不阻塞
+LOG_QUEUE_SIZE = 10000
+
+# 单个日志文件的大小上限（字节），超出后轮转为 app_YYYYMMDD.N.log
+LOG_MAX_BYTES = 10 * 1024 * 1024
+
+# 日志文件（含压缩文件）保留天数
+LOG_RETENTION_DAYS = 14
+
+# 日志目录锁文件（持有者负责轮转与压缩，进程退出时由系统释放）
+LOG_LOCK_FILE = ".rotate.lock"
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
 
-    Args:
-        name: 日志记录器名称
-        level: 日志级别
+
+def get_log_dir() -> Optional[Path]:
+    """获取日志目录 - 处理打包后的路径问题
 
     Returns:
-        配置好的日志记录器
+        日志目录，无法创建时返回None（仅输出到控制台）
     """
-    # 创建日志目录 - 处理打包后的路径问题
     if getattr(sys, 'frozen', False):
         # 如果是打包后的exe程序，使用临时目录
         import tempfile
@@ -33,38 +60,306 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     try:
         log_dir.mkdir(parents=True, exist_ok=True)
     except Exception:
-        # 如果无法创建日志目录，则禁用文件日志
-        log_dir = None
+        return None
+    return log_dir
 
-    # 创建日志记录器
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
 
-    # 避免重复添加处理器
-    if not logger.handlers:
-        # 创建格式化器
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-
-        # 创建控制台处理器（总是启用）
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(level)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+def _try_lock_dir(log_dir: Path):
+    """尝试以非阻塞方式获取日志目录锁
+
+    Returns:
+        成功时返回保持打开的锁文件（关闭即释放），已被其他进程持有时返回None
+    """
+    try:
+        lock_file = open(log_dir / LOG_LOCK_FILE, 'a+')
+    except OSError:
+        return None
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """写入有界队列的处理器
+
+    队列已满时：WARNING以下的记录直接丢弃；WARNING及以上的记录挤掉队首最旧的一条，
+    保证突发日志时错误信息仍能写出。所有丢弃都计入统计。
+    """
+
+    def __init__(self, log_queue: queue.Queue, stats: Dict[str, Any]):
+        super().__init__(log_queue)
+        self.stats = stats
+        self._exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """在调用线程中合并消息参数并展开异常（参数可能在之后被修改，异常对象引用着栈帧）
+
+        与标准实现相同，修改的是记录的副本（原记录还会交给其他处理器）；
+        不同的是这里不做完整格式化，完整格式化由写线程完成。
+        """
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = self._exception_formatter.formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                self.stats["dropped"] += 1
+                return
+            try:
+                self.queue.get_nowait()
+                self.stats["dropped"] += 1
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                self.stats["dropped"] += 1
+                return
+        self.stats["records"] += 1
+        levels = self.stats["levels"]
+        levels[record.levelname] = levels.get(record.levelname, 0) + 1
+
+
+class RotatingLogFileHandler(logging.handlers.BaseRotatingHandler):
+    """按日期与大小轮转的日志文件处理器（仅在写线程中使用）
+
+    当天日志写入 app_YYYYMMDD.log；超过大小上限时改名为 app_YYYYMMDD.N.log，
+    跨天时切换到新文件。轮转出的文件交给后台线程压缩为 .gz，并清理过期文件。
+
+    只有持有日志目录锁的实例按大小轮转、压缩与清理，且只处理本实例轮转出的文件；
+    其他进程只追加写入（跨天时切换文件），不改动任何已有文件。
+    """
+
+    def __init__(self, log_dir: Path, stats: Dict[str, Any], max_bytes: int, retention_days: int):
+        self.log_dir = log_dir
+        self.stats = stats
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self._day = datetime.now().strftime('%Y%m%d')
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+        self._dir_lock = _try_lock_dir(log_dir)
+        self._created = []  # 本实例轮转出的文件（压缩后为.gz），清理只在其中进行
+        super().__init__(str(self._path_for(self._day)), 'a', encoding='utf-8', delay=True)
+
+    @property
+    def owns_dir(self) -> bool:
+        """是否持有日志目录锁（负责轮转与压缩）"""
+        return self._dir_lock is not None
+
+    def _path_for(self, day: str) -> Path:
+        return self.log_dir / f"app_{day}.log"
+
+    def _open(self):
+        # 日志目录可能在运行期间被清理
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if datetime.fromtimestamp(record.created).strftime('%Y%m%d') != self._day:
+            return True
+        if self.max_bytes <= 0 or not self.owns_dir:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() > 0 and self.stream.tell() + len(record.getMessage()) >= self.max_bytes
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        current = Path(self.baseFilename)
+        today = datetime.now().strftime('%Y%m%d')
+        if today != self._day:
+            # 跨天：旧文件保持原名，直接压缩
+            rotated = current
+            self._day = today
+            self.baseFilename = str(self._path_for(today))
+            if not self.owns_dir:
+                return
+        else:
+            index = 1
+            while (current.with_name(f"{current.stem}.{index}.log").exists()
+                   or current.with_name(f"{current.stem}.{index}.log.gz").exists()):
+                index += 1
+            rotated = current.with_name(f"{current.stem}.{index}.log")
+            try:
+                os.replace(current, rotated)
+            except OSError:
+                return
+
+        self.stats["rotations"] += 1
+        self._created.append(rotated)
+        self._compressor.submit(self._compress, rotated)
+        self._compressor.submit(self._prune)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            start = self.stream.tell()
+            logging.FileHandler.emit(self, record)
+            self.stats["bytes_written"] += self.stream.tell() - start
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        super().close()
+        self._compressor.shutdown(wait=True)
+        if self._dir_lock is not None:
+            self._dir_lock.close()
+            self._dir_lock = None
+
+    def _compress(self, path: Path) -> None:
+        """将本实例轮转出的日志文件压缩为.gz（后台线程）"""
+        if not path.exists():
+            return
+        try:
+            with open(path, 'rb') as source, gzip.open(f"{path}.gz", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            path.unlink()
+            self.stats["compressed"] += 1
+        except OSError:
+            pass
+
+    def _prune(self) -> None:
+        """删除本实例轮转出的、超过保留天数的日志文件（后台线程）"""
+        if self.retention_days <= 0:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        for rotated in list(self._created):
+            remaining = False
+            for path in (rotated, Path(f"{rotated}.gz")):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                    else:
+                        remaining = True
+                except OSError:
+                    pass
+            if not remaining:
+                self._created.remove(rotated)
+
+
+class _LogPipeline:
+    """共享的异步日志管道（队列处理器 + 单个写线程）"""
+
+    def __init__(self):
+        self.stats = {
+            "records": 0,
+            "dropped": 0,
+            "bytes_written": 0,
+            "rotations": 0,
+            "compressed": 0,
+            "levels": {},
+        }
+        self.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.queue_handler = BoundedQueueHandler(self.queue, self.stats)
+
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+
+        # 控制台处理器（总是启用）
+        self.console_handler = logging.StreamHandler()
+        self.console_handler.setFormatter(formatter)
+        handlers = [self.console_handler]
 
         # 只有在可以创建日志目录时才添加文件处理器
+        self.file_handler = None
+        log_dir = get_log_dir()
         if log_dir:
             try:
-                log_filename = f"app_{datetime.now().strftime('%Y%m%d')}.log"
-                log_path = log_dir / log_filename
-                file_handler = logging.FileHandler(log_path, encoding='utf-8')
-                file_handler.setLevel(level)
-                file_handler.setFormatter(formatter)
-                logger.addHandler(file_handler)
+                self.file_handler = RotatingLogFileHandler(log_dir, self.stats, LOG_MAX_BYTES, LOG_RETENTION_DAYS)
+                self.file_handler.setFormatter(formatter)
+                handlers.append(self.file_handler)
             except Exception:
                 # 如果无法创建文件处理器，仅使用控制台日志
-                pass
+                self.file_handler = None
+
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """写出队列中剩余的记录并停止写线程"""
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+def _get_pipeline() -> _LogPipeline:
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = _LogPipeline()
+                atexit.register(shutdown_logging)
+    return _pipeline
+
+
+def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
+    """设置日志记录器
+
+    Args:
+        name: 日志记录器名称
+        level: 日志级别
+
+    Returns:
+        配置好的日志记录器
+    """
+    # 创建日志记录器
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    # 避免重复添加处理器
+    if not logger.handlers:
+        logger.addHandler(_get_pipeline().queue_handler)
+
+    return logger
+
+
+def set_console_level(level: int) -> None:
+    """设置控制台输出级别（文件日志不受影响）
+
+    Args:
+        level: 日志级别
+    """
+    _get_pipeline().console_handler.setLevel(level)
+
+
+def get_log_stats() -> Dict[str, Any]:
+    """获取日志量统计
+
+    Returns:
+        包含records、dropped、bytes_written、rotations、compressed、levels、queue_size的字典
+    """
+    pipeline = _get_pipeline()
+    stats = dict(pipeline.stats)
+    stats["levels"] = dict(stats["levels"])
+    stats["queue_size"] = pipeline.queue.qsize()
+    return stats
+
 
-    return logger
\ No newline at end of file
+def shutdown_logging() -> None:
+    """停止日志管道（退出时自动调用），确保队列中的记录全部写出"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None:
+            _pipeline.stop()
+            _pipeline = None
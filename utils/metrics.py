@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能指标工具模块
+提供进程内的计数器、仪表与固定分桶直方图，用于诊断面板展示与导出
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+# 默认直方图分桶上界（毫秒），最后一个桶之外的值计入 +Inf
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Counter:
+    """只增不减的计数器"""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        """增加计数
+
+        Args:
+            amount: 增加量
+        """
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"type": "counter", "description": self.description, "value": self._value}
+
+
+class Gauge:
+    """记录当前值的仪表"""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        """设置当前值
+
+        Args:
+            value: 当前值
+        """
+        self._value = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"type": "gauge", "description": self.description, "value": self._value}
+
+
+class Histogram:
+    """固定分桶直方图（记录次数、总和、最值与各桶计数，分位数按桶上界估算）"""
+
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """记录一次观测值
+
+        Args:
+            value: 观测值（耗时类指标单位为毫秒）
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            self._min = value if self._min is None else min(self._min, value)
+            self._max = value if self._max is None else max(self._max, value)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """按分桶估算分位数（返回所在桶的上界，超出最后一个桶时返回最大值）
+
+        Args:
+            p: 分位（0-100）
+
+        Returns:
+            估算值，尚无观测时返回None
+        """
+        if not self._count:
+            return None
+        rank = p / 100 * self._count
+        seen = 0
+        for i, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.buckets[i], self._max) if i < len(self.buckets) else self._max
+        return self._max
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            count, total, minimum, maximum = self._count, self._sum, self._min, self._max
+        return {
+            "type": "histogram",
+            "description": self.description,
+            "count": count,
+            "sum": round(total, 3),
+            "min": minimum,
+            "max": maximum,
+            "mean": round(total / count, 3) if count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {
+                **{str(bound): counts[i] for i, bound in enumerate(self.buckets)},
+                "+Inf": counts[-1],
+            },
+        }
+
+
+class MetricsRegistry:
+    """指标注册表，同名指标只创建一次"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def _get_or_create(self, metric_class, name: str, *args) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = metric_class(name, *args)
+        return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        """获取（或创建）计数器"""
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        """获取（或创建）仪表"""
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS_MS) -> Histogram:
+        """获取（或创建）直方图"""
+        return self._get_or_create(Histogram, name, description, buckets)
+
+    @contextmanager
+    def timer(self, name: str, description: str = "") -> Iterator[None]:
+        """计时上下文，退出时将耗时（毫秒）记入直方图
+
+        Args:
+            name: 直方图名称
+            description: 指标说明
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name, description).observe((time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """导出全部指标
+
+        Returns:
+            {"timestamp", "uptime_seconds", "metrics": {名称: 指标数据}}
+        """
+        with self._lock:
+            items = sorted(self._metrics.items())
+        return {
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "uptime_seconds": round(time.time() - self._started, 1),
+            "metrics": {name: metric.snapshot() for name, metric in items},
+        }
+
+    def reset(self) -> None:
+        """清空全部指标"""
+        with self._lock:
+            self._metrics.clear()
+            self._started = time.time()
+
+
+# 进程内共享的指标注册表
+metrics = MetricsRegistry()